@@ -0,0 +1,110 @@
+const crypto = require('crypto');
+const { Client } = require('@elastic/elasticsearch');
+const { buildQuery, hasFilters, normalizeFilters } = require('../utils/queryBuilder');
+
+const esClient = new Client({
+  node: process.env.ELASTICSEARCH_NODE
+});
+
+// Percolator index created by the ETL (etl/loaders/saved_searches.py); each
+// saved search is stored as the query searchAircraft would run for it and
+// evaluated against new/changed aircraft during every load
+const SAVED_SEARCH_INDEX = process.env.ELASTICSEARCH_SAVED_SEARCH_INDEX || 'transport-saved-searches';
+
+const MAX_SEARCHES_PER_USER = parseInt(process.env.MAX_SAVED_SEARCHES_PER_USER || '50');
+
+const isMissingIndex = (error) =>
+  error.meta?.body?.error?.type === 'index_not_found_exception';
+
+const missingIndexResponse = (res) => res.status(503).json({
+  error: `Saved-search index '${SAVED_SEARCH_INDEX}' does not exist (created by the ETL with --alerts)`
+});
+
+const toSavedSearch = (hit) => ({
+  id: hit._source.saved_search.id,
+  user: hit._source.saved_search.user,
+  name: hit._source.saved_search.name,
+  filters: hit._source.saved_search.filters,
+  createdAt: hit._source.saved_search.created_at
+});
+
+// Save a filter set for alerts: { name, filters: { manufacturer, state, ... } }
+// owned by the authenticated caller (req.user, see utils/authMiddleware.js)
+exports.createSavedSearch = async (req, res) => {
+  const user = req.user;
+  const { name, filters = {} } = req.body || {};
+  if (!name) {
+    return res.status(400).json({ error: 'name is required' });
+  }
+  if (!hasFilters(filters)) {
+    return res.status(400).json({ error: 'A saved search needs at least one filter' });
+  }
+
+  try {
+    const existing = await esClient.count({
+      index: SAVED_SEARCH_INDEX,
+      query: { term: { 'saved_search.user': user } }
+    });
+    if (existing.count >= MAX_SEARCHES_PER_USER) {
+      return res.status(409).json({ error: `At most ${MAX_SEARCHES_PER_USER} saved searches per user` });
+    }
+
+    const savedSearch = {
+      id: crypto.randomUUID(),
+      user,
+      name,
+      filters: normalizeFilters(filters),
+      created_at: new Date().toISOString()
+    };
+    await esClient.index({
+      index: SAVED_SEARCH_INDEX,
+      id: savedSearch.id,
+      document: { query: buildQuery(filters), saved_search: savedSearch },
+      refresh: 'wait_for'
+    });
+
+    res.status(201).json(toSavedSearch({ _source: { saved_search: savedSearch } }));
+  } catch (error) {
+    if (isMissingIndex(error)) return missingIndexResponse(res);
+    console.error('Saved search error:', error);
+    res.status(500).json({ error: error.message });
+  }
+};
+
+// List the caller's saved searches
+exports.listSavedSearches = async (req, res) => {
+  try {
+    const response = await esClient.search({
+      index: SAVED_SEARCH_INDEX,
+      query: { term: { 'saved_search.user': req.user } },
+      sort: [{ 'saved_search.created_at': 'desc' }],
+      size: MAX_SEARCHES_PER_USER,
+      _source: ['saved_search']
+    });
+    res.json({ items: response.hits.hits.map(toSavedSearch) });
+  } catch (error) {
+    if (isMissingIndex(error)) return res.json({ items: [] });
+    res.status(500).json({ error: error.message });
+  }
+};
+
+// Delete one of the caller's saved searches (someone else's reads as not found)
+exports.deleteSavedSearch = async (req, res) => {
+  try {
+    const existing = await esClient.get({
+      index: SAVED_SEARCH_INDEX,
+      id: req.params.id,
+      _source: ['saved_search.user']
+    });
+    if (existing._source.saved_search.user !== req.user) {
+      return res.status(404).json({ error: 'Saved search not found' });
+    }
+    await esClient.delete({ index: SAVED_SEARCH_INDEX, id: req.params.id, refresh: 'wait_for' });
+    res.status(204).end();
+  } catch (error) {
+    if (error.meta?.statusCode === 404) {
+      return res.status(404).json({ error: 'Saved search not found' });
+    }
+    res.status(500).json({ error: error.message });
+  }
+};
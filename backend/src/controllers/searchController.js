@@ -1,167 +1,268 @@
 const { Client } = require('@elastic/elasticsearch');
+const { coalesced } = require('../utils/singleFlight');
+const { buildQuery, sourceFilter } = require('../utils/queryBuilder');
+const {
+  SUGGEST_TARGETS, searchBody, searchStatisticsBody, pairSearchBody, suggestBody
+} = require('../utils/searchBodies');
+const { encodeCursor, decodeCursor, openPit, closePit, searchPage, scanHits } = require('../utils/pointInTime');
+
 const esClient = new Client({
   node: process.env.ELASTICSEARCH_NODE
 });
 
-// Search aircraft with filters and statistics
+// Read requests go through single-flight: identical concurrent queries share
+// one upstream call (point-in-time requests use esClient directly)
+const es = coalesced(esClient);
+
+// Hits requests count at most this many matches exactly: enough for the
+// paginator (from/size cannot go past max_result_window anyway) without
+// counting every match of broad queries. Exact totals come with statistics.
+const TRACK_TOTAL_HITS = parseInt(process.env.SEARCH_TRACK_TOTAL_HITS || '10000');
+
+// from/size paging limit (index.max_result_window); deeper pages use cursors
+const MAX_RESULT_WINDOW = 10000;
+
+const EXPORT_PAGE_SIZE = parseInt(process.env.EXPORT_PAGE_SIZE || '1000');
+
+// Results table columns, used for CSV exports
+const CSV_COLUMNS = [
+  ['transport_id', hit => hit.transport_id],
+  ['registration_id', hit => hit.registration_id],
+  ['manufacturer', hit => hit.manufacturer],
+  ['model', hit => hit.model],
+  ['year', hit => hit.year],
+  ['category', hit => hit.category],
+  ['city', hit => hit.location?.city],
+  ['state', hit => hit.location?.state_province]
+];
+
+const csvValue = (value) => {
+  if (value === undefined || value === null) return '';
+  const text = String(value);
+  return /[",\n\r]/.test(text) ? `"${text.replace(/"/g, '""')}"` : text;
+};
+
+const isExpiredPit = (error) => {
+  const type = error.meta?.body?.error?.type;
+  return type === 'search_context_missing_exception' ||
+    error.meta?.body?.error?.caused_by?.type === 'search_context_missing_exception';
+};
+
+// Cursor pagination: point-in-time + search_after, any depth.
+// `cursor=` (empty) starts a new cursor; each response returns nextCursor.
+const searchWithCursor = async (req, res, source) => {
+  const pageSize = parseInt(req.query.size || 20);
+  let pitId;
+  let after = null;
+
+  if (req.query.cursor) {
+    const cursor = decodeCursor(req.query.cursor);
+    if (!cursor) {
+      return res.status(400).json({ error: 'Invalid cursor' });
+    }
+    pitId = cursor.pit;
+    after = cursor.after;
+  } else {
+    pitId = await openPit(esClient, process.env.ELASTICSEARCH_INDEX);
+  }
+
+  let result;
+  try {
+    result = await searchPage(esClient, {
+      pitId,
+      query: buildQuery(req.query),
+      size: pageSize,
+      after,
+      source,
+      // Count once, on the first page only
+      trackTotalHits: after ? false : TRACK_TOTAL_HITS
+    });
+  } catch (error) {
+    if (isExpiredPit(error)) {
+      return res.status(410).json({ error: 'Cursor expired, start a new search' });
+    }
+    // Release the PIT now instead of holding it until keep_alive runs out
+    await closePit(esClient, pitId);
+    throw error;
+  }
+
+  pitId = result.pit_id || pitId;
+  const hits = result.hits.hits;
+  let nextCursor = null;
+  if (hits.length === pageSize) {
+    nextCursor = encodeCursor(pitId, hits[hits.length - 1].sort);
+  } else {
+    await closePit(esClient, pitId);
+  }
+
+  res.json({
+    items: hits.map(hit => ({
+      id: hit._id,
+      ...hit._source
+    })),
+    total: result.hits.total?.value,
+    totalRelation: result.hits.total?.relation,
+    size: pageSize,
+    nextCursor
+  });
+};
+
+// Search aircraft with filters (hits only; see getSearchStatistics).
+// Returns table columns by default; view=full or fields=... for more.
 exports.searchAircraft = async (req, res) => {
   try {
-    const {
-      query = '',
-      manufacturer = '',
-      model = '',
-      year_min,
-      year_max,
-      state = '',
-      page = 1,
-      size = 20,
-      manufacturer_state_combos = ''
-    } = req.query;
-
-    // Build Elasticsearch query
-    const must = [];
-    
-    if (query) {
-      must.push({
-        multi_match: {
-          query: query,
-          fields: ['manufacturer', 'model', 'registration_id', 'plane_data.n_number']
-        }
-      });
+    let source;
+    try {
+      source = sourceFilter(req.query);
+    } catch (error) {
+      return res.status(400).json({ error: error.message });
+    }
+
+    if (req.query.cursor !== undefined) {
+      return await searchWithCursor(req, res, source);
     }
 
-    // Handle manufacturer-state combinations (takes precedence over individual fields)
-    if (manufacturer_state_combos) {
-      const combos = manufacturer_state_combos.split(',').map(combo => {
-        const [mfr, st] = combo.split(':');
-        return { manufacturer: mfr.trim(), state: st.trim() };
+    const { page = 1, size = 20 } = req.query;
+    const pageSize = parseInt(size);
+    const from = (parseInt(page) - 1) * pageSize;
+
+    if (from + pageSize > MAX_RESULT_WINDOW) {
+      return res.status(400).json({
+        error: `Page beyond the first ${MAX_RESULT_WINDOW} results; use cursor pagination (cursor=)`
       });
+    }
 
-      if (combos.length > 0) {
-        must.push({
-          bool: {
-            should: combos.map(combo => ({
-              bool: {
-                must: [
-                  { term: { 'manufacturer.keyword': combo.manufacturer } },
-                  { term: { 'location.state_province': combo.state } }
-                ]
-              }
-            })),
-            minimum_should_match: 1
-          }
-        });
-      }
-    } else {
-      // Fallback to individual manufacturer/state (for backward compatibility)
-      if (manufacturer) {
-        must.push({ term: { 'manufacturer.keyword': manufacturer } });
-      }
+    const result = await es.search({
+      index: process.env.ELASTICSEARCH_INDEX,
+      body: searchBody(req.query, { from, size: pageSize, trackTotalHits: TRACK_TOTAL_HITS, source })
+    });
 
-      if (state) {
-        must.push({ term: { 'location.state_province': state } });
-      }
+    res.json({
+      items: result.hits.hits.map(hit => ({
+        id: hit._id,
+        ...hit._source
+      })),
+      total: result.hits.total.value,
+      totalRelation: result.hits.total.relation,
+      page: parseInt(page),
+      size: pageSize
+    });
+
+  } catch (error) {
+    console.error('Search error:', error);
+    res.status(500).json({ error: error.message });
+  }
+};
+
+// Stream every match of a filter set as NDJSON (full documents) or CSV
+// (table columns). Memory stays at one page regardless of result size.
+exports.exportAircraft = async (req, res) => {
+  const format = req.query.format === 'csv' ? 'csv' : 'ndjson';
+  let aborted = false;
+  res.on('close', () => { aborted = !res.writableEnded; });
+
+  // Respect socket backpressure; also resume if the client goes away
+  const write = (chunk) => new Promise(resolve => {
+    if (res.write(chunk)) return resolve();
+    const done = () => {
+      res.off('drain', done);
+      res.off('close', done);
+      resolve();
+    };
+    res.once('drain', done);
+    res.once('close', done);
+  });
+
+  const start = async () => {
+    res.status(200);
+    res.setHeader('Content-Type', format === 'csv' ? 'text/csv; charset=utf-8' : 'application/x-ndjson');
+    res.setHeader('Content-Disposition', `attachment; filename="aircraft.${format}"`);
+    if (format === 'csv') {
+      await write(CSV_COLUMNS.map(([name]) => name).join(',') + '\n');
     }
+  };
 
-    if (model) {
-      must.push({ match: { model: model } });
+  try {
+    // NDJSON exports full documents unless view/fields narrow them
+    let source = format === 'csv' ? ['transport_id', 'registration_id', 'manufacturer', 'model',
+      'year', 'category', 'location.city', 'location.state_province'] : undefined;
+    if (format === 'ndjson' && (req.query.view || req.query.fields)) {
+      try {
+        source = sourceFilter(req.query);
+      } catch (error) {
+        return res.status(400).json({ error: error.message });
+      }
     }
 
-    if (year_min || year_max) {
-      const range = { year: {} };
-      if (year_min) range.year.gte = parseInt(year_min);
-      if (year_max) range.year.lte = parseInt(year_max);
-      must.push({ range });
+    const pages = scanHits(esClient, {
+      index: process.env.ELASTICSEARCH_INDEX,
+      query: buildQuery(req.query),
+      pageSize: EXPORT_PAGE_SIZE,
+      source
+    });
+
+    // Headers wait for the first page so query errors can still return a 500
+    for await (const hits of pages) {
+      if (!res.headersSent) await start();
+
+      const lines = hits.map(hit => format === 'csv'
+        ? CSV_COLUMNS.map(([, get]) => csvValue(get(hit._source))).join(',')
+        : JSON.stringify(hit._source));
+      await write(lines.join('\n') + '\n');
+
+      // Leaving the loop runs the generator's finally, which closes the PIT
+      if (aborted) break;
     }
 
-    const finalQuery = must.length > 0 ? { bool: { must } } : { match_all: {} };
-    const from = (parseInt(page) - 1) * parseInt(size);
+    if (!res.headersSent) await start();
+    res.end();
 
-    // Enhanced search body with aggregations
-    const searchBody = {
-      query: finalQuery,
-      from: from,
-      size: parseInt(size),
-      sort: [{ year: 'desc' }],
-      
-      aggs: {
-        by_manufacturer: {
-          terms: {
-            field: 'manufacturer.keyword',
-            size: 100,
-            order: { _count: 'desc' }
-          },
-          aggs: {
-            models: {
-              terms: {
-                field: 'model.keyword',
-                size: 100
-              }
-            }
-          }
-        },
-        by_state: {
-          terms: {
-            field: 'location.state_province',
-            size: 50
-          }
-        },
-        by_year: {
-          histogram: {
-            field: 'year',
-            interval: 1,
-            min_doc_count: 1,
-            order: { _key: 'desc' }
-          }
-        },
-        by_category: {
-          terms: {
-            field: 'category',
-            size: 20
-          }
-        }
-      }
-    };
+  } catch (error) {
+    console.error('Export error:', error);
+    if (!res.headersSent) {
+      return res.status(500).json({ error: error.message });
+    }
+    // Headers are gone; cut the stream so the client sees an incomplete download
+    res.destroy(error);
+  }
+};
 
-    const result = await esClient.search({
+// Histogram statistics for a filter set (cached per normalized filter set
+// by the route's response cache, so paging never recomputes them)
+exports.getSearchStatistics = async (req, res) => {
+  try {
+    const result = await es.search({
       index: process.env.ELASTICSEARCH_INDEX,
-      body: searchBody
+      body: searchStatisticsBody(req.query)
     });
 
     // Transform aggregations into statistics format
     const statistics = {
       byManufacturer: {},
       modelsByManufacturer: {},
+      byState: {},
+      byYear: {},
+      byCategory: {},
       totalCount: result.hits.total.value
     };
 
-    if (result.aggregations.by_manufacturer) {
-      result.aggregations.by_manufacturer.buckets.forEach(bucket => {
-        const manufacturerName = bucket.key;
-        statistics.byManufacturer[manufacturerName] = bucket.doc_count;
-        statistics.modelsByManufacturer[manufacturerName] = {};
-        
-        if (bucket.models && bucket.models.buckets) {
-          bucket.models.buckets.forEach(modelBucket => {
-            statistics.modelsByManufacturer[manufacturerName][modelBucket.key] = modelBucket.doc_count;
-          });
-        }
-      });
-    }
+    result.aggregations.by_manufacturer.buckets.forEach(bucket => {
+      const manufacturerName = bucket.key;
+      statistics.byManufacturer[manufacturerName] = bucket.doc_count;
+      statistics.modelsByManufacturer[manufacturerName] = {};
 
-    res.json({
-      items: result.hits.hits.map(hit => ({
-        id: hit._id,
-        ...hit._source
-      })),
-      total: result.hits.total.value,
-      page: parseInt(page),
-      size: parseInt(size),
-      statistics: statistics
+      bucket.models.buckets.forEach(modelBucket => {
+        statistics.modelsByManufacturer[manufacturerName][modelBucket.key] = modelBucket.doc_count;
+      });
     });
+    result.aggregations.by_state.buckets.forEach(b => { statistics.byState[b.key] = b.doc_count; });
+    result.aggregations.by_year.buckets.forEach(b => { statistics.byYear[b.key] = b.doc_count; });
+    result.aggregations.by_category.buckets.forEach(b => { statistics.byCategory[b.key] = b.doc_count; });
+
+    res.json(statistics);
 
   } catch (error) {
-    console.error('Search error:', error);
+    console.error('Statistics error:', error);
     res.status(500).json({ error: error.message });
   }
 };
@@ -170,11 +271,20 @@ exports.searchAircraft = async (req, res) => {
 exports.getAircraftById = async (req, res) => {
   try {
     const { id } = req.params;
-    const result = await esClient.get({
+    // ids query instead of GET so the index may be an alias over several
+    // partitioned indices (GET by id requires a single concrete index)
+    const result = await es.search({
       index: process.env.ELASTICSEARCH_INDEX,
-      id: id
+      body: {
+        query: { ids: { values: [id] } },
+        size: 1
+      }
     });
-    res.json(result._source);
+    const hit = result.hits.hits[0];
+    if (!hit) {
+      return res.status(404).json({ error: 'Aircraft not found' });
+    }
+    res.json(hit._source);
   } catch (error) {
     if (error.meta?.statusCode === 404) {
       return res.status(404).json({ error: 'Aircraft not found' });
@@ -183,68 +293,98 @@ exports.getAircraftById = async (req, res) => {
   }
 };
 
-/**
- * Get unique manufacturer-state combinations with counts
- * Supports pagination and search filtering
- */
-exports.getManufacturerStateCombinations = async (req, res) => {
-  try {
-    const { page = 1, size = 20, search = '' } = req.query;
-    const from = (page - 1) * size;
+const PAIRS_INDEX = process.env.ELASTICSEARCH_PAIRS_INDEX || 'transport-manufacturer-states';
 
-    // Aggregation query for unique manufacturer + state combinations
-    const response = await esClient.search({
-      index: process.env.ELASTICSEARCH_INDEX,
-      size: 0,
-      body: {
-        query: search ? {
-          wildcard: {
-            manufacturer: {
-              value: `*${search}*`,
-              case_insensitive: true
-            }
+// Page through the materialized pair index written by the ETL
+// (one small document per manufacturer/state pair)
+const searchPairIndex = async (search, from, size) => {
+  const response = await es.search({
+    index: PAIRS_INDEX,
+    body: pairSearchBody(search, from, size)
+  });
+
+  return {
+    total: response.hits.total.value,
+    items: response.hits.hits.map(hit => hit._source)
+  };
+};
+
+// Fallback while the pair index has not been built: aggregate the main index
+const aggregatePairs = async (search, from, size) => {
+  const response = await es.search({
+    index: process.env.ELASTICSEARCH_INDEX,
+    size: 0,
+    body: {
+      query: search ? {
+        wildcard: {
+          manufacturer: {
+            value: `*${search}*`,
+            case_insensitive: true
           }
-        } : { match_all: {} },
-        aggs: {
-          manufacturers: {
-            terms: {
-              field: 'manufacturer.keyword',
-              size: 1000
-            },
-            aggs: {
-              states: {
-                terms: {
-                  field: 'location.state_province',
-                  size: 100
-                }
+        }
+      } : { match_all: {} },
+      aggs: {
+        manufacturers: {
+          terms: {
+            field: 'manufacturer.keyword',
+            size: 1000
+          },
+          aggs: {
+            states: {
+              terms: {
+                field: 'location.state_province',
+                size: 100
               }
             }
           }
         }
       }
-    });
+    }
+  });
 
-    // Flatten to manufacturer-state pairs
-    const pairs = [];
-    response.aggregations.manufacturers.buckets.forEach(mfrBucket => {
-      mfrBucket.states.buckets.forEach(stateBucket => {
-        pairs.push({
-          manufacturer: mfrBucket.key,
-          state: stateBucket.key,
-          count: stateBucket.doc_count
-        });
+  // Flatten to manufacturer-state pairs
+  const pairs = [];
+  response.aggregations.manufacturers.buckets.forEach(mfrBucket => {
+    mfrBucket.states.buckets.forEach(stateBucket => {
+      pairs.push({
+        manufacturer: mfrBucket.key,
+        state: stateBucket.key,
+        count: stateBucket.doc_count
       });
     });
+  });
+
+  return {
+    total: pairs.length,
+    items: pairs.slice(from, from + size)
+  };
+};
+
+/**
+ * Get unique manufacturer-state combinations with counts
+ * Supports pagination and search filtering
+ */
+exports.getManufacturerStateCombinations = async (req, res) => {
+  try {
+    const { page = 1, size = 20, search = '' } = req.query;
+    const pageSize = parseInt(size);
+    const from = (parseInt(page) - 1) * pageSize;
 
-    // Apply pagination
-    const total = pairs.length;
-    const paginatedPairs = pairs.slice(from, from + parseInt(size));
+    let result;
+    try {
+      result = await searchPairIndex(search.trim(), from, pageSize);
+    } catch (error) {
+      if (error.meta?.body?.error?.type !== 'index_not_found_exception') {
+        throw error;
+      }
+      result = await aggregatePairs(search, from, pageSize);
+    }
 
     res.json({
-      total,
+      total: result.total,
       page: parseInt(page),
-      size: parseInt(size),
-      items: paginatedPairs
+      size: pageSize,
+      items: result.items
     });
 
   } catch (error) {
@@ -252,3 +392,41 @@ exports.getManufacturerStateCombinations = async (req, res) => {
     res.status(500).json({ error: 'Failed to fetch combinations' });
   }
 };
+
+const MAX_SUGGESTIONS = 20;
+
+// Prefix suggestions for one field: a bool_prefix match over the indexed
+// shingles/edge n-grams, collapsed to distinct values
+exports.suggest = async (req, res) => {
+  const target = SUGGEST_TARGETS[req.query.field || 'manufacturer'];
+  if (!target) {
+    return res.status(400).json({
+      error: `Unknown field '${req.query.field}' (use ${Object.keys(SUGGEST_TARGETS).join(', ')})`
+    });
+  }
+
+  const prefix = (req.query.prefix || '').trim().slice(0, 64);
+  const size = Math.min(Math.max(parseInt(req.query.size || 10) || 10, 1), MAX_SUGGESTIONS);
+  if (!prefix) {
+    return res.json({ field: req.query.field || 'manufacturer', prefix, suggestions: [] });
+  }
+
+  try {
+    const response = await es.search({
+      index: process.env.ELASTICSEARCH_INDEX,
+      body: suggestBody(target, prefix, size)
+    });
+
+    res.json({
+      field: req.query.field || 'manufacturer',
+      prefix,
+      suggestions: response.hits.hits
+        .map(hit => hit.fields?.[target.value]?.[0])
+        .filter(Boolean),
+      took: response.took
+    });
+  } catch (error) {
+    console.error('Suggest error:', error);
+    res.status(500).json({ error: error.message });
+  }
+};
@@ -1,105 +1,99 @@
 const { Client } = require('@elastic/elasticsearch');
+const { coalesced } = require('../utils/singleFlight');
+const { hasFilters } = require('../utils/queryBuilder');
+const { statisticsBody } = require('../utils/searchBodies');
 
 const esClient = new Client({
   node: process.env.ELASTICSEARCH_NODE
 });
 
-// Get aggregate statistics
-exports.getStatistics = async (req, res) => {
+// Identical concurrent dashboard queries share one upstream call
+const es = coalesced(esClient);
+
+const ROLLUP_INDEX = process.env.ELASTICSEARCH_ROLLUP_INDEX || 'transport-rollups';
+const ROLLUP_SCOPE = 'plane';
+
+const topN = (entries, n, label) => entries.slice(0, n).map(e => ({
+  [label]: e.key,
+  count: e.count
+}));
+
+// Map a rollup document written by the ETL (transformers/rollups.py) to the
+// statistics response
+const fromRollup = (doc) => {
+  const { stats } = doc;
+  return {
+    totalAircraft: stats.total,
+    topManufacturers: topN(stats.manufacturers, 10, 'name'),
+    topStates: topN(stats.states, 10, 'state'),
+    yearDistribution: topN(stats.years, 10, 'year'),
+    aircraftTypes: topN(stats.categories, 10, 'type'),
+    ageBands: topN(stats.age_bands, stats.age_bands.length, 'band'),
+    engineTypes: topN(stats.engine_types, 10, 'type'),
+    ownerTypes: topN(stats.owner_types, 10, 'type'),
+    manufacturerCount: stats.manufacturers_cardinality,
+    stateCount: stats.states_cardinality,
+    generation: doc.generation,
+    generatedAt: doc.generated_at
+  };
+};
+
+// Precomputed rollup for the dashboard, or null if the ETL has not written one
+const getRollup = async () => {
   try {
-    const stats = {};
+    const result = await es.get({ index: ROLLUP_INDEX, id: ROLLUP_SCOPE });
+    return result._source;
+  } catch (error) {
+    if (error.meta?.statusCode === 404) {
+      return null;
+    }
+    throw error;
+  }
+};
 
-    // Total count
-    const countResult = await esClient.count({
-      index: process.env.ELASTICSEARCH_INDEX
-    });
-    stats.totalAircraft = countResult.count;
+const buckets = (agg, label) => agg.buckets.map(b => ({
+  [label]: b.key,
+  count: b.doc_count
+}));
 
-    // Top manufacturers (top 10)
-    const manufacturersAgg = await esClient.search({
-      index: process.env.ELASTICSEARCH_INDEX,
-      body: {
-        size: 0,
-        aggs: {
-          top_manufacturers: {
-            terms: {
-              field: 'manufacturer.keyword',
-              size: 10
-            }
-          }
-        }
-      }
-    });
-    stats.topManufacturers = manufacturersAgg.aggregations.top_manufacturers.buckets.map(b => ({
-      name: b.key,
-      count: b.doc_count
-    }));
+const fromAggregations = (result) => {
+  const aggs = result.aggregations;
+  return {
+    totalAircraft: result.hits.total.value,
+    topManufacturers: buckets(aggs.top_manufacturers, 'name'),
+    topStates: buckets(aggs.top_states, 'state'),
+    yearDistribution: buckets(aggs.year_distribution, 'year').slice(0, 10),
+    aircraftTypes: buckets(aggs.aircraft_types, 'type'),
+    ageBands: buckets(aggs.age_bands, 'band')
+      .concat([{ band: 'unknown', count: aggs.unknown_year.doc_count }]),
+    engineTypes: buckets(aggs.engine_types, 'type'),
+    ownerTypes: buckets(aggs.owner_types, 'type'),
+    manufacturerCount: aggs.manufacturer_count.value,
+    stateCount: aggs.state_count.value
+  };
+};
 
-    // Top states (top 10)
-    const statesAgg = await esClient.search({
-      index: process.env.ELASTICSEARCH_INDEX,
-      body: {
-        size: 0,
-        aggs: {
-          top_states: {
-            terms: {
-              field: 'location.state_province',
-              size: 10
-            }
-          }
-        }
-      }
-    });
-    stats.topStates = statesAgg.aggregations.top_states.buckets.map(b => ({
-      state: b.key,
-      count: b.doc_count
-    }));
+// Get aggregate statistics, optionally for a filter context
+// (same filter parameters as /aircraft)
+exports.getStatistics = async (req, res) => {
+  try {
+    const filtered = hasFilters(req.query);
 
-    // Year distribution (last 10 years)
-    const yearAgg = await esClient.search({
-      index: process.env.ELASTICSEARCH_INDEX,
-      body: {
-        size: 0,
-        aggs: {
-          year_distribution: {
-            histogram: {
-              field: 'year',
-              interval: 1,
-              min_doc_count: 1,
-              order: { _key: 'desc' }
-            }
-          }
-        }
+    // Fast path: one GET of the rollup written at load time (unfiltered only)
+    if (!filtered) {
+      const rollup = await getRollup();
+      if (rollup) {
+        return res.json({ ...fromRollup(rollup), filtered, source: 'rollup' });
       }
-    });
-    stats.yearDistribution = yearAgg.aggregations.year_distribution.buckets
-      .slice(0, 10)
-      .map(b => ({
-        year: b.key,
-        count: b.doc_count
-      }));
+    }
 
-    // Aircraft type distribution - use category instead of plane_data.aircraft_type
-    const typeAgg = await esClient.search({
+    // Single pass over the matching documents
+    const result = await es.search({
       index: process.env.ELASTICSEARCH_INDEX,
-      body: {
-        size: 0,
-        aggs: {
-          aircraft_types: {
-            terms: {
-              field: 'category',
-              size: 10
-            }
-          }
-        }
-      }
+      body: statisticsBody(req.query, new Date().getUTCFullYear())
     });
-    stats.aircraftTypes = typeAgg.aggregations.aircraft_types.buckets.map(b => ({
-      type: b.key,
-      count: b.doc_count
-    }));
 
-    res.json(stats);
+    res.json({ ...fromAggregations(result), filtered, source: 'live' });
   } catch (error) {
     res.status(500).json({ error: error.message });
   }
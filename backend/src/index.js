@@ -13,13 +13,30 @@ const esClient = new Client({
 
 // Middleware
 app.use(cors({
-  origin: process.env.CORS_ORIGIN
+  origin: process.env.CORS_ORIGIN,
+  exposedHeaders: ['ETag', 'X-Cache']
 }));
 app.use(express.json());
 
+// One line per request (METHOD URL STATUS TIME) when ACCESS_LOG=true; the
+// ETL's workload_replay.py / warmup read these to replay real traffic
+if (process.env.ACCESS_LOG === 'true') {
+  app.use((req, res, next) => {
+    const started = process.hrtime.bigint();
+    res.on('finish', () => {
+      const ms = Number(process.hrtime.bigint() - started) / 1e6;
+      console.log(`${req.method} ${req.originalUrl} ${res.statusCode} ${ms.toFixed(1)}ms`);
+    });
+    next();
+  });
+}
+
 // Import routes
 const searchRoutes = require('./routes/searchRoutes');
 const statsRoutes = require('./routes/statsRoutes');
+const savedSearchRoutes = require('./routes/savedSearchRoutes');
+const generation = require('./utils/generation');
+const singleFlight = require('./utils/singleFlight');
 
 // Health check endpoint
 app.get('/health', async (req, res) => {
@@ -48,7 +65,9 @@ app.get('/api/v1/info', async (req, res) => {
       service: 'Transportation Portal API',
       version: '1.0.0',
       totalRecords: count.count,
-      index: process.env.ELASTICSEARCH_INDEX
+      index: process.env.ELASTICSEARCH_INDEX,
+      generation: generation.currentGeneration(),
+      singleFlight: singleFlight.stats
     });
   } catch (error) {
     res.status(500).json({ error: error.message });
@@ -58,10 +77,14 @@ app.get('/api/v1/info', async (req, res) => {
 // Mount routes
 app.use('/api/v1', searchRoutes);
 app.use('/api/v1', statsRoutes);
+app.use('/api/v1', savedSearchRoutes);
 
 // Start server
 app.listen(PORT, '0.0.0.0', () => {
   console.log(`Transportation API listening on port ${PORT}`);
   console.log(`Environment: ${process.env.NODE_ENV}`);
   console.log(`Elasticsearch: ${process.env.ELASTICSEARCH_NODE}`);
+
+  // Response caches are dropped whenever the ETL marks a new generation
+  generation.startPolling();
 });
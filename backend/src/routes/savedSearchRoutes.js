@@ -0,0 +1,12 @@
+const express = require('express');
+const router = express.Router();
+const savedSearchController = require('../controllers/savedSearchController');
+const { requireUser } = require('../utils/authMiddleware');
+
+// Saved searches evaluated for alerts by the ETL (never cached: per user, mutable).
+// The owner is always the authenticated caller.
+router.get('/saved-searches', requireUser, savedSearchController.listSavedSearches);
+router.post('/saved-searches', requireUser, savedSearchController.createSavedSearch);
+router.delete('/saved-searches/:id', requireUser, savedSearchController.deleteSavedSearch);
+
+module.exports = router;
@@ -1,14 +1,27 @@
 const express = require('express');
 const router = express.Router();
 const searchController = require('../controllers/searchController');
+const { cached } = require('../utils/cacheMiddleware');
+
+// Cursor pages depend on a point-in-time and are never cached
+const isCursorRequest = (req) => req.query.cursor !== undefined;
 
 // Search aircraft with filters
-router.get('/aircraft', searchController.searchAircraft);
+router.get('/aircraft', cached({ skip: isCursorRequest }), searchController.searchAircraft);
+
+// Histogram statistics for a filter set (cached; separate from hit paging)
+router.get('/aircraft/statistics', cached(), searchController.getSearchStatistics);
+
+// Stream all matches as NDJSON or CSV (?format=csv)
+router.get('/aircraft/export', searchController.exportAircraft);
+
+// Type-ahead suggestions (?field=manufacturer|model|registration|n_number|owner&prefix=)
+router.get('/suggest', cached(), searchController.suggest);
 
 // Get single aircraft by ID
 router.get('/aircraft/:id', searchController.getAircraftById);
 
 // Get manufacturer-state combinations for picker
-router.get('/manufacturer-state-combinations', searchController.getManufacturerStateCombinations);
+router.get('/manufacturer-state-combinations', cached(), searchController.getManufacturerStateCombinations);
 
 module.exports = router;
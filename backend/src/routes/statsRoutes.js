@@ -1,8 +1,9 @@
 const express = require('express');
 const router = express.Router();
 const statsController = require('../controllers/statsController');
+const { cached } = require('../utils/cacheMiddleware');
 
 // Get aggregate statistics
-router.get('/statistics', statsController.getStatistics);
+router.get('/statistics', cached(), statsController.getStatistics);
 
 module.exports = router;
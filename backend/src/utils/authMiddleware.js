@@ -0,0 +1,36 @@
+// Caller identity for per-user endpoints. Never taken from the request body or
+// query: either a JWT verified with JWT_SECRET (Authorization: Bearer ...) or,
+// behind an auth proxy that sets it and strips client copies, AUTH_USER_HEADER.
+const jwt = require('jsonwebtoken');
+
+const JWT_SECRET = process.env.JWT_SECRET;
+const AUTH_USER_HEADER = (process.env.AUTH_USER_HEADER || '').toLowerCase();
+
+const userFromToken = (req) => {
+  const [scheme, token] = (req.headers.authorization || '').split(' ');
+  if (scheme !== 'Bearer' || !token) return null;
+  try {
+    const payload = jwt.verify(token, JWT_SECRET);
+    return typeof payload.sub === 'string' ? payload.sub : null;
+  } catch (error) {
+    return null;
+  }
+};
+
+// Sets req.user or answers 401 (503 when no identity source is configured)
+const requireUser = (req, res, next) => {
+  if (!JWT_SECRET && !AUTH_USER_HEADER) {
+    return res.status(503).json({ error: 'Authentication is not configured (set JWT_SECRET or AUTH_USER_HEADER)' });
+  }
+
+  const user = JWT_SECRET ? userFromToken(req) : (req.headers[AUTH_USER_HEADER] || '').trim();
+  if (!user) {
+    return res.status(401).json({ error: 'Authentication required' });
+  }
+  req.user = user;
+  next();
+};
+
+module.exports = {
+  requireUser
+};
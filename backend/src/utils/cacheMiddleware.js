@@ -0,0 +1,69 @@
+// Response caching for read endpoints: LRU by normalized query, invalidated
+// when the ETL marks a new index generation, with ETag / 304 support
+const crypto = require('crypto');
+const ResponseCache = require('./responseCache');
+const { currentGeneration } = require('./generation');
+const { normalizeFilters, FILTER_PARAMS } = require('./queryBuilder');
+
+const cache = new ResponseCache({
+  maxEntries: parseInt(process.env.RESPONSE_CACHE_ENTRIES || '2000'),
+  maxBytes: parseInt(process.env.RESPONSE_CACHE_MAX_BYTES || String(64 * 1024 * 1024)),
+  ttlMs: parseInt(process.env.RESPONSE_CACHE_TTL_MS || String(60 * 60 * 1000)),
+  generation: currentGeneration
+});
+
+// Path plus query with filter parameters normalized and keys sorted
+const cacheKey = (req) => {
+  const query = { ...req.query };
+  FILTER_PARAMS.forEach(name => { delete query[name]; });
+  Object.assign(query, normalizeFilters(req.query));
+  const canonical = Object.keys(query).sort()
+    .map(name => `${name}=${query[name]}`)
+    .join('&');
+  return `${req.baseUrl}${req.path}?${canonical}`;
+};
+
+const etagFor = (generation, payload) =>
+  `"${generation}-${crypto.createHash('sha1').update(payload).digest('hex').slice(0, 16)}"`;
+
+const sendEntry = (req, res, entry, status) => {
+  res.setHeader('ETag', entry.etag);
+  res.setHeader('X-Cache', status);
+  if (req.headers['if-none-match'] === entry.etag) {
+    return res.status(304).end();
+  }
+  res.type('application/json').send(entry.payload);
+};
+
+// skip(req): bypass the cache for requests that must not be cached
+const cached = ({ skip } = {}) => (req, res, next) => {
+  if (skip && skip(req)) return next();
+
+  const key = cacheKey(req);
+  const hit = cache.get(key);
+  if (hit) {
+    return sendEntry(req, res, hit, 'HIT');
+  }
+
+  // Generation at request start: a response racing a reload is tagged with
+  // the old generation and dropped by the cache's next sync
+  const generation = currentGeneration();
+  res.json = (body) => {
+    if (res.statusCode !== 200) {
+      return res.type('application/json').send(JSON.stringify(body));
+    }
+    const payload = JSON.stringify(body);
+    const entry = { payload, etag: etagFor(generation, payload) };
+    if (generation === currentGeneration()) {
+      cache.set(key, entry, payload.length);
+    }
+    return sendEntry(req, res, entry, 'MISS');
+  };
+  next();
+};
+
+module.exports = {
+  cached,
+  cache,
+  cacheKey
+};
@@ -0,0 +1,52 @@
+// Tracks the index generation the ETL marks live after each successful load
+// (etl/loaders/generation_marker.py). Caches compare against it to drop
+// responses computed from older data.
+const { Client } = require('@elastic/elasticsearch');
+const mappingFeatures = require('./mappingFeatures');
+
+const esClient = new Client({
+  node: process.env.ELASTICSEARCH_NODE
+});
+
+const META_INDEX = process.env.ELASTICSEARCH_META_INDEX || 'transport-meta';
+const POLL_MS = parseInt(process.env.GENERATION_POLL_MS || '15000');
+
+// 'none' until a marker exists (or while it cannot be read)
+let current = 'none';
+let timer = null;
+// Generation the mapping features were last checked for
+let checked = null;
+
+const refresh = async () => {
+  try {
+    const result = await esClient.get({ index: META_INDEX, id: 'generation' });
+    current = result._source.generation;
+  } catch (error) {
+    if (error.meta?.statusCode === 404) {
+      current = 'none';
+    } else {
+      console.error('Generation marker check failed:', error.message);
+    }
+  }
+  // A new generation may be served by a newly created index
+  if (current !== checked) {
+    checked = current;
+    await mappingFeatures.refresh(esClient);
+  }
+  return current;
+};
+
+const startPolling = () => {
+  if (timer) return;
+  refresh();
+  timer = setInterval(refresh, POLL_MS);
+  timer.unref();
+};
+
+const currentGeneration = () => current;
+
+module.exports = {
+  currentGeneration,
+  refresh,
+  startPolling
+};
@@ -0,0 +1,45 @@
+// Optional fields of the transport mapping that queries may rely on.
+// Indices created before a field existed keep the older query shape until
+// they are recreated and reloaded (create_indices.py, then run_etl.py);
+// checked whenever the ETL marks a new generation live (see generation.js).
+
+// Derived "Manufacturer|STATE" key (etl/models/common.py manufacturer_state_key)
+const PAIR_KEY_FIELD = 'manufacturer_state';
+
+let pairKeys = false;
+
+// True if every concrete index in a getFieldMapping response maps the field
+const mapsField = (response, field) => {
+  const indices = Object.values(response || {});
+  return indices.length > 0 && indices.every(index => Boolean(index.mappings?.[field]));
+};
+
+const setPairKeys = (value) => {
+  pairKeys = value;
+};
+
+// Re-read the mapping of the served index/alias; keeps the previous answer
+// if the check fails
+const refresh = async (esClient, index = process.env.ELASTICSEARCH_INDEX) => {
+  try {
+    const response = await esClient.indices.getFieldMapping({ index, fields: PAIR_KEY_FIELD });
+    const mapped = mapsField(response, PAIR_KEY_FIELD);
+    if (mapped !== pairKeys) {
+      console.log(`Combo filters use ${mapped ? `the ${PAIR_KEY_FIELD} field` : 'manufacturer/state terms'}`);
+    }
+    setPairKeys(mapped);
+  } catch (error) {
+    console.error('Mapping check failed:', error.message);
+  }
+  return pairKeys;
+};
+
+const hasPairKeys = () => pairKeys;
+
+module.exports = {
+  PAIR_KEY_FIELD,
+  mapsField,
+  refresh,
+  setPairKeys,
+  hasPairKeys
+};
@@ -0,0 +1,80 @@
+// Point-in-time + search_after helpers for deep pagination and exports
+
+const KEEP_ALIVE = process.env.PIT_KEEP_ALIVE || '2m';
+
+// Stable total order: default year sort plus a unique tiebreaker
+const CURSOR_SORT = [
+  { year: { order: 'desc', missing: '_last' } },
+  { transport_id: 'asc' }
+];
+
+// Cursors are opaque to clients: base64url JSON of { pit, after }
+const encodeCursor = (pitId, after) =>
+  Buffer.from(JSON.stringify({ pit: pitId, after })).toString('base64url');
+
+const decodeCursor = (cursor) => {
+  try {
+    const { pit, after } = JSON.parse(Buffer.from(cursor, 'base64url').toString('utf8'));
+    if (typeof pit !== 'string' || !Array.isArray(after)) return null;
+    return { pit, after };
+  } catch (error) {
+    return null;
+  }
+};
+
+const openPit = async (esClient, index) => {
+  const result = await esClient.openPointInTime({ index, keep_alive: KEEP_ALIVE });
+  return result.id;
+};
+
+const closePit = async (esClient, pitId) => {
+  try {
+    await esClient.closePointInTime({ body: { id: pitId } });
+  } catch (error) {
+    // Already expired or closed; nothing to release
+  }
+};
+
+// One page after `after` (or the first page) within a PIT
+const searchPage = (esClient, { pitId, query, size, after, source, trackTotalHits = false }) => {
+  const body = {
+    query,
+    size,
+    sort: CURSOR_SORT,
+    pit: { id: pitId, keep_alive: KEEP_ALIVE },
+    track_total_hits: trackTotalHits
+  };
+  if (after) body.search_after = after;
+  if (source) body._source = source;
+  return esClient.search({ body });
+};
+
+// Iterate every hit of a query page by page, holding one page in memory
+async function* scanHits(esClient, { index, query, pageSize = 1000, source }) {
+  let pitId = await openPit(esClient, index);
+  try {
+    let after = null;
+    while (true) {
+      const result = await searchPage(esClient, { pitId, query, size: pageSize, after, source });
+      // ES may hand back a new PIT id with each response
+      pitId = result.pit_id || pitId;
+      const hits = result.hits.hits;
+      if (hits.length === 0) return;
+      yield hits;
+      if (hits.length < pageSize) return;
+      after = hits[hits.length - 1].sort;
+    }
+  } finally {
+    await closePit(esClient, pitId);
+  }
+}
+
+module.exports = {
+  CURSOR_SORT,
+  encodeCursor,
+  decodeCursor,
+  openPit,
+  closePit,
+  searchPage,
+  scanHits
+};
@@ -0,0 +1,164 @@
+// Shared Elasticsearch query building for search, statistics and export
+// endpoints, so every endpoint interprets the filter parameters the same way
+
+const { PAIR_KEY_FIELD, hasPairKeys } = require('./mappingFeatures');
+
+const FILTER_PARAMS = [
+  'query',
+  'manufacturer',
+  'model',
+  'year_min',
+  'year_max',
+  'state',
+  'manufacturer_state_combos'
+];
+
+// Keep only filter parameters, trimmed, with combos sorted and de-duplicated
+// so equivalent requests produce the same object (and cache key)
+const normalizeFilters = (params = {}) => {
+  const filters = {};
+  FILTER_PARAMS.forEach(name => {
+    const value = params[name];
+    if (value === undefined || value === null) return;
+    const text = String(value).trim();
+    if (text) filters[name] = text;
+  });
+
+  if (filters.manufacturer_state_combos) {
+    const combos = filters.manufacturer_state_combos.split(',')
+      .map(combo => combo.split(':').map(part => part.trim()).join(':'))
+      .filter(combo => combo && combo !== ':');
+    filters.manufacturer_state_combos = [...new Set(combos)].sort().join(',');
+  }
+  if (filters.year_min) filters.year_min = String(parseInt(filters.year_min));
+  if (filters.year_max) filters.year_max = String(parseInt(filters.year_max));
+
+  return filters;
+};
+
+// Stable key for caching results of one filter set
+const filterKey = (params) => JSON.stringify(normalizeFilters(params));
+
+// Build the ES query for a set of filter parameters. pairKeys selects the
+// combo filter: one terms query on the derived manufacturer_state field, or
+// a bool of manufacturer/state terms for indices mapped before that field
+// existed (default: whatever the served index maps, see mappingFeatures.js)
+const buildQuery = (params, { pairKeys = hasPairKeys() } = {}) => {
+  const filters = normalizeFilters(params);
+  const must = [];
+
+  if (filters.query) {
+    must.push({
+      multi_match: {
+        query: filters.query,
+        fields: ['manufacturer', 'model', 'registration_id', 'plane_data.n_number']
+      }
+    });
+  }
+
+  // Handle manufacturer-state combinations (takes precedence over individual fields)
+  if (filters.manufacturer_state_combos) {
+    const combos = filters.manufacturer_state_combos.split(',').map(combo => combo.split(':'));
+    if (pairKeys) {
+      // "mfr:state" pairs -> keys of the derived manufacturer_state field
+      // ("Cessna|TX", set by the ETL), matched with a single terms query
+      must.push({ terms: { [PAIR_KEY_FIELD]: combos.map(([mfr, st]) => `${mfr}|${st}`) } });
+    } else {
+      must.push({
+        bool: {
+          should: combos.map(([mfr, st]) => ({
+            bool: {
+              must: [
+                { term: { 'manufacturer.keyword': mfr } },
+                { term: { 'location.state_province': st } }
+              ]
+            }
+          })),
+          minimum_should_match: 1
+        }
+      });
+    }
+  } else {
+    // Fallback to individual manufacturer/state (for backward compatibility)
+    if (filters.manufacturer) {
+      must.push({ term: { 'manufacturer.keyword': filters.manufacturer } });
+    }
+
+    if (filters.state) {
+      must.push({ term: { 'location.state_province': filters.state } });
+    }
+  }
+
+  if (filters.model) {
+    must.push({ match: { model: filters.model } });
+  }
+
+  if (filters.year_min || filters.year_max) {
+    const range = { year: {} };
+    if (filters.year_min) range.year.gte = parseInt(filters.year_min);
+    if (filters.year_max) range.year.lte = parseInt(filters.year_max);
+    must.push({ range });
+  }
+
+  return must.length > 0 ? { bool: { must } } : { match_all: {} };
+};
+
+const hasFilters = (params) => Object.keys(normalizeFilters(params)).length > 0;
+
+// Columns of the results table; the default "list" view returns only these
+const LIST_FIELDS = [
+  'transport_id',
+  'transport_type',
+  'registration_id',
+  'manufacturer',
+  'model',
+  'year',
+  'category',
+  'location.state_province'
+];
+
+const FIELD_PATTERN = /^[a-z_][a-z0-9_]*(\.[a-z0-9_*]+)*\*?$/;
+const MAX_FIELDS = 50;
+
+// _source filtering for a request:
+//   view=list (default)  table columns only
+//   view=full            whole document
+//   fields=a,b,-c        explicit includes, "-" prefixed excludes (overrides view)
+// Returns undefined for the full document; throws on invalid field names
+const sourceFilter = (params = {}) => {
+  if (params.fields) {
+    const names = String(params.fields).split(',').map(name => name.trim()).filter(Boolean);
+    if (names.length > MAX_FIELDS) {
+      throw new RangeError(`At most ${MAX_FIELDS} fields may be requested`);
+    }
+    const includes = [];
+    const excludes = [];
+    names.forEach(name => {
+      const exclude = name.startsWith('-');
+      const path = exclude ? name.slice(1) : name;
+      if (!FIELD_PATTERN.test(path)) {
+        throw new RangeError(`Invalid field name '${path}'`);
+      }
+      (exclude ? excludes : includes).push(path);
+    });
+    // transport_id is the row key (details link) and always returned
+    if (includes.length && !includes.includes('transport_id')) includes.push('transport_id');
+    return { includes, excludes };
+  }
+
+  if (params.view === 'full') return undefined;
+  if (params.view && params.view !== 'list') {
+    throw new RangeError(`Unknown view '${params.view}' (use list or full)`);
+  }
+  return { includes: LIST_FIELDS };
+};
+
+module.exports = {
+  FILTER_PARAMS,
+  normalizeFilters,
+  filterKey,
+  buildQuery,
+  hasFilters,
+  LIST_FIELDS,
+  sourceFilter
+};
@@ -0,0 +1,73 @@
+// In-process LRU cache bounded by entry count and approximate memory,
+// with a TTL per entry and optional invalidation on a generation change
+
+class ResponseCache {
+  constructor({
+    maxEntries = 500,
+    maxBytes = 64 * 1024 * 1024,
+    ttlMs = 5 * 60 * 1000,
+    generation = null
+  } = {}) {
+    this.maxEntries = maxEntries;
+    this.maxBytes = maxBytes;
+    this.ttlMs = ttlMs;
+    this.generation = generation;
+    this.currentGeneration = generation ? generation() : null;
+    this.entries = new Map();
+    this.bytes = 0;
+  }
+
+  // Drop everything once the data generation has moved on
+  sync() {
+    if (!this.generation) return;
+    const generation = this.generation();
+    if (generation !== this.currentGeneration) {
+      this.clear();
+      this.currentGeneration = generation;
+    }
+  }
+
+  get(key) {
+    this.sync();
+    const entry = this.entries.get(key);
+    if (!entry) return undefined;
+    if (entry.expires < Date.now()) {
+      this.delete(key);
+      return undefined;
+    }
+    // Map keeps insertion order: re-insert to mark as most recently used
+    this.entries.delete(key);
+    this.entries.set(key, entry);
+    return entry.value;
+  }
+
+  // size: approximate bytes held by value (serialized length by default)
+  set(key, value, size) {
+    this.sync();
+    const bytes = (size !== undefined ? size : Buffer.byteLength(JSON.stringify(value))) + key.length;
+    if (bytes > this.maxBytes) return;
+
+    this.delete(key);
+    this.entries.set(key, { value, bytes, expires: Date.now() + this.ttlMs });
+    this.bytes += bytes;
+
+    // Evict least recently used entries
+    while (this.entries.size > this.maxEntries || this.bytes > this.maxBytes) {
+      this.delete(this.entries.keys().next().value);
+    }
+  }
+
+  delete(key) {
+    const entry = this.entries.get(key);
+    if (!entry) return;
+    this.bytes -= entry.bytes;
+    this.entries.delete(key);
+  }
+
+  clear() {
+    this.entries.clear();
+    this.bytes = 0;
+  }
+}
+
+module.exports = ResponseCache;
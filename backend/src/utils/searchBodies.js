@@ -0,0 +1,169 @@
+// Elasticsearch request bodies of the read endpoints. Kept free of client
+// code so the ETL's workload replay (etl/workload_replay.py es_request) can be
+// checked against them (etl/test_workload_replay.py).
+
+const { buildQuery } = require('./queryBuilder');
+
+// Age bands in years, same as the ETL rollup (etl/transformers/rollups.py)
+const AGE_BANDS = [
+  ['0-10', 0, 10],
+  ['11-20', 11, 20],
+  ['21-30', 21, 30],
+  ['31-50', 31, 50],
+  ['51+', 51, null]
+];
+
+// Type-ahead targets: search_as_you_type subfield built by the ETL
+// (<field>.suggest) and the exact-value field used to de-duplicate
+const SUGGEST_TARGETS = {
+  manufacturer: { field: 'manufacturer', value: 'manufacturer.keyword' },
+  model: { field: 'model', value: 'model.keyword' },
+  registration: { field: 'registration_id', value: 'registration_id' },
+  n_number: { field: 'plane_data.n_number', value: 'plane_data.n_number' },
+  owner: { field: 'owner.name', value: 'owner.name.keyword' }
+};
+
+// One page of hits for a filter set (/aircraft)
+const searchBody = (params, { from, size, trackTotalHits, source }) => ({
+  query: buildQuery(params),
+  from,
+  size,
+  sort: [{ year: 'desc' }],
+  track_total_hits: trackTotalHits,
+  _source: source
+});
+
+// Histograms for a filter set (/aircraft/statistics)
+const searchStatisticsBody = (params) => ({
+  query: buildQuery(params),
+  size: 0,
+  track_total_hits: true,
+  aggs: {
+    by_manufacturer: {
+      terms: {
+        field: 'manufacturer.keyword',
+        size: 100,
+        order: { _count: 'desc' }
+      },
+      aggs: {
+        models: {
+          terms: {
+            field: 'model.keyword',
+            size: 100
+          }
+        }
+      }
+    },
+    by_state: {
+      terms: {
+        field: 'location.state_province',
+        size: 50
+      }
+    },
+    by_year: {
+      histogram: {
+        field: 'year',
+        interval: 1,
+        min_doc_count: 1,
+        order: { _key: 'desc' }
+      }
+    },
+    by_category: {
+      terms: {
+        field: 'category',
+        size: 20
+      }
+    }
+  }
+});
+
+// All dashboard aggregations in one size:0 request (/statistics); the total
+// comes from hits.total instead of a separate count call
+const statisticsBody = (params, referenceYear) => ({
+  query: buildQuery(params),
+  size: 0,
+  track_total_hits: true,
+  aggs: {
+    top_manufacturers: { terms: { field: 'manufacturer.keyword', size: 10 } },
+    top_states: { terms: { field: 'location.state_province', size: 10 } },
+    year_distribution: {
+      histogram: {
+        field: 'year',
+        interval: 1,
+        min_doc_count: 1,
+        order: { _key: 'desc' }
+      }
+    },
+    aircraft_types: { terms: { field: 'category', size: 10 } },
+    engine_types: { terms: { field: 'specifications.engine_type', size: 10 } },
+    owner_types: { terms: { field: 'owner.type', size: 10 } },
+    age_bands: {
+      range: {
+        field: 'year',
+        keyed: false,
+        ranges: AGE_BANDS.map(([key, low, high]) => {
+          const range = { key, to: referenceYear - low + 1 };
+          if (high !== null) range.from = referenceYear - high;
+          return range;
+        })
+      }
+    },
+    unknown_year: { missing: { field: 'year' } },
+    manufacturer_count: { cardinality: { field: 'manufacturer.keyword', precision_threshold: 3000 } },
+    state_count: { cardinality: { field: 'location.state_province' } }
+  }
+});
+
+// One page of the materialized pair index (/manufacturer-state-combinations)
+const pairSearchBody = (search, from, size) => {
+  const filter = [{ term: { transport_type: 'plane' } }];
+  const must = [];
+  if (search.length >= 2) {
+    must.push({ match: { 'manufacturer.ngram': { query: search, operator: 'and' } } });
+  } else if (search) {
+    must.push({ prefix: { manufacturer: { value: search, case_insensitive: true } } });
+  }
+  return {
+    query: { bool: { filter, must } },
+    from,
+    size,
+    track_total_hits: true,
+    sort: [
+      { manufacturer_count: 'desc' },
+      { manufacturer: 'asc' },
+      { count: 'desc' }
+    ],
+    _source: ['manufacturer', 'state', 'count']
+  };
+};
+
+// Prefix suggestions for one field (/suggest): a bool_prefix match over the
+// indexed shingles/edge n-grams, collapsed to distinct values
+const suggestBody = (target, prefix, size) => {
+  const suggestField = `${target.field}.suggest`;
+  return {
+    query: {
+      multi_match: {
+        query: prefix,
+        type: 'bool_prefix',
+        operator: 'and',
+        fields: [suggestField, `${suggestField}._2gram`, `${suggestField}._3gram`]
+      }
+    },
+    collapse: { field: target.value },
+    size,
+    track_total_hits: false,
+    _source: false,
+    fields: [target.value]
+  };
+};
+
+module.exports = {
+  AGE_BANDS,
+  SUGGEST_TARGETS,
+  searchBody,
+  searchStatisticsBody,
+  statisticsBody,
+  pairSearchBody,
+  suggestBody
+};
@@ -0,0 +1,77 @@
+// Single-flight coalescing: concurrent identical Elasticsearch requests
+// share one upstream call and its result (or error)
+const crypto = require('crypto');
+
+const DEFAULT_TIMEOUT_MS = parseInt(process.env.SINGLE_FLIGHT_TIMEOUT_MS || '30000');
+
+const inFlight = new Map();
+const stats = { calls: 0, coalesced: 0, timeouts: 0 };
+
+// JSON with object keys sorted, so equal bodies hash equally
+const stableStringify = (value) => {
+  if (Array.isArray(value)) {
+    return `[${value.map(stableStringify).join(',')}]`;
+  }
+  if (value && typeof value === 'object') {
+    return `{${Object.keys(value).sort()
+      .filter(key => value[key] !== undefined)
+      .map(key => `${JSON.stringify(key)}:${stableStringify(value[key])}`)
+      .join(',')}}`;
+  }
+  return JSON.stringify(value);
+};
+
+const requestKey = (operation, params) =>
+  crypto.createHash('sha1').update(`${operation}:${stableStringify(params)}`).digest('hex');
+
+// Run fn(signal) once per key at a time. Every caller waiting on the key gets
+// the same result; a timeout aborts the upstream call and rejects all of them,
+// and the key is released so the next request starts fresh.
+const run = (key, fn, timeoutMs = DEFAULT_TIMEOUT_MS) => {
+  const existing = inFlight.get(key);
+  if (existing) {
+    stats.coalesced++;
+    return existing;
+  }
+
+  stats.calls++;
+  const controller = new AbortController();
+  let timer;
+  const promise = new Promise((resolve, reject) => {
+    timer = setTimeout(() => {
+      stats.timeouts++;
+      controller.abort();
+      reject(new Error(`Elasticsearch request timed out after ${timeoutMs}ms`));
+    }, timeoutMs);
+    Promise.resolve().then(() => fn(controller.signal)).then(resolve, reject);
+  }).finally(() => {
+    clearTimeout(timer);
+    inFlight.delete(key);
+  });
+
+  inFlight.set(key, promise);
+  return promise;
+};
+
+// Client facade whose read calls are coalesced. Results are shared between
+// callers and must be treated as read-only.
+const coalesced = (esClient, { timeoutMs = DEFAULT_TIMEOUT_MS } = {}) => {
+  const wrap = (operation) => (params) => run(
+    requestKey(operation, params),
+    (signal) => esClient[operation](params, { signal }),
+    timeoutMs
+  );
+  return {
+    search: wrap('search'),
+    get: wrap('get'),
+    count: wrap('count')
+  };
+};
+
+module.exports = {
+  coalesced,
+  run,
+  requestKey,
+  stableStringify,
+  stats
+};
@@ -1,13 +1,21 @@
 """Create Elasticsearch indices for transportation data"""
-from elasticsearch import Elasticsearch
-import json
+import argparse
+from es_client import get_es_client
+from settings import ElasticsearchSettings
+from index_mappings import PROFILES, build_index_body
+from index_layout import IndexLayout
 
 
-def create_transport_index():
-    """Create unified transport index with mappings"""
-    es = Elasticsearch(['http://thor:30398'])
+def create_transport_index(profile: str = 'search'):
+    """
+    Create unified transport index with mappings
     
-    index_name = "transport-unified"
+    Args:
+        profile: Mapping profile from index_mappings.PROFILES
+    """
+    es = get_es_client()
+    
+    index_name = ElasticsearchSettings().index_name
     
     # Check if index already exists
     if es.indices.exists(index=index_name):
@@ -20,119 +28,12 @@ def create_transport_index():
             print("Skipping index creation")
             return
     
-    # Define index settings and mappings
-    index_body = {
-        "settings": {
-            "number_of_shards": 1,
-            "number_of_replicas": 0,
-            "analysis": {
-                "analyzer": {
-                    "transport_analyzer": {
-                        "type": "custom",
-                        "tokenizer": "standard",
-                        "filter": ["lowercase", "asciifolding"]
-                    }
-                }
-            }
-        },
-        "mappings": {
-            "properties": {
-                # Common fields
-                "transport_id": {"type": "keyword"},
-                "transport_type": {"type": "keyword"},
-                "category": {"type": "keyword"},
-                
-                # Manufacturer
-                "manufacturer": {
-                    "type": "text",
-                    "analyzer": "transport_analyzer",
-                    "fields": {
-                        "keyword": {"type": "keyword"}
-                    }
-                },
-                "manufacturer_country": {"type": "keyword"},
-                
-                # Model
-                "model": {
-                    "type": "text",
-                    "analyzer": "transport_analyzer",
-                    "fields": {
-                        "keyword": {"type": "keyword"}
-                    }
-                },
-                "model_variant": {"type": "keyword"},
-                
-                # Year
-                "year": {"type": "integer"},
-                
-                # Registration
-                "registration_id": {"type": "keyword"},
-                "registration_country": {"type": "keyword"},
-                "registration_status": {"type": "keyword"},
-                
-                # Location (nested object)
-                "location": {
-                    "properties": {
-                        "city": {"type": "keyword"},
-                        "state_province": {"type": "keyword"},
-                        "country": {"type": "keyword"},
-                        "coordinates": {"type": "geo_point"}
-                    }
-                },
-                
-                # Dates (nested object)
-                "dates": {
-                    "properties": {
-                        "manufactured": {"type": "date"},
-                        "registered": {"type": "date"},
-                        "last_activity": {"type": "date"},
-                        "expires": {"type": "date"}
-                    }
-                },
-                
-                # Owner (nested object)
-                "owner": {
-                    "properties": {
-                        "type": {"type": "keyword"},
-                        "name": {
-                            "type": "text",
-                            "fields": {"keyword": {"type": "keyword"}}
-                        },
-                        "country": {"type": "keyword"}
-                    }
-                },
-                
-                # Specifications (nested object)
-                "specifications": {
-                    "properties": {
-                        "engine_type": {"type": "keyword"},
-                        "fuel_type": {"type": "keyword"},
-                        "capacity": {"type": "integer"},
-                        "power": {"type": "object", "enabled": True}
-                    }
-                },
-                
-                # Metadata (nested object)
-                "metadata": {
-                    "properties": {
-                        "source": {"type": "keyword"},
-                        "source_id": {"type": "keyword"},
-                        "ingest_date": {"type": "date"},
-                        "last_updated": {"type": "date"}
-                    }
-                },
-                
-                # Type-specific data (stored as objects, not indexed deeply)
-                "plane_data": {"type": "object", "enabled": True},
-                "automobile_data": {"type": "object", "enabled": True},
-                "train_data": {"type": "object", "enabled": True}
-            }
-        }
-    }
+    # Settings and mappings are generated from the pydantic models
+    index_body = build_index_body(profile=profile)
     
     # Create the index
     es.indices.create(index=index_name, body=index_body)
-    print(f"✅ Created index: {index_name}")
+    print(f"✅ Created index: {index_name} (profile: {profile})")
     
     # Verify creation
     info = es.indices.get(index=index_name)
@@ -142,49 +43,35 @@ def create_transport_index():
     print(f"   - Mappings: {len(info[index_name]['mappings']['properties'])} top-level fields")
 
 
-def create_type_specific_indices():
-    """Create separate indices for each transport type (alternative approach)"""
-    es = Elasticsearch(['http://thor:30398'])
+def create_partitioned_indices(profile: str = 'search', data_nodes: int = 1):
+    """
+    Create one index per transport type behind the shared alias
     
-    indices = {
-        "planes": "transport-planes",
-        "automobiles": "transport-automobiles"
-    }
+    Shard counts come from index_layout.EXPECTED_VOLUMES; the unified index
+    name becomes an alias over all types (see index_layout.IndexLayout).
+    """
+    es = get_es_client()
+    layout = IndexLayout(alias=ElasticsearchSettings().index_name, profile=profile,
+                         data_nodes=data_nodes)
     
     print("\n" + "="*60)
-    print("Type-Specific Indices (Optional)")
+    print("Partitioned Indices")
     print("="*60)
     
-    for transport_type, index_name in indices.items():
-        if es.indices.exists(index=index_name):
-            print(f"ℹ️  Index '{index_name}' already exists, skipping")
-            continue
-        
-        # Simplified mapping (inherits from unified but type-specific)
-        index_body = {
-            "settings": {
-                "number_of_shards": 1,
-                "number_of_replicas": 0
-            },
-            "mappings": {
-                "properties": {
-                    "transport_id": {"type": "keyword"},
-                    "manufacturer": {"type": "keyword"},
-                    "model": {"type": "text"},
-                    "year": {"type": "integer"}
-                    # Additional type-specific fields would go here
-                }
-            }
-        }
-        
-        es.indices.create(index=index_name, body=index_body)
-        print(f"✅ Created type-specific index: {index_name}")
+    for plan in layout.describe():
+        print(f"📐 {plan['transport_type']}: {plan['index']} -> {plan['shards']} shards "
+              f"for ~{plan['expected_docs']:,} docs (alias {plan['alias']})")
+    
+    layout.ensure_indices(es)
+    layout.activate(es)
+    print(f"✅ Alias '{layout.alias}' covers: {', '.join(layout.indices())}")
+    return layout
 
 
-def test_index_access():
+def test_index_access(index_name: str = None):
     """Verify we can write to and read from the index"""
-    es = Elasticsearch(['http://thor:30398'])
-    index_name = "transport-unified"
+    es = get_es_client()
+    index_name = index_name or ElasticsearchSettings().index_name
     
     print("\n" + "="*60)
     print("Testing Index Operations")
@@ -221,10 +108,34 @@ def test_index_access():
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Create transport indices')
+    parser.add_argument(
+        '--profile',
+        choices=PROFILES,
+        default='search',
+        help='Mapping profile (search: tuned for backend queries, default: index every field)'
+    )
+    parser.add_argument(
+        '--partitioned',
+        action='store_true',
+        help='One index per transport type behind the unified alias'
+    )
+    parser.add_argument(
+        '--data-nodes',
+        type=int,
+        default=1,
+        help='Data nodes to plan shard counts for (partitioned layout)'
+    )
+    args = parser.parse_args()
+    
     print("\n🔧 Creating Elasticsearch Indices\n")
     
-    create_transport_index()
-    # create_type_specific_indices()  # Uncomment if you want separate indices
-    test_index_access()
+    if args.partitioned:
+        layout = create_partitioned_indices(profile=args.profile, data_nodes=args.data_nodes)
+        # GET by id needs a single concrete index
+        test_index_access(layout.index_for('plane'))
+    else:
+        create_transport_index(profile=args.profile)
+        test_index_access()
     
     print("\n✅ Elasticsearch indices are ready for data ingestion! 🎉\n")
@@ -0,0 +1,70 @@
+"""Shared Elasticsearch client factory for the ETL"""
+import logging
+from typing import List, Optional
+
+from elasticsearch import Elasticsearch
+
+from settings import ElasticsearchSettings
+
+logger = logging.getLogger(__name__)
+
+
+_shared_client: Optional[Elasticsearch] = None
+
+
+def create_es_client(settings: Optional[ElasticsearchSettings] = None,
+                     hosts: Optional[List[str]] = None, **overrides) -> Elasticsearch:
+    """
+    Build a new Elasticsearch client with its own connection pool
+
+    Args:
+        settings: Connection settings (read from ES_* environment if omitted)
+        hosts: Override the configured seed hosts
+        **overrides: Extra keyword arguments passed to Elasticsearch()
+
+    Returns:
+        Configured Elasticsearch client
+    """
+    settings = settings or ElasticsearchSettings()
+
+    options = {
+        'connections_per_node': settings.connections_per_node,
+        'http_compress': settings.http_compress,
+        'request_timeout': settings.request_timeout,
+        'max_retries': settings.max_retries,
+        'retry_on_timeout': settings.retry_on_timeout,
+        'retry_on_status': settings.retry_on_status,
+        'verify_certs': settings.verify_certs,
+    }
+
+    if settings.ca_certs:
+        options['ca_certs'] = settings.ca_certs
+    if settings.api_key:
+        options['api_key'] = settings.api_key
+    elif settings.username:
+        options['basic_auth'] = (settings.username, settings.password or '')
+
+    if settings.sniffing_enabled:
+        options.update({
+            'sniff_on_start': settings.sniff_on_start,
+            'sniff_before_requests': settings.sniff_before_requests,
+            'sniff_on_node_failure': settings.sniff_on_node_failure,
+            'sniff_timeout': settings.sniff_timeout,
+            'min_delay_between_sniffing': settings.min_delay_between_sniffing,
+        })
+
+    options.update(overrides)
+    hosts = hosts or settings.host_list
+
+    logger.debug(f"Creating Elasticsearch client for {hosts} "
+                 f"(pool={settings.connections_per_node}/node, compress={settings.http_compress}, "
+                 f"sniffing={settings.sniffing_enabled})")
+    return Elasticsearch(hosts, **options)
+
+
+def get_es_client() -> Elasticsearch:
+    """Process-wide client built from the environment settings"""
+    global _shared_client
+    if _shared_client is None:
+        _shared_client = create_es_client()
+    return _shared_client
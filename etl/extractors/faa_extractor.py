@@ -1,4 +1,5 @@
 """FAA Aircraft Registry data extractor"""
+import hashlib
 import requests
 import zipfile
 import os
@@ -165,6 +166,28 @@ class FAAExtractor:
         
         return existing
     
+    def source_checksum(self) -> Optional[str]:
+        """
+        SHA-256 of the downloaded registry ZIP (falls back to MASTER.txt)
+        
+        Returns:
+            Hex digest, or None if no source file is present
+        """
+        candidates = [
+            self.data_dir / "ReleasableAircraft.zip",
+            self.data_dir / "extracted" / "MASTER.txt"
+        ]
+        
+        for path in candidates:
+            if path.exists():
+                digest = hashlib.sha256()
+                with open(path, 'rb') as f:
+                    for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                        digest.update(chunk)
+                return digest.hexdigest()
+        
+        return None
+    
     def run(self, force_download: bool = False) -> dict:
         """
         Complete extraction process
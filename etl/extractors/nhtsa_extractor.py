@@ -0,0 +1,378 @@
+"""NHTSA vPIC VIN decoding extractor with a persistent decode cache"""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import requests
+
+from rate_limit import RateLimiter
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+VPIC_URL = "https://vpic.nhtsa.dot.gov/api/vehicles/DecodeVINValuesBatch/"
+DATA_DIR = Path("/app/data/nhtsa")
+CACHE_PATH = DATA_DIR / "vin_cache.sqlite"
+
+# vPIC accepts at most 50 VINs per DecodeVINValuesBatch call
+MAX_BATCH = 50
+
+# VIN characters; I, O and Q are never used
+VIN_ALPHABET = set("0123456789ABCDEFGHJKLMNPRSTUVWXYZ")
+
+# HTTP statuses worth retrying (throttled or transient server errors)
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+VinQuery = Tuple[str, str]  # (VIN, model year hint or '')
+
+
+def parse_vin_line(line: str) -> Optional[VinQuery]:
+    """
+    Parse one input line: ``VIN`` or ``VIN,MODEL_YEAR`` (vPIC batch syntax)
+
+    Returns:
+        (VIN, model year hint) or None for blank, header or malformed lines
+    """
+    parts = [p.strip() for p in line.strip().split(',')]
+    vin = parts[0].upper()
+    if len(vin) != 17 or not set(vin) <= VIN_ALPHABET:
+        return None
+    year = parts[1] if len(parts) > 1 and parts[1].isdigit() and len(parts[1]) == 4 else ''
+    return vin, year
+
+
+def compact_result(result: Dict[str, Any]) -> Dict[str, str]:
+    """vPIC result without its empty variables (most of the ~140 keys)"""
+    return {k: v for k, v in result.items()
+            if v not in (None, '', 'Not Applicable') or k in ('VIN', 'ErrorCode')}
+
+
+class VinDecodeCache:
+    """
+    Local SQLite cache of vPIC decode results, keyed by VIN and model year hint
+
+    Decodes are deterministic for a vPIC release, so a VIN is only sent to
+    the API once; re-runs read every known VIN from here.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS vin_decodes (
+            vin TEXT NOT NULL,
+            model_year TEXT NOT NULL DEFAULT '',
+            result TEXT NOT NULL,
+            decoder TEXT NOT NULL,
+            decoded_at TEXT NOT NULL,
+            PRIMARY KEY (vin, model_year)
+        );
+    """
+
+    # SQLite host parameter limit is 999 on older builds
+    LOOKUP_CHUNK = 450
+
+    def __init__(self, path: Path = CACHE_PATH):
+        """
+        Open (and create) the cache
+
+        Args:
+            path: SQLite database file (':memory:' for tests)
+        """
+        if str(path) != ':memory:':
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.conn = sqlite3.connect(str(path))
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(self.SCHEMA)
+
+    def get_many(self, queries: List[VinQuery]) -> Dict[VinQuery, Dict[str, Any]]:
+        """Cached results for the given (VIN, model year) queries"""
+        found = {}
+        for start in range(0, len(queries), self.LOOKUP_CHUNK):
+            chunk = queries[start:start + self.LOOKUP_CHUNK]
+            clause = " OR ".join(["(vin = ? AND model_year = ?)"] * len(chunk))
+            rows = self.conn.execute(
+                f"SELECT vin, model_year, result FROM vin_decodes WHERE {clause}",
+                [value for query in chunk for value in query]
+            )
+            for vin, year, result in rows:
+                found[(vin, year)] = json.loads(result)
+        return found
+
+    def put_many(self, results: Dict[VinQuery, Dict[str, Any]], decoder: str = 'vpic'):
+        """Store decode results (replacing older decodes of the same queries)"""
+        now = datetime.utcnow().isoformat()
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO vin_decodes (vin, model_year, result, decoder, decoded_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(vin, year, json.dumps(compact_result(r), separators=(',', ':')), decoder, now)
+                 for (vin, year), r in results.items()]
+            )
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM vin_decodes").fetchone()[0]
+
+    def close(self):
+        self.conn.close()
+
+
+class VPICClient:
+    """
+    Batched vPIC decoder with many calls in flight
+
+    Each call decodes up to 50 VINs with DecodeVINValuesBatch. Calls run on
+    a thread pool driven by asyncio (``requests`` is blocking); a semaphore
+    bounds calls in flight and a shared token bucket bounds calls per
+    second, since vPIC throttles aggressive clients.
+    """
+
+    name = 'vpic'
+    cacheable = True  # Network decodes are worth keeping (see VinDecodeCache)
+
+    def __init__(self, url: str = VPIC_URL, concurrency: int = 8,
+                 requests_per_second: Optional[float] = 5.0,
+                 batch_size: int = MAX_BATCH, max_retries: int = 3,
+                 timeout: Tuple[float, float] = (10, 60)):
+        """
+        Initialize client
+
+        Args:
+            url: DecodeVINValuesBatch endpoint
+            concurrency: Batch calls in flight
+            requests_per_second: Call rate across all workers (None = unlimited)
+            batch_size: VINs per call (at most 50)
+            max_retries: Attempts per call on throttling/transient errors
+            timeout: (connect, read) timeouts in seconds
+        """
+        self.url = url
+        self.concurrency = concurrency
+        self.batch_size = min(batch_size, MAX_BATCH)
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.limiter = RateLimiter(requests_per_second,
+                                   burst=min(concurrency, requests_per_second or concurrency))
+        self.session = requests.Session()
+        self.session.headers.update({
+            'User-Agent': 'Mozilla/5.0 (Transportation Portal ETL)',
+        })
+        self.session.mount('https://', requests.adapters.HTTPAdapter(pool_maxsize=concurrency))
+        self.session.mount('http://', requests.adapters.HTTPAdapter(pool_maxsize=concurrency))
+
+    def _post(self, batch: List[VinQuery]) -> List[Dict[str, Any]]:
+        """One DecodeVINValuesBatch call with retry/backoff (runs in a worker thread)"""
+        data = ';'.join(f"{vin},{year}" if year else vin for vin, year in batch)
+        for attempt in range(self.max_retries):
+            self.limiter.acquire(1)
+            wait = 2 ** attempt
+            try:
+                response = self.session.post(self.url, data={'format': 'json', 'data': data},
+                                             timeout=self.timeout)
+                if response.status_code not in RETRY_STATUSES:
+                    response.raise_for_status()
+                    return response.json()['Results']
+                reason = f"HTTP {response.status_code}"
+                retry_after = response.headers.get('Retry-After', '')
+                if retry_after.isdigit():
+                    wait = max(wait, int(retry_after))
+            except (requests.ConnectionError, requests.Timeout) as e:
+                reason = str(e)
+            if attempt < self.max_retries - 1:
+                logger.warning(f"⚠️  vPIC call failed ({reason}), retrying in {wait}s...")
+                time.sleep(wait)
+        raise requests.HTTPError(f"vPIC call failed after {self.max_retries} attempts ({reason})")
+
+    async def _decode(self, queries: List[VinQuery], executor: ThreadPoolExecutor
+                      ) -> Tuple[Dict[VinQuery, Dict[str, Any]], List[VinQuery]]:
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        results: Dict[VinQuery, Dict[str, Any]] = {}
+        failed: List[VinQuery] = []
+
+        async def call(batch: List[VinQuery]):
+            async with semaphore:
+                try:
+                    decoded = await loop.run_in_executor(executor, self._post, batch)
+                except (requests.RequestException, ValueError, KeyError) as e:
+                    logger.error(f"❌ Could not decode {len(batch)} VINs: {e}")
+                    failed.extend(batch)
+                    return
+            # Match results by their VIN rather than trusting the response order
+            by_vin = {vin: (vin, year) for vin, year in batch}
+            for result in decoded:
+                query = by_vin.pop(str(result.get('VIN') or '').strip().upper(), None)
+                if query is not None:
+                    results[query] = result
+            if by_vin:
+                logger.error(f"❌ vPIC returned no result for {len(by_vin)} VINs")
+                failed.extend(by_vin.values())
+
+        await asyncio.gather(*(call(batch) for batch in self._batches(queries)))
+        return results, failed
+
+    def _batches(self, queries: List[VinQuery]) -> List[List[VinQuery]]:
+        """Call-sized batches holding each VIN at most once (results are keyed by VIN)"""
+        batches, batch, vins, repeats = [], [], set(), []
+        for query in queries:
+            if query[0] in vins:
+                repeats.append(query)  # Same VIN with another model year hint
+                continue
+            batch.append(query)
+            vins.add(query[0])
+            if len(batch) == self.batch_size:
+                batches.append(batch)
+                batch, vins = [], set()
+        if batch:
+            batches.append(batch)
+        return batches + (self._batches(repeats) if repeats else [])
+
+    def decode_many(self, queries: List[VinQuery]) -> Tuple[Dict[VinQuery, Dict[str, Any]], List[VinQuery]]:
+        """
+        Decode VINs with concurrent batch calls
+
+        Args:
+            queries: (VIN, model year hint) pairs
+
+        Returns:
+            Tuple of (vPIC result by query, queries whose calls failed)
+        """
+        if not queries:
+            return {}, []
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='vpic') as executor:
+            return asyncio.run(self._decode(queries, executor))
+
+
+class NHTSAExtractor:
+    """Extract decoded vehicles for a list of VINs"""
+
+    DATA_DIR = DATA_DIR
+
+    def __init__(self, vin_path: Optional[Path] = None, cache: Optional[VinDecodeCache] = None,
+                 decoder: Any = None, window: int = 2000):
+        """
+        Initialize extractor
+
+        Args:
+            vin_path: VIN list, one ``VIN`` or ``VIN,MODEL_YEAR`` per line
+                      (DATA_DIR/vins.txt if None)
+            cache: Decode cache (DATA_DIR/vin_cache.sqlite if None)
+            decoder: Object with ``decode_many(queries)``, ``name`` and
+                     ``cacheable`` (VPICClient if None); results of
+                     non-cacheable decoders skip the cache
+            window: VINs looked up and decoded per step
+        """
+        self.data_dir = self.DATA_DIR
+        self.vin_path = Path(vin_path) if vin_path else self.data_dir / "vins.txt"
+        self.cache = cache if cache is not None else VinDecodeCache()
+        self.decoder = decoder or VPICClient()
+        self.window = window
+        self.stats = {'vins': 0, 'invalid': 0, 'cached': 0, 'decoded': 0, 'failed': 0}
+        logger.info(f"NHTSA Extractor initialized. VIN list: {self.vin_path}")
+
+    def read_vins(self, limit: Optional[int] = None) -> Iterator[VinQuery]:
+        """Distinct, well-formed VIN queries from the VIN list"""
+        seen = set()
+        with open(self.vin_path, 'r', encoding='utf-8-sig') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                query = parse_vin_line(line)
+                if query is None:
+                    self.stats['invalid'] += 1
+                    continue
+                if query in seen:
+                    continue
+                seen.add(query)
+                yield query
+                if limit and len(seen) >= limit:
+                    return
+
+    def _windows(self, queries: Iterable[VinQuery]) -> Iterator[List[VinQuery]]:
+        window = []
+        for query in queries:
+            window.append(query)
+            if len(window) >= self.window:
+                yield window
+                window = []
+        if window:
+            yield window
+
+    def _finish(self, window: List[VinQuery], cached: Dict[VinQuery, Dict[str, Any]],
+                future: Future) -> List[Dict[str, Any]]:
+        """Cache a window's new decodes and return its results in input order"""
+        decoded, failed = future.result()
+        if decoded and self.decoder.cacheable:
+            self.cache.put_many(decoded, decoder=self.decoder.name)
+        self.stats['cached'] += len(cached)
+        self.stats['decoded'] += len(decoded)
+        self.stats['failed'] += len(failed)
+        results = [cached.get(q) or decoded.get(q) for q in window]
+        return [r for r in results if r is not None]
+
+    def iter_decoded(self, limit: Optional[int] = None,
+                     cached_only: bool = False) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Stream decode results, one batch per window of the VIN list
+
+        Cached VINs are read from the cache; only the rest go to the
+        decoder, and their results are cached before they are yielded.
+        The next window decodes in the background while the caller
+        consumes the current one. VINs whose calls failed are skipped (and
+        retried on the next run).
+
+        Args:
+            limit: Optional limit on distinct VINs
+            cached_only: Skip VINs missing from the cache instead of decoding
+                         them (ignored for non-cacheable decoders)
+
+        Returns:
+            Iterator of vPIC result lists
+        """
+        self.stats = {key: 0 for key in self.stats}
+        started = time.monotonic()
+        pending = None
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix='vin-window') as background:
+            for window in self._windows(self.read_vins(limit)):
+                self.stats['vins'] += len(window)
+                cached = self.cache.get_many(window) if self.decoder.cacheable else {}
+                misses = [q for q in window if q not in cached]
+                if cached_only and self.decoder.cacheable:
+                    misses = []
+                future = background.submit(self.decoder.decode_many, misses)
+                if pending:
+                    yield self._finish(*pending)
+                pending = (window, cached, future)
+                if self.stats['vins'] % 10000 < len(window):
+                    logger.info(f"Decoding {self.stats['vins']} VINs "
+                                f"({self.stats['cached']} cached, {self.stats['decoded']} new so far)")
+            if pending:
+                yield self._finish(*pending)
+
+        elapsed = time.monotonic() - started
+        logger.info(f"✅ VIN decoding complete: {self.stats['vins']} VINs in {elapsed:.1f}s")
+        logger.info(f"   From cache: {self.stats['cached']}, decoded: {self.stats['decoded']}, "
+                    f"failed: {self.stats['failed']}, invalid lines: {self.stats['invalid']}")
+
+    def source_checksum(self) -> Optional[str]:
+        """
+        SHA-256 of the VIN list
+
+        Returns:
+            Hex digest, or None if the VIN list is missing
+        """
+        if not self.vin_path.exists():
+            return None
+        digest = hashlib.sha256()
+        with open(self.vin_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
@@ -0,0 +1,452 @@
+"""Offline VIN decoding from the vPIC standalone database's pattern tables"""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import argparse
+import json
+import logging
+import random
+import re
+import sqlite3
+import time
+from collections import defaultdict
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from extractors.nhtsa_extractor import DATA_DIR, VIN_ALPHABET, VPIC_URL, VinQuery, VPICClient, parse_vin_line
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+# vPIC standalone database converted to SQLite (NHTSA ships a SQL Server
+# backup; any conversion keeping the table and column names works)
+VPIC_DB_PATH = DATA_DIR / "vpic.sqlite"
+
+# Check digit (position 9): transliteration and position weights
+TRANSLITERATION = {
+    **{str(d): d for d in range(10)},
+    'A': 1, 'B': 2, 'C': 3, 'D': 4, 'E': 5, 'F': 6, 'G': 7, 'H': 8,
+    'J': 1, 'K': 2, 'L': 3, 'M': 4, 'N': 5, 'P': 7, 'R': 9,
+    'S': 2, 'T': 3, 'U': 4, 'V': 5, 'W': 6, 'X': 7, 'Y': 8, 'Z': 9,
+}
+WEIGHTS = [8, 7, 6, 5, 4, 3, 2, 10, 0, 9, 8, 7, 6, 5, 4, 3, 2]
+
+# Position 10 model year codes for the 1980-2009 cycle (+30 for 2010-2039)
+YEAR_CODES = {c: 1980 + i for i, c in enumerate("ABCDEFGHJKLMNPRSTVWXY123456789")}
+
+# vPIC error codes/texts used by the offline decoder
+ERRORS = {
+    '0': "0 - VIN decoded clean. Check Digit (9th position) is correct",
+    '1': "1 - Check Digit (9th position) does not calculate properly",
+    '7': "7 - Manufacturer is not registered with NHTSA for sale or importation in the U.S. "
+         "for use on U.S roads; Please contact the manufacturer directly for more information",
+    '8': "8 - No detailed data available currently",
+    '11': "11 - Incorrect Model Year - decoded data may not be accurate",
+}
+
+# Variables compared by cross_check (DecodeVINValues names)
+COMPARED_FIELDS = [
+    'Make', 'Model', 'ModelYear', 'Manufacturer', 'VehicleType', 'BodyClass', 'Series',
+    'Trim', 'Doors', 'DriveType', 'DisplacementL', 'EngineCylinders', 'FuelTypePrimary',
+    'TransmissionStyle', 'GVWR', 'PlantCountry',
+]
+
+# Distinct decodes memoized per decoder (VINs mostly differ only in the serial)
+MEMO_SIZE = 200_000
+
+
+def check_digit(vin: str) -> str:
+    """Expected position 9 check digit of a 17-character VIN"""
+    total = sum(TRANSLITERATION.get(c, 0) * w for c, w in zip(vin, WEIGHTS))
+    remainder = total % 11
+    return 'X' if remainder == 10 else str(remainder)
+
+
+def model_year(vin: str) -> Optional[int]:
+    """
+    Model year from position 10
+
+    Position 7 picks the 30-year cycle (a letter means 2010-2039 for light
+    vehicles); years more than one ahead of today fall back a cycle.
+    """
+    year = YEAR_CODES.get(vin[9])
+    if year is None:
+        return None
+    if vin[6].isalpha() and year + 30 <= datetime.utcnow().year + 1:
+        year += 30
+    return year
+
+
+def key_regex(keys: str) -> 're.Pattern':
+    """
+    Compile a Pattern.Keys string (matched like vPIC's LIKE against the VIN
+    descriptor: positions 4-8, '|', positions 10-17; '*' is any character,
+    brackets are character sets/ranges)
+    """
+    out = []
+    in_set = False
+    for c in keys:
+        if c == '[':
+            in_set = True
+            out.append(c)
+        elif c == ']':
+            in_set = False
+            out.append(c)
+        elif c == '*' and not in_set:
+            out.append('.')
+        else:
+            out.append(c if in_set else re.escape(c))
+    return re.compile(''.join(out))
+
+
+def key_length(keys: str) -> int:
+    """Descriptor characters a key spans (a bracketed set is one position)"""
+    return len(re.sub(r'\[[^\]]*\]', '#', keys))
+
+
+def specificity(keys: str) -> int:
+    """Fixed (non-wildcard) positions in a key; more specific patterns win"""
+    return len(re.sub(r'\[[^\]]*\]', '#', keys).replace('*', '').replace('|', ''))
+
+
+def _table(conn: sqlite3.Connection, name: str) -> Optional[List[sqlite3.Row]]:
+    exists = conn.execute("SELECT 1 FROM sqlite_master WHERE type IN ('table', 'view') "
+                          "AND lower(name) = lower(?)", (name,)).fetchone()
+    return conn.execute(f'SELECT * FROM "{name}"').fetchall() if exists else None
+
+
+def _names(conn: sqlite3.Connection, table: Optional[str]) -> Dict[int, str]:
+    """Id -> Name of a lookup table (empty if the table is missing)"""
+    rows = _table(conn, table) if table else None
+    return {row['Id']: row['Name'] for row in rows or []}
+
+
+class OfflineVINDecoder:
+    """
+    Decode VINs from an in-memory index of the vPIC pattern tables
+
+    Built once from the Wmi, Wmi_VinSchema, Pattern and Element tables
+    (plus lookup tables such as Make, Model, BodyStyle)::
+
+        WMI -> [(YearFrom, YearTo, schema patterns)]
+        schema patterns: [(Keys regex, specificity, Id, [(variable, value)])]
+
+    Patterns sharing a Keys string are matched once; values of lookup
+    elements are resolved at build time. For a VIN, the schemas of its WMI
+    (3 characters, or 6 for small manufacturers with '9' in position 3)
+    valid for its model year are merged and applied least specific first,
+    so the most specific match sets each variable (ties: highest Pattern.Id).
+
+    Results have the shape of vPIC DecodeVINValues results, so the decoder
+    is interchangeable with VPICClient (``decode_many``) and shares
+    NHTSATransformer for filling AutomobileData.
+    """
+
+    name = 'vpic-offline'
+    cacheable = False  # Decoding is cheaper than a cache lookup
+
+    def __init__(self, db_path: Path = VPIC_DB_PATH, memo_size: int = MEMO_SIZE):
+        """
+        Compile the pattern index
+
+        Args:
+            db_path: vPIC standalone database as SQLite
+            memo_size: Distinct VIN descriptors memoized
+        """
+        started = time.monotonic()
+        conn = sqlite3.connect(str(db_path))
+        conn.row_factory = sqlite3.Row
+        try:
+            self._compile(conn)
+        finally:
+            conn.close()
+        self._decode_descriptor = lru_cache(maxsize=memo_size)(self._decode_descriptor_uncached)
+        self._year_patterns: Dict[Tuple[str, Optional[int]], List[tuple]] = {}
+        logger.info(f"✅ Compiled vPIC index: {len(self.wmis)} WMIs, {self.pattern_count} patterns "
+                    f"in {time.monotonic() - started:.1f}s")
+
+    def _compile(self, conn: sqlite3.Connection):
+        elements = {}
+        for row in _table(conn, 'Element') or []:
+            keys = row.keys()
+            if 'IsPrivate' in keys and row['IsPrivate']:
+                continue
+            lookup = row['LookupTable'] if 'LookupTable' in keys else None
+            elements[row['Id']] = (row['Code'], _names(conn, lookup) if lookup else None)
+
+        self.makes = _names(conn, 'Make')
+        self.model_makes = {row['ModelId']: row['MakeId'] for row in _table(conn, 'Make_Model') or []}
+        manufacturers = _names(conn, 'Manufacturer')
+        vehicle_types = _names(conn, 'VehicleType')
+
+        # Schema id -> {keys: [(variable, value)]}
+        schema_keys: Dict[int, Dict[str, List[Tuple[str, str]]]] = defaultdict(lambda: defaultdict(list))
+        key_ids: Dict[Tuple[int, str], int] = {}
+        self.pattern_count = 0
+        for row in _table(conn, 'Pattern') or []:
+            element = elements.get(row['ElementId'])
+            if element is None:
+                continue
+            code, lookup = element
+            attribute = row['AttributeId']
+            keys = (row['Keys'] or '').upper()
+            values = schema_keys[row['VinSchemaId']][keys]
+            if lookup is not None:
+                try:
+                    attribute_id = int(attribute)
+                except (TypeError, ValueError):
+                    continue
+                attribute = lookup.get(attribute_id)
+                if attribute is not None and code == 'Model':
+                    values.append(('ModelID', str(attribute_id)))
+            if attribute is None:
+                continue
+            values.append((code, str(attribute)))
+            key_ids[(row['VinSchemaId'], keys)] = max(row['Id'], key_ids.get((row['VinSchemaId'], keys), 0))
+            self.pattern_count += 1
+
+        schemas = {
+            schema_id: [(key_regex(keys).match, specificity(keys), key_ids.get((schema_id, keys), 0), values)
+                        for keys, values in by_keys.items() if values]
+            for schema_id, by_keys in schema_keys.items()
+        }
+
+        wmi_rows = {row['Id']: row for row in _table(conn, 'Wmi') or []}
+        # Newer releases map WMIs to makes in Wmi_Make instead of Wmi.MakeId
+        wmi_makes = {row['WmiId']: row['MakeId'] for row in _table(conn, 'Wmi_Make') or []}
+        self.wmis: Dict[str, Dict[str, Any]] = {}
+        for row in wmi_rows.values():
+            keys = row.keys()
+            base = {'Manufacturer': manufacturers.get(row['ManufacturerId']),
+                    'ManufacturerId': row['ManufacturerId']}
+            if 'VehicleTypeId' in keys:
+                base['VehicleType'] = vehicle_types.get(row['VehicleTypeId'])
+            make_id = (row['MakeId'] if 'MakeId' in keys else None) or wmi_makes.get(row['Id'])
+            if make_id:
+                base['MakeID'] = make_id
+                base['Make'] = self.makes.get(make_id)
+            self.wmis[row['Wmi'].upper()] = {
+                'base': {k: str(v) for k, v in base.items() if v is not None},
+                'schemas': [],
+            }
+        # Descriptor positions any pattern of a WMI looks at (memo key length),
+        # at least through position 10 (model year)
+        key_lengths = {schema_id: max(map(key_length, by_keys), default=0)
+                       for schema_id, by_keys in schema_keys.items()}
+        self.key_lengths = {wmi: 7 for wmi in self.wmis}
+        for row in _table(conn, 'Wmi_VinSchema') or []:
+            wmi = wmi_rows.get(row['WmiId'])
+            if wmi is None or row['VinSchemaId'] not in schemas:
+                continue
+            code = wmi['Wmi'].upper()
+            self.wmis[code]['schemas'].append((row['YearFrom'], row['YearTo'], schemas[row['VinSchemaId']]))
+            self.key_lengths[code] = max(self.key_lengths[code], key_lengths[row['VinSchemaId']])
+
+    def wmi_of(self, vin: str) -> str:
+        """World manufacturer identifier (6 characters for small manufacturers)"""
+        return vin[:3] + vin[11:14] if vin[2] == '9' else vin[:3]
+
+    def _patterns(self, wmi: str, year: Optional[int]) -> List[tuple]:
+        """Merged patterns of a WMI's schemas valid in a model year, least specific first"""
+        key = (wmi, year)
+        if key not in self._year_patterns:
+            merged = [p for year_from, year_to, patterns in self.wmis[wmi]['schemas']
+                      if year is None or ((year_from or 0) <= year <= (year_to or 9999))
+                      for p in patterns]
+            merged.sort(key=lambda p: (p[1], p[2]))
+            self._year_patterns[key] = merged
+        return self._year_patterns[key]
+
+    def _decode_descriptor_uncached(self, wmi: str, descriptor: str,
+                                    year: Optional[int]) -> Tuple[Dict[str, str], bool]:
+        """Variables decoded from a WMI/descriptor; flag is True if any pattern matched"""
+        result = dict(self.wmis[wmi]['base'])
+        matched = False
+        for match, _, _, values in self._patterns(wmi, year):
+            if match(descriptor):
+                matched = True
+                for code, value in values:
+                    result[code] = value
+        model_id = result.get('ModelID')
+        if model_id and int(model_id) in self.model_makes:
+            make_id = self.model_makes[int(model_id)]
+            result['MakeID'] = str(make_id)
+            if make_id in self.makes:
+                result['Make'] = self.makes[make_id]
+        return result, matched
+
+    def decode(self, vin: str, year_hint: str = '') -> Dict[str, str]:
+        """
+        Decode one VIN
+
+        Args:
+            vin: 17-character VIN
+            year_hint: Known model year ('' to decode it from position 10)
+
+        Returns:
+            DecodeVINValues-style variables (names as in vPIC's Element.Code)
+        """
+        vin = vin.strip().upper()
+        if len(vin) != 17 or not set(vin) <= VIN_ALPHABET:
+            return {'VIN': vin, 'ErrorCode': '6', 'ErrorText': "6 - Incomplete VIN"}
+
+        wmi = self.wmi_of(vin)
+        if wmi not in self.wmis:
+            return {'VIN': vin, 'ErrorCode': '7', 'ErrorText': ERRORS['7']}
+
+        year = int(year_hint) if year_hint else model_year(vin)
+        descriptor = f"{vin[3:8]}|{vin[9:]}"[:self.key_lengths[wmi]]
+        variables, matched = self._decode_descriptor(wmi, descriptor, year)
+
+        errors = []
+        if vin[8] != check_digit(vin):
+            errors.append('1')
+        if year is None:
+            errors.append('11')
+        if not matched:
+            errors.append('8')
+        result = {'VIN': vin, **variables}
+        if year is not None:
+            result['ModelYear'] = str(year)
+        result['ErrorCode'] = ','.join(errors) or '0'
+        result['ErrorText'] = '; '.join(ERRORS[e] for e in errors) or ERRORS['0']
+        return result
+
+    def decode_many(self, queries: List[VinQuery]) -> Tuple[Dict[VinQuery, Dict[str, Any]], List[VinQuery]]:
+        """Decode (VIN, model year hint) queries; same interface as VPICClient.decode_many"""
+        return {(vin, year): self.decode(vin, year) for vin, year in queries}, []
+
+
+def _normalized(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    value = str(value).strip()
+    if not value or value == 'Not Applicable':
+        return None
+    try:
+        return f"{float(value):g}"  # '2.0' and '2' agree
+    except ValueError:
+        return value.casefold()
+
+
+def cross_check(offline: Any, online: Any, queries: List[VinQuery],
+                fields: Iterable[str] = COMPARED_FIELDS, max_examples: int = 20) -> Dict[str, Any]:
+    """
+    Compare two decoders on the same VINs
+
+    Args:
+        offline: Decoder under test (e.g. OfflineVINDecoder)
+        online: Reference decoder (e.g. VPICClient)
+        queries: (VIN, model year hint) sample
+        fields: Variables compared
+        max_examples: Disagreements listed in the report
+
+    Returns:
+        Report with per-field agree/disagree/missing counts, overall
+        agreement and example disagreements
+    """
+    fields = list(fields)
+    ours, _ = offline.decode_many(queries)
+    theirs, failed = online.decode_many(queries)
+
+    per_field = {f: {'agree': 0, 'disagree': 0, 'missing_offline': 0, 'extra_offline': 0} for f in fields}
+    examples = []
+    compared = 0
+    for query in queries:
+        if query not in theirs:
+            continue
+        compared += 1
+        for field in fields:
+            a = _normalized(ours.get(query, {}).get(field))
+            b = _normalized(theirs[query].get(field))
+            if a == b:
+                per_field[field]['agree'] += b is not None
+                continue
+            if a is None:
+                per_field[field]['missing_offline'] += 1
+            elif b is None:
+                per_field[field]['extra_offline'] += 1
+            else:
+                per_field[field]['disagree'] += 1
+            if len(examples) < max_examples:
+                examples.append({'vin': query[0], 'field': field,
+                                 'offline': ours.get(query, {}).get(field),
+                                 'online': theirs[query].get(field)})
+
+    compared_values = sum(sum(counts.values()) for counts in per_field.values())
+    agreed = sum(counts['agree'] for counts in per_field.values())
+    return {
+        'vins': len(queries),
+        'compared': compared,
+        'online_failed': len(failed),
+        'fields': per_field,
+        'agreement': round(agreed / compared_values, 4) if compared_values else None,
+        'examples': examples,
+    }
+
+
+def benchmark(decoder: OfflineVINDecoder, queries: List[VinQuery]) -> float:
+    """Decoded VINs per second over the given queries"""
+    started = time.perf_counter()
+    decoder.decode_many(queries)
+    elapsed = time.perf_counter() - started
+    return len(queries) / elapsed if elapsed else float('inf')
+
+
+def _read_queries(path: Path, limit: Optional[int] = None) -> List[VinQuery]:
+    queries = []
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        for line in f:
+            query = parse_vin_line(line)
+            if query:
+                queries.append(query)
+                if limit and len(queries) >= limit:
+                    break
+    return queries
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline vPIC VIN decoder')
+    parser.add_argument('command', choices=['decode', 'benchmark', 'cross-check'])
+    parser.add_argument('--db', type=Path, default=VPIC_DB_PATH, help='vPIC database (SQLite)')
+    parser.add_argument('--vin-file', type=Path, default=DATA_DIR / "vins.txt")
+    parser.add_argument('--limit', type=int, default=None, help='VINs read from --vin-file')
+    parser.add_argument('--sample', type=int, default=500, help='VINs sent to vPIC (cross-check)')
+    parser.add_argument('--vpic-url', default=VPIC_URL)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', type=Path, default=None, help='Also write the report as JSON')
+    args = parser.parse_args()
+
+    decoder = OfflineVINDecoder(args.db)
+    queries = _read_queries(args.vin_file, args.limit)
+
+    if args.command == 'decode':
+        for vin, year in queries:
+            print(json.dumps(decoder.decode(vin, year)))
+        return
+
+    if args.command == 'benchmark':
+        rate = benchmark(decoder, queries)
+        print(f"\n⚡ Decoded {len(queries)} VINs offline at {rate:,.0f} VINs/s")
+        return
+
+    sample = random.Random(args.seed).sample(queries, min(args.sample, len(queries)))
+    report = cross_check(decoder, VPICClient(args.vpic_url), sample)
+    print(f"\n🔍 Cross-checked {report['compared']} VINs against {args.vpic_url}: "
+          f"{report['agreement']:.1%} of values agree")
+    for field, counts in report['fields'].items():
+        print(f"  {field:<20} agree {counts['agree']:>6}  disagree {counts['disagree']:>6}  "
+              f"missing {counts['missing_offline']:>6}  extra {counts['extra_offline']:>6}")
+    for example in report['examples'][:10]:
+        print(f"  ≠ {example['vin']} {example['field']}: {example['offline']!r} vs {example['online']!r}")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n📄 Report written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
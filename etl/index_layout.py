@@ -0,0 +1,257 @@
+"""Partitioned index layout: one index per transport type behind shared aliases"""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import logging
+import math
+from typing import Any, Dict, List, Optional
+
+from elasticsearch import Elasticsearch
+
+from index_mappings import build_index_body
+from models import PlaneTransport, AutomobileTransport
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+MODELS_BY_TYPE = {
+    'plane': PlaneTransport,
+    'automobile': AutomobileTransport,
+}
+
+# Planning inputs per transport type: expected documents and average
+# on-disk bytes per document (see index_size_report.py for measuring the
+# latter). The FAA registry is ~300k aircraft; NHTSA vehicle data is
+# orders of magnitude larger.
+EXPECTED_VOLUMES = {
+    'plane': {'docs': 400_000, 'doc_bytes': 1_200},
+    'automobile': {'docs': 300_000_000, 'doc_bytes': 1_500},
+}
+
+# Keep primaries in the commonly recommended 10-50 GB range and well
+# below Lucene's 2^31 documents-per-shard limit
+TARGET_SHARD_BYTES = 30 * 1024 ** 3
+MAX_DOCS_PER_SHARD = 200_000_000
+
+# Headroom for growth until the next re-plan (new snapshot generation)
+GROWTH_FACTOR = 1.5
+
+
+def plan_shards(docs: int, doc_bytes: int, data_nodes: int = 1,
+                target_shard_bytes: int = TARGET_SHARD_BYTES,
+                max_docs_per_shard: int = MAX_DOCS_PER_SHARD,
+                growth: float = GROWTH_FACTOR) -> int:
+    """
+    Number of primary shards for an index of the expected size
+
+    Args:
+        docs: Expected document count
+        doc_bytes: Average on-disk bytes per document
+        data_nodes: Data nodes the shards spread over; multi-shard plans are
+                    rounded up to a multiple of this so nodes stay balanced
+        target_shard_bytes: Desired primary shard size
+        max_docs_per_shard: Upper bound on documents per shard
+        growth: Multiplier applied to docs for headroom
+
+    Returns:
+        Primary shard count (at least 1)
+    """
+    expected_docs = docs * growth
+    shards = max(
+        1,
+        math.ceil(expected_docs * doc_bytes / target_shard_bytes),
+        math.ceil(expected_docs / max_docs_per_shard),
+    )
+    if shards > 1 and data_nodes > 1:
+        shards = math.ceil(shards / data_nodes) * data_nodes
+    return shards
+
+
+class IndexLayout:
+    """
+    Index naming, creation and alias management for a partitioned layout
+
+    Each transport type gets its own concrete index, optionally suffixed
+    with a source snapshot generation::
+
+        transport-plane-<generation>        (concrete index)
+        transport-planes                    (per-type alias, read)
+        transport-unified                   (shared alias over all types)
+
+    Documents are routed to the concrete index of their transport_type, so
+    queries against ``transport-planes`` never touch automobile shards while
+    ``transport-unified`` keeps serving cross-type searches.
+
+    A layout can cover only the types one source loads (``types``): it then
+    creates and switches only those types' indices, and the other types'
+    current indices stay on the shared alias untouched.
+    """
+
+    def __init__(self, alias: str = "transport-unified", prefix: str = "transport",
+                 generation: Optional[str] = None, profile: str = 'search',
+                 replicas: int = 0, data_nodes: int = 1,
+                 volumes: Optional[Dict[str, Dict[str, int]]] = None,
+                 types: Optional[List[str]] = None):
+        """
+        Initialize layout
+
+        Args:
+            alias: Shared alias over every transport type
+            prefix: Prefix for concrete indices and per-type aliases
+            generation: Snapshot generation suffix (e.g. source checksum);
+                        a fixed 'v1' index per type is used when None
+            profile: Mapping profile from index_mappings.PROFILES
+            replicas: Replicas per index
+            data_nodes: Data nodes available for shard planning
+            volumes: Expected docs/doc_bytes per type (EXPECTED_VOLUMES)
+            types: Transport types this layout loads (all if None)
+        """
+        unknown = set(types or []) - set(MODELS_BY_TYPE)
+        if unknown:
+            raise ValueError(f"No index for transport type(s) {', '.join(sorted(unknown))}")
+        self.alias = alias
+        self.prefix = prefix
+        self.generation = generation or 'v1'
+        self.profile = profile
+        self.replicas = replicas
+        self.data_nodes = data_nodes
+        self.volumes = {**EXPECTED_VOLUMES, **(volumes or {})}
+        self.types = [t for t in MODELS_BY_TYPE if t in types] if types else list(MODELS_BY_TYPE)
+
+    @property
+    def transport_types(self) -> List[str]:
+        return list(self.types)
+
+    def index_for(self, transport_type: str) -> str:
+        """Concrete index for one transport type in this generation"""
+        if transport_type not in self.types:
+            raise ValueError(f"No index for transport type '{transport_type}'")
+        return f"{self.prefix}-{transport_type}-{self.generation}"
+
+    def type_of(self, index_name: str) -> Optional[str]:
+        """Transport type of a concrete index of this layout's naming (None if foreign)"""
+        for transport_type in MODELS_BY_TYPE:
+            if index_name.startswith(f"{self.prefix}-{transport_type}-"):
+                return transport_type
+        return None
+
+    def type_alias(self, transport_type: str) -> str:
+        """Read alias for one transport type (e.g. transport-planes)"""
+        return f"{self.prefix}-{transport_type}s"
+
+    def route(self, doc: Dict[str, Any]) -> str:
+        """Concrete index a document belongs in"""
+        return self.index_for(doc['transport_type'])
+
+    def indices(self) -> List[str]:
+        """All concrete indices of this generation"""
+        return [self.index_for(t) for t in self.transport_types]
+
+    def shards_for(self, transport_type: str) -> int:
+        volume = self.volumes[transport_type]
+        return plan_shards(volume['docs'], volume['doc_bytes'], data_nodes=self.data_nodes)
+
+    def index_body(self, transport_type: str) -> Dict[str, Any]:
+        """Creation body for one type's index, mapping only that model"""
+        return build_index_body(
+            profile=self.profile,
+            shards=self.shards_for(transport_type),
+            replicas=self.replicas,
+            models=[MODELS_BY_TYPE[transport_type]]
+        )
+
+    def ensure_indices(self, es: Elasticsearch) -> List[str]:
+        """
+        Create this generation's concrete indices that do not exist yet
+
+        Returns:
+            Names of the indices created
+        """
+        if es.indices.exists(index=self.alias) and not es.indices.exists_alias(name=self.alias):
+            raise RuntimeError(
+                f"'{self.alias}' is a concrete index; delete or reindex it before "
+                f"switching to the partitioned layout (the name becomes an alias)"
+            )
+
+        created = []
+        for transport_type in self.transport_types:
+            index_name = self.index_for(transport_type)
+            if es.indices.exists(index=index_name):
+                continue
+            es.indices.create(index=index_name, body=self.index_body(transport_type))
+            logger.info(f"✅ Created index {index_name} "
+                        f"({self.shards_for(transport_type)} shards, profile: {self.profile})")
+            created.append(index_name)
+        return created
+
+    def _aliased_indices(self, es: Elasticsearch, alias: str) -> List[str]:
+        if not es.indices.exists_alias(name=alias):
+            return []
+        return list(es.indices.get_alias(name=alias))
+
+    def activate(self, es: Elasticsearch, delete_previous: bool = False) -> List[str]:
+        """
+        Point the shared and per-type aliases at this generation
+
+        All alias moves happen in one atomic update_aliases call, so readers
+        switch from the previous generation to this one without a gap. Only
+        this layout's types move; indices of other types stay on the shared
+        alias (and are never deleted).
+
+        Args:
+            es: Elasticsearch client
+            delete_previous: Delete the indices the aliases pointed at before
+
+        Returns:
+            Indices that were detached from the aliases
+        """
+        current = set(self.indices())
+        previous = set()
+        actions = []
+
+        for transport_type in self.transport_types:
+            index_name = self.index_for(transport_type)
+            type_alias = self.type_alias(transport_type)
+            for old in self._aliased_indices(es, type_alias):
+                if old not in current:
+                    actions.append({'remove': {'index': old, 'alias': type_alias}})
+                    previous.add(old)
+            actions.append({'add': {'index': index_name, 'alias': type_alias}})
+            actions.append({'add': {'index': index_name, 'alias': self.alias}})
+
+        covers_all = set(self.types) == set(MODELS_BY_TYPE)
+        for old in self._aliased_indices(es, self.alias):
+            old_type = self.type_of(old)
+            if old_type is None and not covers_all:
+                continue
+            if old_type is not None and old_type not in self.types:
+                continue
+            if old not in current:
+                actions.append({'remove': {'index': old, 'alias': self.alias}})
+                previous.add(old)
+
+        es.indices.update_aliases(actions=actions)
+        logger.info(f"✅ Aliases {self.alias}, "
+                    f"{', '.join(self.type_alias(t) for t in self.transport_types)} "
+                    f"-> generation {self.generation}")
+
+        if delete_previous and previous:
+            es.indices.delete(index=','.join(sorted(previous)))
+            logger.info(f"🗑️  Deleted previous indices: {', '.join(sorted(previous))}")
+
+        return sorted(previous)
+
+    def describe(self) -> List[Dict[str, Any]]:
+        """Planned indices with their shard counts (for logs and dry runs)"""
+        return [
+            {
+                'transport_type': t,
+                'index': self.index_for(t),
+                'alias': self.type_alias(t),
+                'shards': self.shards_for(t),
+                'expected_docs': self.volumes[t]['docs'],
+            }
+            for t in self.transport_types
+        ]
@@ -0,0 +1,283 @@
+"""Generate Elasticsearch index settings/mappings from the transport models"""
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, Literal, Optional, Sequence, Type, Union, get_args, get_origin
+
+from pydantic import BaseModel
+
+from models import PlaneTransport, AutomobileTransport
+
+
+# default: index every field
+# search:  tuned for the backend's queries
+# storage: search + smaller on-disk footprint (codec, trimmed _source, no norms)
+PROFILES = ('default', 'search', 'storage')
+
+TRANSPORT_MODELS = (PlaneTransport, AutomobileTransport)
+
+# Type-specific objects without a model yet; kept in _source only
+UNMODELED_OBJECTS = ('train_data',)
+
+# Fields the loader adds to every document (not part of the models)
+LOADER_FIELDS = {
+    'doc_hash': {"type": "keyword", "index": False},
+    # Reconciliation: filtered/grouped by bucket, hash summed per bucket
+    'recon_bucket': {"type": "integer"},
+    'doc_hash32': {"type": "long", "index": False},
+}
+
+ANALYSIS = {
+    "analyzer": {
+        "transport_analyzer": {
+            "type": "custom",
+            "tokenizer": "standard",
+            "filter": ["lowercase", "asciifolding"]
+        }
+    }
+}
+
+# Full-text fields (text + keyword subfield)
+TEXT_FIELDS = {
+    'manufacturer': {"analyzer": "transport_analyzer"},
+    'model': {"analyzer": "transport_analyzer"},
+    'owner.name': {},
+}
+
+# Type-ahead fields: a search_as_you_type subfield (``<path>.suggest``) is
+# built at index time so each keystroke is a prefix lookup on indexed
+# shingles/edge n-grams instead of a wildcard scan (backend /suggest)
+SUGGEST_FIELDS = frozenset({
+    'manufacturer',
+    'model',
+    'registration_id',
+    'plane_data.n_number',
+    'owner.name',
+})
+
+SUGGEST_SUBFIELD = {
+    "type": "search_as_you_type",
+    "analyzer": "transport_analyzer",
+    "max_shingle_size": 3,
+}
+
+# Fields whose model type does not map to the right ES type on its own
+TYPE_OVERRIDES = {
+    'location.coordinates': {"type": "geo_point"},
+}
+
+# Fields the backend filters, sorts, aggregates or matches on. In the
+# search profile everything else is kept in _source but not indexed.
+QUERIED_FIELDS = frozenset({
+    'transport_id',
+    'transport_type',
+    'category',
+    'manufacturer',
+    'manufacturer_state',
+    'model',
+    'year',
+    'registration_id',
+    'location.state_province',
+    'metadata.source',
+    'plane_data.n_number',
+    'owner.name',
+    'owner.type',
+    'specifications.engine_type',
+})
+
+# terms aggregations run on every search / dashboard view
+HOT_AGGREGATION_FIELDS = frozenset({
+    'manufacturer.keyword',
+    'location.state_province',
+    'category',
+})
+
+# Default sort of searchAircraft
+INDEX_SORT = {"field": ["year"], "order": ["desc"], "missing": ["_last"]}
+
+# plane_data fields the portal displays (frontend Aircraft model); the
+# storage profile keeps only these in _source
+PORTAL_PLANE_FIELDS = frozenset({
+    'n_number',
+    'serial_number',
+    'aircraft_type',
+    'engine_count',
+    'engine_manufacturer',
+    'engine_model',
+})
+
+# Whole subtrees the portal never reads; always rebuildable from snapshots
+STORAGE_SOURCE_EXCLUDES = ['metadata.ingest_date', 'metadata.last_updated', 'dates.*']
+
+
+def _unwrap(annotation: Any) -> Any:
+    """Strip Optional[...] and return the inner annotation"""
+    if get_origin(annotation) is Union:
+        args = [a for a in get_args(annotation) if a is not type(None)]
+        if len(args) == 1:
+            return args[0]
+    return annotation
+
+
+def _leaf_type(annotation: Any) -> Dict[str, Any]:
+    """Map a scalar model annotation to an ES field type"""
+    annotation = _unwrap(annotation)
+    origin = get_origin(annotation)
+
+    if origin is Literal:
+        return {"type": "keyword"}
+    if annotation is bool:
+        return {"type": "boolean"}
+    if annotation is int:
+        return {"type": "integer"}
+    if annotation is float:
+        return {"type": "float"}
+    if annotation in (date, datetime):
+        return {"type": "date"}
+    if annotation is dict or origin is dict:
+        return {"type": "object"}
+    return {"type": "keyword"}
+
+
+def _nested_model(annotation: Any) -> Optional[Type[BaseModel]]:
+    for candidate in (annotation, *get_args(annotation)):
+        if isinstance(candidate, type) and issubclass(candidate, BaseModel):
+            return candidate
+    return None
+
+
+def _field_mapping(path: str, annotation: Any, profile: str) -> Dict[str, Any]:
+    """Mapping for one leaf field under the given profile"""
+    tuned = profile in ('search', 'storage')
+
+    if path in TEXT_FIELDS:
+        keyword = {"type": "keyword"}
+        if tuned and f"{path}.keyword" in HOT_AGGREGATION_FIELDS:
+            keyword["eager_global_ordinals"] = True
+        mapping = {"type": "text", **TEXT_FIELDS[path], "fields": {"keyword": keyword}}
+        if profile == 'storage':
+            # Short name-like values: length normalization adds nothing to scoring
+            mapping["norms"] = False
+        return _with_suggest(path, mapping)
+
+    mapping = dict(TYPE_OVERRIDES.get(path) or _leaf_type(annotation))
+
+    if tuned:
+        if mapping["type"] == "object":
+            # Free-form dicts (power, ...) stay in _source without mapping growth
+            mapping["enabled"] = False
+        elif path not in QUERIED_FIELDS and mapping["type"] != "geo_point":
+            mapping["index"] = False
+            mapping["doc_values"] = False
+        elif path in HOT_AGGREGATION_FIELDS:
+            mapping["eager_global_ordinals"] = True
+
+    return _with_suggest(path, mapping)
+
+
+def _with_suggest(path: str, mapping: Dict[str, Any]) -> Dict[str, Any]:
+    """Add the type-ahead subfield to SUGGEST_FIELDS (all profiles)"""
+    if path in SUGGEST_FIELDS:
+        mapping.setdefault("fields", {})["suggest"] = dict(SUGGEST_SUBFIELD)
+    return mapping
+
+
+def model_properties(model_cls: Type[BaseModel], profile: str = 'search',
+                     prefix: str = '') -> Dict[str, Any]:
+    """
+    Build mapping properties for a pydantic model
+
+    Args:
+        model_cls: Pydantic model class
+        profile: One of PROFILES
+        prefix: Dotted path of the model within the document
+
+    Returns:
+        Mapping ``properties`` dictionary
+    """
+    properties = {}
+    for name, field in model_cls.model_fields.items():
+        path = f"{prefix}{name}"
+        nested = _nested_model(field.annotation)
+        if nested is not None:
+            properties[name] = {"properties": model_properties(nested, profile, f"{path}.")}
+        else:
+            properties[name] = _field_mapping(path, field.annotation, profile)
+    return properties
+
+
+def build_mappings(profile: str = 'search',
+                   models: Sequence[Type[BaseModel]] = TRANSPORT_MODELS) -> Dict[str, Any]:
+    """
+    Build the ``mappings`` section for one or more transport models
+
+    Common TransportBase fields are shared; each model contributes its own
+    type-specific object (plane_data, automobile_data).
+    """
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown mapping profile '{profile}' (choose from {', '.join(PROFILES)})")
+
+    properties: Dict[str, Any] = {}
+    for model_cls in models:
+        properties.update(model_properties(model_cls, profile))
+
+    for name in UNMODELED_OBJECTS:
+        properties.setdefault(name, {"type": "object", "enabled": profile == 'default'})
+
+    for name, mapping in LOADER_FIELDS.items():
+        properties.setdefault(name, dict(mapping))
+
+    mappings: Dict[str, Any] = {"properties": properties}
+    if profile != 'default':
+        # Unknown fields stay in _source but never create new mappings
+        mappings["dynamic"] = False
+    if profile == 'storage':
+        mappings["_source"] = {"excludes": source_excludes(models)}
+    return mappings
+
+
+def source_excludes(models: Sequence[Type[BaseModel]] = TRANSPORT_MODELS) -> list:
+    """_source excludes for the storage profile"""
+    excludes = list(STORAGE_SOURCE_EXCLUDES)
+    if any('plane_data' in m.model_fields for m in models):
+        plane_data = PlaneTransport.model_fields['plane_data'].annotation
+        excludes.extend(f"plane_data.{name}" for name in plane_data.model_fields
+                        if name not in PORTAL_PLANE_FIELDS)
+    return excludes
+
+
+def build_index_body(profile: str = 'search', shards: int = 1, replicas: int = 0,
+                     models: Sequence[Type[BaseModel]] = TRANSPORT_MODELS) -> Dict[str, Any]:
+    """
+    Build a complete index creation body (settings + mappings)
+
+    Args:
+        profile: Mapping profile name
+        shards: Number of primary shards
+        replicas: Number of replicas
+        models: Transport models stored in the index
+
+    Returns:
+        Body for ``indices.create``
+    """
+    settings: Dict[str, Any] = {
+        "number_of_shards": shards,
+        "number_of_replicas": replicas,
+        "analysis": ANALYSIS,
+    }
+    if profile != 'default':
+        settings["index"] = {"sort": INDEX_SORT}
+    if profile == 'storage':
+        settings["index"]["codec"] = "best_compression"
+
+    return {"settings": settings, "mappings": build_mappings(profile, models)}
+
+
+def iter_field_paths(properties: Dict[str, Any], prefix: str = '') -> Iterable[str]:
+    """Yield dotted paths of every mapped leaf field (including multi-fields)"""
+    for name, mapping in properties.items():
+        path = f"{prefix}{name}"
+        if "properties" in mapping:
+            yield from iter_field_paths(mapping["properties"], f"{path}.")
+            continue
+        yield path
+        for sub in mapping.get("fields", {}):
+            yield f"{path}.{sub}"
@@ -0,0 +1,114 @@
+"""Compare on-disk index size per document across mapping profiles"""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import argparse
+import json
+import logging
+from typing import Dict, List
+
+from es_client import get_es_client
+from index_mappings import PROFILES, build_index_body
+from loaders.elasticsearch_loader import ElasticsearchLoader
+from synthetic_data import generate_planes
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def load_records(source: str, count: int) -> List:
+    """Get records from the synthetic generator or the extracted FAA files"""
+    if source == 'synthetic':
+        logger.info(f"Generating {count} synthetic FAA records")
+        return generate_planes(count)
+
+    from extractors.faa_extractor import FAAExtractor
+    from transformers.faa_transformer import FAATransformer
+
+    files = FAAExtractor().get_files()
+    if 'master' not in files:
+        raise FileNotFoundError("FAA files not extracted. Run faa_extractor.py first!")
+    transformer = FAATransformer()
+    transformer.load_reference_data(files['aircraft_ref'], files['engine'])
+    return transformer.transform_file(files['master'], limit=count, compact=True)
+
+
+def measure_profile(es, profile: str, records: List, keep: bool = False) -> Dict:
+    """
+    Load records into a scratch index built with one profile and measure it
+
+    Returns:
+        Dictionary with doc count, store bytes and bytes per document
+    """
+    index_name = f"transport-size-{profile}"
+    if es.indices.exists(index=index_name):
+        es.indices.delete(index=index_name)
+    es.indices.create(index=index_name, body=build_index_body(profile=profile))
+
+    loader = ElasticsearchLoader(index_name=index_name, trim_documents=(profile == 'storage'))
+    source_bytes = sum(len(json.dumps(loader.to_document(r), separators=(',', ':')))
+                       for r in records)
+    loader.load_stream([records])
+
+    # Merge to one segment so sizes are comparable and not skewed by merge timing
+    es.indices.forcemerge(index=index_name, max_num_segments=1)
+    es.indices.refresh(index=index_name)
+    stats = es.indices.stats(index=index_name, metric='docs,store')
+    primaries = stats['indices'][index_name]['primaries']
+
+    docs = primaries['docs']['count']
+    store_bytes = primaries['store']['size_in_bytes']
+
+    if not keep:
+        es.indices.delete(index=index_name)
+
+    return {
+        'profile': profile,
+        'docs': docs,
+        'store_bytes': store_bytes,
+        'bytes_per_doc': round(store_bytes / docs, 1) if docs else None,
+        'source_json_bytes_per_doc': round(source_bytes / len(records), 1),
+    }
+
+
+def print_report(results: List[Dict]):
+    baseline = results[0]['bytes_per_doc']
+    print(f"\n{'Profile':<10} {'Docs':>9} {'Store MB':>10} {'B/doc':>9} {'JSON B/doc':>11} {'vs ' + results[0]['profile']:>12}")
+    print("-" * 66)
+    for r in results:
+        ratio = f"{r['bytes_per_doc'] / baseline:.2f}x" if baseline else 'n/a'
+        print(f"{r['profile']:<10} {r['docs']:>9} {r['store_bytes'] / 1024 / 1024:>10.2f} "
+              f"{r['bytes_per_doc']:>9} {r['source_json_bytes_per_doc']:>11} {ratio:>12}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Index size per document by mapping profile')
+    parser.add_argument('--source', choices=['synthetic', 'faa'], default='synthetic')
+    parser.add_argument('--count', type=int, default=50000, help='Records to load per profile')
+    parser.add_argument('--profiles', nargs='+', choices=PROFILES, default=list(PROFILES))
+    parser.add_argument('--json', type=Path, default=None, help='Also write results as JSON')
+    parser.add_argument('--keep', action='store_true', help='Keep the scratch indices')
+    args = parser.parse_args()
+
+    records = load_records(args.source, args.count)
+    es = get_es_client()
+
+    results = []
+    for profile in args.profiles:
+        logger.info(f"Measuring profile '{profile}'")
+        results.append(measure_profile(es, profile, records, keep=args.keep))
+
+    print_report(results)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'source': args.source, 'count': len(records), 'results': results}, f, indent=2)
+        print(f"\n📄 Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
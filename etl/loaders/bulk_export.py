@@ -0,0 +1,386 @@
+"""Offline _bulk NDJSON export and parallel replay into Elasticsearch"""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import gzip
+import hashlib
+import io
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+MANIFEST_NAME = "manifest.json"
+FORMAT_VERSION = 1
+
+# Dashboard rollups and picker pairs of the exported run (see ExportedRollups)
+ROLLUPS_NAME = "rollups.json"
+
+COMPRESSION_SUFFIX = {
+    'gzip': '.ndjson.gz',
+    'zstd': '.ndjson.zst',
+    'none': '.ndjson',
+}
+
+
+def encode_bulk_action(doc_id: str, doc: Dict[str, Any], index: Optional[str] = None) -> bytes:
+    """
+    Encode one document as an index action/source line pair
+
+    By default the action line carries only ``_id``; the target index is
+    chosen when the payload is sent (``POST /<index>/_bulk``), so one
+    artifact can feed any number of indices or clusters. Passing ``index``
+    pins the document to a concrete index (partitioned layouts).
+    """
+    meta = {'_index': index, '_id': doc_id} if index else {'_id': doc_id}
+    action = json.dumps({'index': meta}, separators=(',', ':'))
+    source = json.dumps(doc, separators=(',', ':'), ensure_ascii=False)
+    return f"{action}\n{source}\n".encode('utf-8')
+
+
+def _require_codec(compression: str):
+    if compression not in COMPRESSION_SUFFIX:
+        raise ValueError(f"Unsupported compression '{compression}' "
+                         f"(choose from {', '.join(COMPRESSION_SUFFIX)})")
+    if compression == 'zstd' and zstandard is None:
+        raise ImportError("zstandard is required for zstd compression (pip install zstandard)")
+
+
+def _open_writer(path: Path, compression: str, level: Optional[int]) -> BinaryIO:
+    if compression == 'gzip':
+        return gzip.open(path, 'wb', compresslevel=level or 6)
+    if compression == 'zstd':
+        compressor = zstandard.ZstdCompressor(level=level or 3)
+        return compressor.stream_writer(open(path, 'wb'), closefd=True)
+    return open(path, 'wb')
+
+
+def _open_reader(path: Path, compression: str) -> BinaryIO:
+    if compression == 'gzip':
+        return gzip.open(path, 'rb')
+    if compression == 'zstd':
+        _require_codec(compression)
+        reader = zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), closefd=True)
+        return io.BufferedReader(reader)
+    return open(path, 'rb')
+
+
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class BulkExportWriter:
+    """
+    Write ready-to-send _bulk NDJSON into size-capped compressed parts
+
+    Produces ``part-00000.ndjson.gz`` (or ``.zst``) files plus a
+    ``manifest.json`` with per-part document counts, byte sizes and SHA-256
+    checksums of the compressed files.
+    """
+
+    def __init__(self, output_dir: Path, index_name: str = "transport-unified",
+                 compression: str = 'gzip', max_part_bytes: int = 64 * 1024 * 1024,
+                 level: Optional[int] = None):
+        """
+        Initialize export writer
+
+        Args:
+            output_dir: Directory for parts and manifest (created if missing)
+            index_name: Default target index recorded in the manifest
+            compression: gzip, zstd or none
+            max_part_bytes: Uncompressed NDJSON bytes per part before rotating
+            level: Codec compression level (codec default if None)
+        """
+        _require_codec(compression)
+        self.output_dir = Path(output_dir)
+        self.index_name = index_name
+        self.compression = compression
+        self.max_part_bytes = max_part_bytes
+        self.level = level
+
+        self.parts: List[Dict[str, Any]] = []
+        self._stream: Optional[BinaryIO] = None
+        self._current: Optional[Dict[str, Any]] = None
+
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        logger.info(f"Bulk export writer initialized: {self.output_dir} ({compression})")
+
+    def _start_part(self):
+        filename = f"part-{len(self.parts):05d}{COMPRESSION_SUFFIX[self.compression]}"
+        self._stream = _open_writer(self.output_dir / filename, self.compression, self.level)
+        self._current = {'file': filename, 'docs': 0, 'bytes': 0}
+
+    def _finish_part(self):
+        if self._stream is None:
+            return
+        self._stream.close()
+        path = self.output_dir / self._current['file']
+        self._current['compressed_bytes'] = path.stat().st_size
+        self._current['sha256'] = _sha256(path)
+        self.parts.append(self._current)
+        self._stream = None
+        self._current = None
+
+    def write(self, documents: Iterable[Tuple[str, Dict[str, Any]]]) -> int:
+        """
+        Append documents to the export
+
+        Args:
+            documents: Iterable of (document id, document) pairs
+
+        Returns:
+            Number of documents written
+        """
+        count = 0
+        for doc_id, doc in documents:
+            payload = encode_bulk_action(doc_id, doc)
+            if self._current is not None and \
+                    self._current['bytes'] + len(payload) > self.max_part_bytes:
+                self._finish_part()
+            if self._stream is None:
+                self._start_part()
+            self._stream.write(payload)
+            self._current['docs'] += 1
+            self._current['bytes'] += len(payload)
+            count += 1
+        return count
+
+    def close(self, extra: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Close the open part and write the manifest
+
+        Args:
+            extra: Additional metadata to store in the manifest
+
+        Returns:
+            Manifest dictionary
+        """
+        self._finish_part()
+
+        manifest = {
+            'format_version': FORMAT_VERSION,
+            'created_at': datetime.utcnow().isoformat(),
+            'index': self.index_name,
+            'compression': self.compression,
+            'total_docs': sum(p['docs'] for p in self.parts),
+            'total_bytes': sum(p['bytes'] for p in self.parts),
+            'total_compressed_bytes': sum(p['compressed_bytes'] for p in self.parts),
+            'parts': self.parts,
+        }
+        if extra:
+            manifest.update(extra)
+
+        with open(self.output_dir / MANIFEST_NAME, 'w') as f:
+            json.dump(manifest, f, indent=2)
+
+        ratio = manifest['total_bytes'] / max(manifest['total_compressed_bytes'], 1)
+        logger.info(f"✅ Exported {manifest['total_docs']} documents in {len(self.parts)} parts "
+                    f"({manifest['total_compressed_bytes'] / 1024 / 1024:.1f} MB, {ratio:.1f}x compression)")
+        return manifest
+
+
+def read_manifest(export_dir: Path) -> Dict[str, Any]:
+    """Load and sanity-check an export manifest"""
+    path = Path(export_dir) / MANIFEST_NAME
+    if not path.exists():
+        raise FileNotFoundError(f"Bulk export manifest not found: {path}")
+    with open(path) as f:
+        manifest = json.load(f)
+    if manifest.get('format_version') != FORMAT_VERSION:
+        raise ValueError(f"Unsupported bulk export format: {manifest.get('format_version')}")
+    return manifest
+
+
+class ExportedRollups:
+    """
+    Rollup and pair documents shipped with a bulk export
+
+    Offers the RollupAccumulator methods publish_load uses, so sending an
+    export publishes the same rollups and pairs as loading the run directly.
+    """
+
+    def __init__(self, rollups: List[Dict[str, Any]], pairs: List[Dict[str, Any]],
+                 transport_types: List[str]):
+        self.rollups = rollups
+        self.pairs = pairs
+        self.transport_types = transport_types
+
+    def documents(self, generation: str, source: str) -> List[Dict[str, Any]]:
+        return [{**doc, 'generation': generation, 'source': source} for doc in self.rollups]
+
+    def pair_documents(self, generation: str) -> List[Dict[str, Any]]:
+        return [{**doc, 'generation': generation} for doc in self.pairs]
+
+
+def write_export_rollups(export_dir: Path, rollups: List[Dict[str, Any]],
+                         pairs: List[Dict[str, Any]], transport_types: List[str]) -> Path:
+    """Store the run's rollup and pair documents next to the export parts"""
+    path = Path(export_dir) / ROLLUPS_NAME
+    with open(path, 'w') as f:
+        json.dump({'transport_types': transport_types, 'rollups': rollups, 'pairs': pairs}, f)
+    return path
+
+
+def read_export_rollups(export_dir: Path) -> Optional[ExportedRollups]:
+    """Rollups shipped with an export, None for exports written without them"""
+    path = Path(export_dir) / ROLLUPS_NAME
+    if not path.exists():
+        return None
+    with open(path) as f:
+        data = json.load(f)
+    return ExportedRollups(data['rollups'], data['pairs'], data['transport_types'])
+
+
+def verify_export(export_dir: Path) -> List[str]:
+    """
+    Check every part against the manifest checksums
+
+    Returns:
+        List of problems (empty if the export is intact)
+    """
+    export_dir = Path(export_dir)
+    manifest = read_manifest(export_dir)
+    problems = []
+
+    for part in manifest['parts']:
+        path = export_dir / part['file']
+        if not path.exists():
+            problems.append(f"{part['file']}: missing")
+        elif _sha256(path) != part['sha256']:
+            problems.append(f"{part['file']}: checksum mismatch")
+
+    return problems
+
+
+def iter_bulk_requests(path: Path, compression: str, docs_per_request: int) -> Iterator[Tuple[bytes, int]]:
+    """
+    Stream a part file as bulk request bodies
+
+    Yields:
+        Tuples of (NDJSON body, number of documents in body)
+    """
+    with _open_reader(path, compression) as stream:
+        buffer = bytearray()
+        docs = 0
+        for action in stream:
+            source = stream.readline()
+            buffer += action
+            buffer += source
+            docs += 1
+            if docs >= docs_per_request:
+                yield bytes(buffer), docs
+                buffer = bytearray()
+                docs = 0
+        if docs:
+            yield bytes(buffer), docs
+
+
+def send_bulk_body(es, body: bytes, index: str) -> Dict[str, int]:
+    """
+    Send one pre-encoded bulk body and count per-item outcomes
+
+    Args:
+        es: Elasticsearch client
+        body: NDJSON bulk payload (actions without _index)
+        index: Target index
+
+    Returns:
+        Dictionary with success/error counts
+    """
+    response = es.bulk(operations=body, index=index)
+    if not response.get('errors'):
+        return {'success': len(response['items']), 'errors': 0}
+
+    errors = 0
+    for item in response['items']:
+        result = next(iter(item.values()))
+        if 'error' in result:
+            if errors == 0:
+                logger.warning(f"Bulk item error: {result['error']}")
+            errors += 1
+    return {'success': len(response['items']) - errors, 'errors': errors}
+
+
+class BulkExportSender:
+    """Stream an offline bulk export into a cluster with parallel workers"""
+
+    def __init__(self, es, export_dir: Path):
+        """
+        Initialize sender
+
+        Args:
+            es: Elasticsearch client for the target cluster
+            export_dir: Directory containing manifest.json and parts
+        """
+        self.es = es
+        self.export_dir = Path(export_dir)
+        self.manifest = read_manifest(self.export_dir)
+
+    def _send_part(self, part: Dict[str, Any], index: str, docs_per_request: int) -> Dict[str, int]:
+        totals = {'success': 0, 'errors': 0}
+        path = self.export_dir / part['file']
+
+        for body, docs in iter_bulk_requests(path, self.manifest['compression'], docs_per_request):
+            try:
+                result = send_bulk_body(self.es, body, index)
+            except Exception as e:
+                logger.error(f"{part['file']}: bulk request failed: {e}")
+                result = {'success': 0, 'errors': docs}
+            totals['success'] += result['success']
+            totals['errors'] += result['errors']
+
+        logger.info(f"  {part['file']}: {totals['success']} ok, {totals['errors']} errors")
+        return totals
+
+    def send(self, index: Optional[str] = None, workers: int = 4,
+             docs_per_request: int = 1000, verify: bool = True) -> Dict[str, int]:
+        """
+        Send every part of the export
+
+        Args:
+            index: Target index (defaults to the index recorded in the manifest)
+            workers: Number of parts streamed concurrently
+            docs_per_request: Documents per _bulk request
+            verify: Verify part checksums before sending anything
+
+        Returns:
+            Dictionary with success/error counts
+        """
+        index = index or self.manifest['index']
+
+        if verify:
+            problems = verify_export(self.export_dir)
+            if problems:
+                for problem in problems:
+                    logger.error(f"❌ {problem}")
+                raise ValueError(f"Bulk export failed verification: {len(problems)} problem(s)")
+
+        logger.info(f"Sending {self.manifest['total_docs']} documents from "
+                    f"{len(self.manifest['parts'])} parts to '{index}' ({workers} workers)")
+
+        totals = {'success': 0, 'errors': 0}
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(self._send_part, part, index, docs_per_request)
+                       for part in self.manifest['parts']]
+            for future in as_completed(futures):
+                result = future.result()
+                totals['success'] += result['success']
+                totals['errors'] += result['errors']
+
+        logger.info(f"✅ Sent {totals['success']} documents, {totals['errors']} errors")
+        return totals
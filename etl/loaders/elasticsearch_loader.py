@@ -3,32 +3,157 @@ import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+import hashlib
+import json
 import logging
-from typing import List, Dict, Any
-from elasticsearch import Elasticsearch
+from typing import List, Dict, Any, Iterable, Optional
 from elasticsearch.helpers import bulk, BulkIndexError
-from models import PlaneTransport, AutomobileTransport
+from models import CompactRecord
+from loaders.bulk_export import BulkExportWriter
+from loaders.fanout import FanOutLoader, LoadTarget
+from loaders.rollup_index import write_rollups
+from loaders.pair_index import write_pairs
+from loaders.generation_marker import write_generation_marker
+from es_client import create_es_client, get_es_client
+from index_layout import IndexLayout
+from settings import ElasticsearchSettings
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+def trim_document(doc: Dict) -> Dict:
+    """
+    Remove null values and objects left empty by that
+    
+    Elasticsearch treats a missing field and a null the same way, so this
+    only shrinks _source (e.g. the all-null 'dates' object of FAA records).
+    """
+    trimmed = {}
+    for key, value in doc.items():
+        if isinstance(value, dict):
+            value = trim_document(value)
+            if not value:
+                continue
+        elif value is None:
+            continue
+        trimmed[key] = value
+    return trimmed
+
+
+# Field a hashing loader (hash_documents) adds to every document: content
+# hash used to detect new/changed records between loads (saved-search alerts)
+DOC_HASH_FIELD = 'doc_hash'
+
+# Set anew on every transform run; not part of a record's content
+VOLATILE_METADATA = ('ingest_date', 'last_updated')
+
+# Reconciliation fields (see reconcile.py): a fixed bucket per transport_id
+# and the first 32 bits of doc_hash as a number. Per-bucket sums of 32-bit
+# values stay exact in the double-valued sum aggregation up to ~2M docs/bucket.
+RECON_BUCKET_FIELD = 'recon_bucket'
+DOC_HASH32_FIELD = 'doc_hash32'
+RECON_BUCKETS = 4096
+
+
+def document_hash(doc: Dict) -> str:
+    """
+    Content hash of a document, stable across runs and mapping profiles
+
+    Volatile metadata timestamps and the hash field itself are ignored, and
+    nulls are dropped first so trimmed and untrimmed documents agree.
+    """
+    content = {k: v for k, v in doc.items() if k != DOC_HASH_FIELD}
+    metadata = content.get('metadata')
+    if isinstance(metadata, dict):
+        content['metadata'] = {k: v for k, v in metadata.items() if k not in VOLATILE_METADATA}
+    canonical = json.dumps(trim_document(content), sort_keys=True, separators=(',', ':'))
+    return hashlib.sha1(canonical.encode('utf-8')).hexdigest()
+
+
+def recon_bucket(transport_id: str, buckets: int = RECON_BUCKETS) -> int:
+    """Reconciliation bucket of a document id (stable across runs and processes)"""
+    digest = hashlib.sha1(transport_id.encode('utf-8')).digest()
+    return int.from_bytes(digest[:4], 'big') % buckets
+
+
+def hash32(doc_hash: str) -> int:
+    """Numeric 32-bit prefix of a document hash"""
+    return int(doc_hash[:8], 16)
+
+
+class PreparedDocument:
+    """
+    A record already converted by ElasticsearchLoader.to_document
+
+    Stages that need the document before it is loaded (saved-search alerts)
+    pass these on instead of the record, so the loader reuses the document
+    rather than serializing and hashing the record a second time.
+    """
+
+    __slots__ = ('transport_id', 'document')
+
+    def __init__(self, transport_id: str, document: Dict):
+        self.transport_id = transport_id
+        self.document = document
+
+
 class ElasticsearchLoader:
     """Load transport data into Elasticsearch"""
     
-    def __init__(self, es_url: str = "http://thor:30398", index_name: str = "transport-unified"):
+    def __init__(self, es_url: Optional[str] = None, index_name: Optional[str] = None,
+                 offline: bool = False, targets: Optional[List[LoadTarget]] = None,
+                 trim_documents: bool = False, layout: Optional[IndexLayout] = None,
+                 hash_documents: bool = False):
         """
         Initialize loader
         
         Args:
-            es_url: Elasticsearch connection URL
-            index_name: Target index name
+            es_url: Elasticsearch connection URL (defaults to ES_HOSTS settings,
+                    using the shared client)
+            index_name: Target index name (defaults to ES_INDEX_NAME)
+            offline: Skip connecting to the cluster (export-only mode)
+            targets: Additional clusters/indices to fan out to (see load_fanout)
+            trim_documents: Drop null fields and empty objects before indexing
+                            (pairs with the 'storage' mapping profile)
+            layout: Partitioned layout; documents are routed to the concrete
+                    index of their transport_type instead of index_name
+            hash_documents: Add the content hash and reconciliation fields
+                            (needed by saved-search alerts and reconcile)
         """
-        self.es = Elasticsearch([es_url])
+        settings = ElasticsearchSettings()
+        index_name = index_name or (layout.alias if layout else settings.index_name)
+        self.rollup_index = settings.rollup_index
+        self.pairs_index = settings.pairs_index
+        self.meta_index = settings.meta_index
+        self.saved_search_index = settings.saved_search_index
         self.index_name = index_name
+        self.trim_documents = trim_documents
+        self.hash_documents = hash_documents
+        self.layout = layout
+        if offline:
+            self.es = None
+        elif es_url:
+            self.es = create_es_client(settings, hosts=[es_url])
+        else:
+            self.es = get_es_client()
+        es_url = es_url or settings.hosts
+        self.targets: List[LoadTarget] = []
+        if not offline:
+            self.targets.append(LoadTarget('primary', es_url, index_name, es=self.es))
+        self.targets.extend(targets or [])
         logger.info(f"Elasticsearch Loader initialized")
-        logger.info(f"  URL: {es_url}")
+        logger.info(f"  URL: {'(offline)' if offline else es_url}")
         logger.info(f"  Index: {index_name}")
+        if layout:
+            for plan in layout.describe():
+                logger.info(f"  Partition: {plan['transport_type']} -> {plan['index']} "
+                            f"({plan['shards']} shards)")
+        for target in targets or []:
+            logger.info(f"  Fan-out target: {target.name} -> {target.es_url}/{target.index_name}")
+        
+        if offline:
+            return
         
         # Test connection
         try:
@@ -38,22 +163,63 @@ class ElasticsearchLoader:
             logger.error(f"Failed to connect to Elasticsearch: {e}")
             raise
     
+    @property
+    def write_indices(self) -> str:
+        """Indices written by this loader (comma-separated for ES APIs)"""
+        return ','.join(self.layout.indices()) if self.layout else self.index_name
+    
+    def prepare_layout(self) -> List[str]:
+        """Create the partitioned layout's indices on every target"""
+        created = []
+        for target in self.targets:
+            created.extend(self.layout.ensure_indices(target.es))
+        return created
+    
+    def activate_layout(self, delete_previous: bool = False):
+        """Switch the layout's aliases to the loaded generation on every target"""
+        for target in self.targets:
+            self.layout.activate(target.es, delete_previous=delete_previous)
+    
     def verify_index_exists(self) -> bool:
-        """Check if target index exists"""
-        exists = self.es.indices.exists(index=self.index_name)
-        if exists:
-            logger.info(f"✅ Index '{self.index_name}' exists")
-        else:
-            logger.error(f"❌ Index '{self.index_name}' does not exist")
+        """Check if target index exists (on every fan-out target)"""
+        exists = True
+        for target in self.targets:
+            index_name = self.write_indices if self.layout else target.index_name
+            label = f"'{index_name}'" if target.name == 'primary' else \
+                f"'{index_name}' on {target.name}"
+            if all(target.es.indices.exists(index=name) for name in index_name.split(',')):
+                logger.info(f"✅ Index {label} exists")
+            else:
+                logger.error(f"❌ Index {label} does not exist")
+                exists = False
+        if not exists:
             logger.error("Run create_indices.py first!")
         return exists
     
+    def to_document(self, record: Any) -> Dict:
+        """Convert a Pydantic model or CompactRecord to its JSON document"""
+        if isinstance(record, PreparedDocument):
+            return record.document
+        if isinstance(record, CompactRecord):
+            doc = record.to_document()
+        else:
+            doc = record.model_dump(mode='json')
+        if self.trim_documents:
+            doc = trim_document(doc)
+        if not self.hash_documents:
+            return doc
+        doc[DOC_HASH_FIELD] = document_hash(doc)
+        doc[DOC_HASH32_FIELD] = hash32(doc[DOC_HASH_FIELD])
+        doc[RECON_BUCKET_FIELD] = recon_bucket(doc['transport_id'])
+        return doc
+    
     def prepare_bulk_actions(self, records: List[Any]) -> List[Dict]:
         """
         Convert Pydantic models to Elasticsearch bulk actions
         
         Args:
-            records: List of PlaneTransport or AutomobileTransport objects
+            records: List of PlaneTransport, AutomobileTransport, CompactRecord
+                     or PreparedDocument objects
             
         Returns:
             List of bulk action dictionaries
@@ -61,12 +227,11 @@ class ElasticsearchLoader:
         actions = []
         
         for record in records:
-            # Convert Pydantic model to dict
-            doc = record.model_dump(mode='json')
+            doc = self.to_document(record)
             
             # Create bulk action
             action = {
-                '_index': self.index_name,
+                '_index': self.layout.route(doc) if self.layout else self.index_name,
                 '_id': record.transport_id,
                 '_source': doc
             }
@@ -130,14 +295,149 @@ class ElasticsearchLoader:
         result = self.load_batch(records)
         
         # Refresh index to make documents searchable immediately
-        self.es.indices.refresh(index=self.index_name)
+        self.es.indices.refresh(index=self.write_indices)
+        logger.info(f"Index refreshed, documents immediately searchable")
+        
+        return result
+    
+    def load_stream(self, batches: Iterable[List[Any]], chunk_size: int = 1000) -> Dict[str, int]:
+        """
+        Load an iterable of record batches and refresh once at the end
+        
+        Used to reload from snapshots without holding the whole run in memory.
+        
+        Args:
+            batches: Iterable of record lists (e.g. SnapshotReader.iter_batches())
+            chunk_size: Number of documents per bulk request
+            
+        Returns:
+            Dictionary with success/error counts
+        """
+        totals = {'success': 0, 'errors': 0}
+        
+        for batch in batches:
+            result = self.load_batch(batch, chunk_size=chunk_size)
+            totals['success'] += result['success']
+            totals['errors'] += result['errors']
+        
+        self.es.indices.refresh(index=self.write_indices)
         logger.info(f"Index refreshed, documents immediately searchable")
         
+        return totals
+    
+    def load_fanout(self, batches: Iterable[List[Any]], chunk_size: int = 1000) -> Dict[str, Dict[str, Any]]:
+        """
+        Load record batches into the primary index and every extra target
+        
+        Each chunk is serialized once and the same bulk body is sent to all
+        targets concurrently; see FanOutLoader for backpressure handling.
+        
+        Args:
+            batches: Iterable of record lists
+            chunk_size: Number of documents per bulk request
+            
+        Returns:
+            Per-target success/error/dropped stats keyed by target name
+        """
+        return FanOutLoader(self.targets).load(
+            batches, self.to_document, chunk_size=chunk_size,
+            route=self.layout.route if self.layout else None
+        )
+    
+    def export_bulk(self, batches: Iterable[List[Any]], output_dir: Path,
+                    compression: str = 'gzip', max_part_bytes: int = 64 * 1024 * 1024,
+                    extra: Dict[str, Any] = None) -> Dict[str, Any]:
+        """
+        Write records as offline _bulk NDJSON instead of sending them
+        
+        Works without a cluster connection; replay the export later with
+        BulkExportSender (run_etl.py send-bulk).
+        
+        Args:
+            batches: Iterable of record lists
+            output_dir: Export directory
+            compression: gzip, zstd or none
+            max_part_bytes: Uncompressed bytes per part file
+            extra: Additional metadata to store in the manifest
+            
+        Returns:
+            Export manifest
+        """
+        writer = BulkExportWriter(
+            output_dir,
+            index_name=self.index_name,
+            compression=compression,
+            max_part_bytes=max_part_bytes
+        )
+        
+        for batch in batches:
+            writer.write((record.transport_id, self.to_document(record)) for record in batch)
+        
+        return writer.close(extra=extra)
+    
+    def write_rollups(self, documents: List[Dict[str, Any]]) -> int:
+        """
+        Store precomputed dashboard rollups on every target
+        
+        Call only after a successful load so the dashboard never shows
+        counts for data that is not searchable.
+        
+        Args:
+            documents: Output of RollupAccumulator.documents()
+            
+        Returns:
+            Number of rollup documents written per target
+        """
+        written = 0
+        for target in self.targets:
+            written = write_rollups(target.es, documents, self.rollup_index)
+        return written
+    
+    def write_pairs(self, documents: List[Dict[str, Any]], generation: str,
+                    transport_types: List[str]) -> Dict[str, int]:
+        """
+        Refresh the manufacturer x state pair index on every target
+        
+        Args:
+            documents: Output of RollupAccumulator.pair_documents()
+            generation: Generation the documents were tagged with
+            transport_types: Transport types the load covered (only their
+                             stale pairs are removed)
+            
+        Returns:
+            Written/deleted counts of the last target
+        """
+        result = {'written': 0, 'deleted': 0}
+        for target in self.targets:
+            result = write_pairs(target.es, documents, self.pairs_index, generation, transport_types)
         return result
     
+    def mark_generation(self, generation: str, source: str, checksum: str,
+                        documents: int) -> Dict[str, Any]:
+        """
+        Write the generation marker on every target (last step of a load)
+        
+        Args:
+            generation: Generation id (see generation_marker.new_generation)
+            source: Data source name
+            checksum: Source checksum the load came from
+            documents: Documents loaded
+            
+        Returns:
+            Marker document of the last target
+        """
+        marker = {}
+        for target in self.targets:
+            marker = write_generation_marker(
+                target.es, self.meta_index, generation,
+                source=source, checksum=checksum,
+                data_index=self.index_name, documents=documents
+            )
+        return marker
+    
     def get_record_count(self) -> int:
         """Get total number of documents in index"""
-        count = self.es.count(index=self.index_name)
+        count = self.es.count(index=self.write_indices)
         return count['count']
     
     def get_transport_type_counts(self) -> Dict[str, int]:
@@ -153,7 +453,7 @@ class ElasticsearchLoader:
             }
         }
         
-        result = self.es.search(index=self.index_name, body=query)
+        result = self.es.search(index=self.write_indices, body=query)
         
         counts = {}
         for bucket in result['aggregations']['by_type']['buckets']:
@@ -182,7 +482,7 @@ class ElasticsearchLoader:
             }
         
         result = self.es.search(
-            index=self.index_name,
+            index=self.write_indices,
             body={"query": query, "size": size}
         )
         
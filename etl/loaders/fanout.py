@@ -0,0 +1,234 @@
+"""Index one transform pass into several clusters/indices concurrently"""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import logging
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from elasticsearch import Elasticsearch
+
+from loaders.bulk_export import encode_bulk_action, send_bulk_body
+from es_client import create_es_client
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+_STOP = object()
+
+
+class LoadTarget:
+    """One destination (cluster + index) for fan-out loading"""
+
+    def __init__(self, name: str, es_url: str, index_name: str = "transport-unified",
+                 max_pending: int = 8, max_stall_seconds: float = 30.0,
+                 es: Optional[Elasticsearch] = None):
+        """
+        Initialize target
+
+        Args:
+            name: Label used in logs and results (e.g. staging, production)
+            es_url: Elasticsearch connection URL
+            index_name: Target index name
+            max_pending: Bulk requests that may queue up for this target
+            max_stall_seconds: Total time the producer may wait on this
+                               target's full queue over the whole load
+                               before the target is detached
+            es: Pre-built client (a dedicated client with its own connection
+                pool is created from the ES_* settings otherwise)
+        """
+        self.name = name
+        self.es_url = es_url
+        self.index_name = index_name
+        self.max_pending = max_pending
+        self.max_stall_seconds = max_stall_seconds
+        self.es = es if es is not None else create_es_client(hosts=[es_url])
+
+    @classmethod
+    def parse(cls, spec: str, **kwargs) -> 'LoadTarget':
+        """
+        Build a target from a CLI spec: ``name=http://host:9200/index``
+
+        The index part is optional and defaults to transport-unified.
+        """
+        name, _, location = spec.partition('=')
+        if not location:
+            raise ValueError(f"Invalid target '{spec}' (expected name=url[/index])")
+        scheme, _, rest = location.partition('://')
+        host, _, index_name = rest.partition('/')
+        if index_name:
+            kwargs['index_name'] = index_name
+        return cls(name, f"{scheme}://{host}", **kwargs)
+
+    def __repr__(self) -> str:
+        return f"LoadTarget({self.name!r}, {self.es_url!r}, {self.index_name!r})"
+
+
+class _TargetWorker(threading.Thread):
+    """Drains one target's queue of pre-encoded bulk bodies"""
+
+    def __init__(self, target: LoadTarget, send: Callable):
+        super().__init__(name=f"fanout-{target.name}", daemon=True)
+        self.target = target
+        self.send = send
+        self.queue: queue.Queue = queue.Queue(maxsize=target.max_pending)
+        self.detached = False
+        self.stats = {
+            'success': 0,
+            'errors': 0,
+            'requests': 0,
+            'dropped': 0,
+            'stalled_seconds': 0.0,
+            'send_seconds': 0.0,
+        }
+
+    def run(self):
+        while True:
+            item = self.queue.get()
+            if item is _STOP:
+                break
+            body, docs = item
+            started = time.monotonic()
+            try:
+                result = self.send(self.target.es, body, self.target.index_name)
+            except Exception as e:
+                logger.error(f"[{self.target.name}] bulk request failed: {e}")
+                result = {'success': 0, 'errors': docs}
+            self.stats['send_seconds'] += time.monotonic() - started
+            self.stats['requests'] += 1
+            self.stats['success'] += result['success']
+            self.stats['errors'] += result['errors']
+
+    def offer(self, body: bytes, docs: int):
+        """Enqueue a body, detaching the target once its stall budget is used up"""
+        if self.detached:
+            self.stats['dropped'] += docs
+            return
+
+        # Waits add up across puts: many short stalls detach a target as
+        # surely as one long one
+        budget = self.target.max_stall_seconds - self.stats['stalled_seconds']
+        started = time.monotonic()
+        try:
+            if budget > 0:
+                self.queue.put((body, docs), timeout=budget)
+            else:
+                self.queue.put_nowait((body, docs))
+        except queue.Full:
+            self.detached = True
+            self.stats['dropped'] += docs
+            logger.error(f"[{self.target.name}] stalled for {self.target.max_stall_seconds}s in total "
+                         f"with {self.target.max_pending} pending requests, detaching target")
+        finally:
+            self.stats['stalled_seconds'] += time.monotonic() - started
+
+
+class FanOutLoader:
+    """
+    Serialize each chunk once and send it to every target concurrently
+
+    Each target gets its own worker thread, client and bounded queue. A slow
+    target only blocks the producer for up to its ``max_stall_seconds`` in
+    total over the load; after that it is detached and its remaining
+    documents are counted as dropped, while the other targets keep loading.
+    """
+
+    def __init__(self, targets: List[LoadTarget], send: Callable = send_bulk_body):
+        """
+        Initialize fan-out loader
+
+        Args:
+            targets: Destinations to load
+            send: Function (es, body, index) -> {'success', 'errors'}
+        """
+        if not targets:
+            raise ValueError("FanOutLoader needs at least one target")
+        names = [t.name for t in targets]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Duplicate target names: {names}")
+        self.targets = targets
+        self.send = send
+
+    def load(self, batches: Iterable[List[Any]], to_document: Callable,
+             chunk_size: int = 1000, refresh: bool = True,
+             route: Optional[Callable] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Load record batches into every target
+
+        Args:
+            batches: Iterable of record lists
+            to_document: Function converting a record to its JSON document
+            chunk_size: Documents per bulk request
+            refresh: Refresh each (non-detached) target index at the end
+            route: Optional function doc -> concrete index; routed documents
+                   go to that index on every target instead of target.index_name
+
+        Returns:
+            Per-target stats keyed by target name
+        """
+        workers = [_TargetWorker(target, self.send) for target in self.targets]
+        for worker in workers:
+            worker.start()
+
+        logger.info(f"Fan-out load to {len(workers)} targets: "
+                    f"{', '.join(f'{t.name}->{t.index_name}' for t in self.targets)}")
+
+        chunk = bytearray()
+        docs = 0
+        total = 0
+        routed = set()
+
+        def dispatch():
+            body = bytes(chunk)
+            for worker in workers:
+                worker.offer(body, docs)
+
+        try:
+            for batch in batches:
+                for record in batch:
+                    doc = to_document(record)
+                    index = route(doc) if route else None
+                    if index:
+                        routed.add(index)
+                    chunk.extend(encode_bulk_action(record.transport_id, doc, index=index))
+                    docs += 1
+                    total += 1
+                    if docs >= chunk_size:
+                        dispatch()
+                        chunk = bytearray()
+                        docs = 0
+                if all(worker.detached for worker in workers):
+                    logger.error("All targets detached, aborting fan-out load")
+                    break
+            if docs:
+                dispatch()
+        finally:
+            for worker in workers:
+                worker.queue.put(_STOP)
+            for worker in workers:
+                worker.join()
+
+        results = {}
+        for worker in workers:
+            target = worker.target
+            if refresh and not worker.detached:
+                try:
+                    target.es.indices.refresh(index=','.join(sorted(routed)) or target.index_name)
+                except Exception as e:
+                    logger.warning(f"[{target.name}] refresh failed: {e}")
+
+            stats = dict(worker.stats)
+            stats['detached'] = worker.detached
+            stats['index'] = ','.join(sorted(routed)) or target.index_name
+            results[target.name] = stats
+
+            status = '❌ detached' if worker.detached else '✅'
+            logger.info(f"{status} [{target.name}] {stats['success']} ok, {stats['errors']} errors, "
+                        f"{stats['dropped']} dropped, stalled {stats['stalled_seconds']:.1f}s")
+
+        logger.info(f"Fan-out complete: {total} documents serialized once")
+        return results
@@ -0,0 +1,75 @@
+"""Index-generation marker written after each successful load"""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import logging
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from elasticsearch import Elasticsearch
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+MARKER_ID = "generation"
+
+META_INDEX_BODY = {
+    "settings": {
+        "number_of_shards": 1,
+        "number_of_replicas": 0,
+    },
+    "mappings": {
+        "dynamic": False,
+        "properties": {
+            "generation": {"type": "keyword"},
+            "source": {"type": "keyword"},
+            "source_checksum": {"type": "keyword"},
+            "index": {"type": "keyword"},
+            "loaded_at": {"type": "date"},
+            "documents": {"type": "long"},
+        }
+    }
+}
+
+
+def new_generation(checksum: str, loaded_at: Optional[datetime] = None) -> str:
+    """
+    Generation id for one load: load time plus the source checksum prefix
+
+    Unique per load, so reloading the same snapshot (e.g. with a different
+    mapping profile) still invalidates API caches.
+    """
+    loaded_at = loaded_at or datetime.utcnow()
+    return f"{loaded_at:%Y%m%dT%H%M%S}-{checksum[:12]}"
+
+
+def write_generation_marker(es: Elasticsearch, index: str, generation: str,
+                            source: str, checksum: str, data_index: str,
+                            documents: int) -> Dict[str, Any]:
+    """
+    Record the generation now being served
+
+    The API polls this document and drops cached responses when the
+    generation changes, so it must only be written once the load (and any
+    alias switch) is complete.
+
+    Returns:
+        The marker document
+    """
+    if not es.indices.exists(index=index):
+        es.indices.create(index=index, body=META_INDEX_BODY)
+        logger.info(f"✅ Created meta index {index}")
+
+    marker = {
+        'generation': generation,
+        'source': source,
+        'source_checksum': checksum,
+        'index': data_index,
+        'loaded_at': datetime.utcnow().isoformat(),
+        'documents': documents,
+    }
+    es.index(index=index, id=MARKER_ID, document=marker, refresh=True)
+    logger.info(f"🏷️  Generation {generation} marked live in {index}")
+    return marker
@@ -0,0 +1,223 @@
+"""Parallel sliced export of an index to partitioned Parquet"""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import json
+import logging
+import queue
+import shutil
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from elasticsearch import Elasticsearch
+
+from models import CompactRecord
+from loaders.snapshot_store import MANIFEST_NAME, MODELS_BY_TYPE, SnapshotWriter
+from rate_limit import RateLimiter
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+EXPORT_ROOT = Path("/app/data/exports")
+EXPORT_MANIFEST = "_export.json"
+
+_DONE = object()
+
+
+class SlicedIndexExporter:
+    """
+    Export an index through one point-in-time read by N parallel slices
+
+    Slice readers page with search_after and push hits into one bounded
+    queue; the calling thread converts them to CompactRecords and writes one
+    Parquet snapshot per slice (reusing SnapshotWriter)::
+
+        <output>/_export.json
+        <output>/slice=003/_manifest.json
+        <output>/slice=003/transport_type=plane/part-00000.parquet
+
+    ``pyarrow.dataset.dataset(output, partitioning='hive')`` reads it all.
+    A slice's manifest is written only once the slice is complete, so an
+    interrupted export resumes by re-reading just the unfinished slices
+    (from a new point-in-time: resumed slices may see later data).
+    """
+
+    def __init__(self, es: Elasticsearch, index: str, output_dir: Path,
+                 slices: int = 4, page_size: int = 1000,
+                 max_docs_per_second: Optional[float] = None,
+                 keep_alive: str = '5m', compression: str = 'zstd',
+                 queue_pages: Optional[int] = None, query: Optional[Dict[str, Any]] = None):
+        """
+        Initialize exporter
+
+        Args:
+            es: Elasticsearch client
+            index: Index or alias to export
+            output_dir: Export directory
+            slices: Parallel slice readers (about one per primary shard)
+            page_size: Hits per search request
+            max_docs_per_second: Read throttle across all slices, protecting
+                                 live search traffic (None = unthrottled)
+            keep_alive: Point-in-time keep-alive between pages
+            compression: Parquet codec
+            queue_pages: Pages buffered between readers and writer (2 per slice if None)
+            query: Optional query restricting the export
+        """
+        self.es = es
+        self.index = index
+        self.output_dir = Path(output_dir)
+        self.slices = slices
+        self.page_size = page_size
+        self.keep_alive = keep_alive
+        self.compression = compression
+        self.queue_pages = queue_pages or 2 * slices
+        self.query = query
+        self.limiter = RateLimiter(max_docs_per_second)
+
+    def slice_dir(self, slice_id: int) -> Path:
+        return self.output_dir / f"slice={slice_id:03d}"
+
+    def _load_manifest(self, resume: bool) -> Dict[str, Any]:
+        path = self.output_dir / EXPORT_MANIFEST
+        settings = {'index': self.index, 'slices': self.slices, 'query': self.query}
+        if not path.exists():
+            return {**settings, 'created_at': datetime.utcnow().isoformat(), 'completed': {}}
+        if not resume:
+            raise FileExistsError(f"{self.output_dir} already holds an export (resume it or pick a new directory)")
+        with open(path) as f:
+            manifest = json.load(f)
+        if {k: manifest.get(k) for k in settings} != settings:
+            raise ValueError(f"Export in {self.output_dir} used different settings "
+                             f"({manifest['index']}, {manifest['slices']} slices); cannot resume")
+        return manifest
+
+    def _save_manifest(self, manifest: Dict[str, Any]):
+        with open(self.output_dir / EXPORT_MANIFEST, 'w') as f:
+            json.dump(manifest, f, indent=2)
+
+    def _put(self, pages: queue.Queue, item: Any, stop: threading.Event):
+        """Bounded put that gives up once the export is aborted"""
+        while not stop.is_set():
+            try:
+                pages.put(item, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+
+    def _read_slice(self, slice_id: int, pit_id: str, pages: queue.Queue, stop: threading.Event):
+        """Page through one slice, pushing hit lists (then _DONE or the error)"""
+        search_after = None
+        try:
+            while not stop.is_set():
+                self.limiter.acquire(self.page_size)
+                body: Dict[str, Any] = {
+                    'pit': {'id': pit_id, 'keep_alive': self.keep_alive},
+                    'size': self.page_size,
+                    'sort': ['_shard_doc'],
+                    'track_total_hits': False,
+                }
+                if self.slices > 1:
+                    body['slice'] = {'id': slice_id, 'max': self.slices}
+                if self.query:
+                    body['query'] = self.query
+                if search_after:
+                    body['search_after'] = search_after
+
+                response = self.es.search(body=body)
+                pit_id = response.get('pit_id', pit_id)
+                hits = response['hits']['hits']
+                if hits:
+                    self._put(pages, (slice_id, hits), stop)
+                if len(hits) < self.page_size:
+                    break
+                search_after = hits[-1]['sort']
+            self._put(pages, (slice_id, _DONE), stop)
+        except Exception as e:
+            self._put(pages, (slice_id, e), stop)
+
+    def _records(self, hits: List[Dict[str, Any]], stats: Dict[str, int]) -> List[CompactRecord]:
+        records = []
+        for hit in hits:
+            model_cls = MODELS_BY_TYPE.get(hit['_source'].get('transport_type'))
+            if model_cls is None:
+                stats['skipped'] += 1
+                continue
+            records.append(CompactRecord.from_document(model_cls, hit['_source']))
+        return records
+
+    def run(self, resume: bool = True) -> Dict[str, Any]:
+        """
+        Export every slice that is not complete yet
+
+        Args:
+            resume: Continue an interrupted export in output_dir
+
+        Returns:
+            Export manifest (completed slices with their row counts)
+        """
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        manifest = self._load_manifest(resume)
+        pending = [i for i in range(self.slices)
+                   if not (self.slice_dir(i) / MANIFEST_NAME).exists()]
+        if not pending:
+            logger.info(f"✅ Export in {self.output_dir} is already complete")
+            return manifest
+        for slice_id in pending:
+            # Partial output of an interrupted slice is re-read from scratch
+            shutil.rmtree(self.slice_dir(slice_id), ignore_errors=True)
+
+        logger.info(f"📤 Exporting {self.index}: {len(pending)}/{self.slices} slices "
+                    f"-> {self.output_dir}")
+        pit_id = self.es.open_point_in_time(index=self.index, keep_alive=self.keep_alive)['id']
+        opened_at = datetime.utcnow().isoformat()
+        self._save_manifest(manifest)
+
+        pages: queue.Queue = queue.Queue(maxsize=self.queue_pages)
+        stop = threading.Event()
+        readers = [threading.Thread(target=self._read_slice, args=(i, pit_id, pages, stop),
+                                    name=f"export-slice-{i}", daemon=True)
+                   for i in pending]
+        writers = {i: SnapshotWriter(self.index, f"slice={i:03d}", compression=self.compression,
+                                     path=self.slice_dir(i))
+                   for i in pending}
+        stats = {i: {'docs': 0, 'skipped': 0} for i in pending}
+        started = time.monotonic()
+
+        try:
+            for reader in readers:
+                reader.start()
+            remaining = set(pending)
+            while remaining:
+                slice_id, item = pages.get()
+                if isinstance(item, Exception):
+                    raise item
+                if item is _DONE:
+                    writers.pop(slice_id).close(extra={
+                        'slice': slice_id, 'slices': self.slices, 'pit_opened_at': opened_at,
+                        'skipped': stats[slice_id]['skipped'],
+                    })
+                    manifest['completed'][str(slice_id)] = {**stats[slice_id], 'pit_opened_at': opened_at}
+                    self._save_manifest(manifest)
+                    remaining.discard(slice_id)
+                    continue
+                stats[slice_id]['docs'] += writers[slice_id].write(self._records(item, stats[slice_id]))
+        finally:
+            stop.set()
+            for writer in writers.values():
+                writer.abort()
+            for reader in readers:
+                reader.join(timeout=5)
+            try:
+                self.es.close_point_in_time(id=pit_id)
+            except Exception as e:
+                logger.warning(f"⚠️  Could not close point-in-time: {e}")
+
+        docs = sum(s['docs'] for s in stats.values())
+        elapsed = time.monotonic() - started
+        logger.info(f"✅ Exported {docs} documents in {elapsed:.1f}s "
+                    f"({docs / elapsed if elapsed else 0:.0f} docs/s)")
+        return manifest
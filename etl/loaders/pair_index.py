@@ -0,0 +1,108 @@
+"""Materialized manufacturer x state pairs for the picker endpoint"""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import logging
+from typing import Any, Dict, List
+
+from elasticsearch import Elasticsearch
+from elasticsearch.helpers import bulk
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+# Small index (a few thousand docs); manufacturer.ngram serves the picker's
+# substring search box without a leading-wildcard query
+PAIR_INDEX_BODY = {
+    "settings": {
+        "number_of_shards": 1,
+        "number_of_replicas": 0,
+        "analysis": {
+            "tokenizer": {
+                "pair_ngram": {
+                    "type": "ngram",
+                    "min_gram": 2,
+                    "max_gram": 3,
+                    "token_chars": ["letter", "digit"]
+                }
+            },
+            "analyzer": {
+                "pair_ngram": {
+                    "type": "custom",
+                    "tokenizer": "pair_ngram",
+                    "filter": ["lowercase", "asciifolding"]
+                }
+            }
+        }
+    },
+    "mappings": {
+        "dynamic": False,
+        "properties": {
+            "pair_key": {"type": "keyword"},
+            "transport_type": {"type": "keyword"},
+            "manufacturer": {
+                "type": "keyword",
+                "fields": {
+                    "ngram": {"type": "text", "analyzer": "pair_ngram"}
+                }
+            },
+            "state": {"type": "keyword"},
+            "count": {"type": "integer"},
+            "manufacturer_count": {"type": "integer"},
+            "generation": {"type": "keyword"},
+        }
+    }
+}
+
+
+def write_pairs(es: Elasticsearch, documents: List[Dict[str, Any]], index: str,
+                generation: str, transport_types: List[str]) -> Dict[str, int]:
+    """
+    Upsert pair documents and remove pairs that disappeared in this generation
+
+    Only pairs of the loaded transport types are candidates for removal:
+    each source publishes its own generation, so pairs of other sources
+    are never stale from this load's point of view.
+
+    Args:
+        es: Elasticsearch client
+        documents: Output of RollupAccumulator.pair_documents()
+        index: Pair index name
+        generation: Generation the documents were tagged with
+        transport_types: Transport types this load covered
+
+    Returns:
+        Dictionary with written and deleted counts
+    """
+    if not es.indices.exists(index=index):
+        es.indices.create(index=index, body=PAIR_INDEX_BODY)
+        logger.info(f"✅ Created pair index {index}")
+
+    actions = (
+        {
+            '_index': index,
+            '_id': f"{doc['transport_type']}:{doc['pair_key']}",
+            '_source': doc
+        }
+        for doc in documents
+    )
+    written, _ = bulk(es, actions, chunk_size=5000, raise_on_error=False)
+
+    # Pairs of these types not seen in this run (e.g. last aircraft of a
+    # manufacturer left a state)
+    es.indices.refresh(index=index)
+    stale = {'deleted': 0}
+    if transport_types:
+        stale = es.delete_by_query(
+            index=index,
+            body={"query": {"bool": {
+                "filter": {"terms": {"transport_type": list(transport_types)}},
+                "must_not": {"term": {"generation": generation}}
+            }}},
+            refresh=True
+        )
+
+    logger.info(f"🔗 Pair index {index}: {written} pairs written, {stale['deleted']} stale removed")
+    return {'written': written, 'deleted': stale['deleted']}
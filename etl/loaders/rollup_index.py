@@ -0,0 +1,61 @@
+"""Store precomputed dashboard rollups in a small dedicated index"""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import logging
+from typing import Any, Dict, List
+
+from elasticsearch import Elasticsearch
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+# Rollup payloads are only ever fetched by id, never searched
+ROLLUP_INDEX_BODY = {
+    "settings": {
+        "number_of_shards": 1,
+        "number_of_replicas": 0,
+    },
+    "mappings": {
+        "dynamic": False,
+        "properties": {
+            "scope": {"type": "keyword"},
+            "generation": {"type": "keyword"},
+            "source": {"type": "keyword"},
+            "generated_at": {"type": "date"},
+            "reference_year": {"type": "integer"},
+            "stats": {"type": "object", "enabled": False},
+        }
+    }
+}
+
+
+def write_rollups(es: Elasticsearch, documents: List[Dict[str, Any]], index: str) -> int:
+    """
+    Write rollup documents, creating the rollup index if needed
+
+    Each document is stored twice: as ``<scope>`` (what the dashboard GETs)
+    and as ``<scope>@<generation>`` (history of previous runs).
+
+    Args:
+        es: Elasticsearch client
+        documents: Output of RollupAccumulator.documents()
+        index: Rollup index name
+
+    Returns:
+        Number of rollup documents written
+    """
+    if not es.indices.exists(index=index):
+        es.indices.create(index=index, body=ROLLUP_INDEX_BODY)
+        logger.info(f"✅ Created rollup index {index}")
+
+    for doc in documents:
+        es.index(index=index, id=f"{doc['scope']}@{doc['generation']}", document=doc)
+        es.index(index=index, id=doc['scope'], document=doc)
+        logger.info(f"📊 Rollup '{doc['scope']}' written ({doc['stats']['total']} records, "
+                    f"generation {doc['generation']})")
+
+    es.indices.refresh(index=index)
+    return len(documents)
@@ -0,0 +1,341 @@
+"""Saved-search alerts: percolate new/changed documents against stored queries"""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import json
+import logging
+import sqlite3
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from elasticsearch import Elasticsearch
+
+from index_mappings import ANALYSIS, build_mappings
+from loaders.elasticsearch_loader import DOC_HASH_FIELD, PreparedDocument
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+OUTBOX_PATH = Path("/app/data/alerts/outbox.sqlite")
+
+# Object holding a saved search's own metadata in the percolator index
+# (top-level names are taken by the transport document fields)
+SAVED_SEARCH_FIELD = 'saved_search'
+
+# Stored queries matched per percolate page
+PERCOLATE_PAGE_SIZE = 1000
+
+
+def saved_search_index_body() -> Dict[str, Any]:
+    """
+    Percolator index body: the transport document mapping plus the stored query
+
+    Percolated documents are parsed with this mapping, so it uses the
+    default profile (every field indexed) and follows the models.
+    """
+    mappings = build_mappings('default')
+    mappings['dynamic'] = False
+    mappings['properties']['query'] = {"type": "percolator"}
+    mappings['properties'][SAVED_SEARCH_FIELD] = {
+        "properties": {
+            "id": {"type": "keyword"},
+            "user": {"type": "keyword"},
+            "name": {"type": "keyword"},
+            "filters": {"type": "object", "enabled": False},
+            "created_at": {"type": "date"},
+        }
+    }
+    return {
+        # Analyzers the document mapping references (transport_analyzer)
+        "settings": {"number_of_shards": 1, "number_of_replicas": 0, "analysis": ANALYSIS},
+        "mappings": mappings,
+    }
+
+
+def ensure_saved_search_index(es: Elasticsearch, index: str) -> bool:
+    """Create the percolator index if missing; returns True if created"""
+    if es.indices.exists(index=index):
+        return False
+    es.indices.create(index=index, body=saved_search_index_body())
+    logger.info(f"✅ Created saved-search index {index}")
+    return True
+
+
+class AlertOutbox:
+    """
+    Local SQLite outbox of saved-search match events
+
+    Events are staged under a run id while a load is in progress and become
+    pending only when the load is published (``commit``); a notifier reads
+    ``pending`` and calls ``mark_sent``. The same search/document/content
+    combination is recorded once, so reloading a snapshot does not re-alert.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS alert_outbox (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            run_id TEXT NOT NULL,
+            search_id TEXT NOT NULL,
+            user TEXT,
+            transport_id TEXT NOT NULL,
+            change TEXT NOT NULL,
+            doc_hash TEXT NOT NULL,
+            document TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'staged',
+            created_at TEXT NOT NULL,
+            sent_at TEXT,
+            UNIQUE (search_id, transport_id, doc_hash)
+        );
+        CREATE INDEX IF NOT EXISTS alert_outbox_status ON alert_outbox (status, id);
+    """
+
+    def __init__(self, path: Path = OUTBOX_PATH):
+        """
+        Open (and create) the outbox
+
+        Args:
+            path: SQLite database file (':memory:' for tests)
+        """
+        if str(path) != ':memory:':
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.conn = sqlite3.connect(str(path))
+        self.conn.executescript(self.SCHEMA)
+
+    def stage(self, run_id: str, events: Iterable[Dict[str, Any]]) -> int:
+        """
+        Record match events for a run that is still loading
+
+        Returns:
+            Number of new events (duplicates are ignored)
+        """
+        now = datetime.utcnow().isoformat()
+        rows = [
+            (run_id, e['search_id'], e.get('user'), e['transport_id'], e['change'],
+             e['doc_hash'], json.dumps(e['document'], separators=(',', ':')), now)
+            for e in events
+        ]
+        before = self.conn.total_changes
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO alert_outbox "
+                "(run_id, search_id, user, transport_id, change, doc_hash, document, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+        return self.conn.total_changes - before
+
+    def commit(self, run_id: str) -> int:
+        """Release a run's staged events to notifiers; returns the count"""
+        with self.conn:
+            cursor = self.conn.execute(
+                "UPDATE alert_outbox SET status = 'pending' WHERE run_id = ? AND status = 'staged'",
+                (run_id,)
+            )
+        return cursor.rowcount
+
+    def discard(self, run_id: str) -> int:
+        """Drop a run's staged events (the load was not published)"""
+        with self.conn:
+            cursor = self.conn.execute(
+                "DELETE FROM alert_outbox WHERE run_id = ? AND status = 'staged'", (run_id,)
+            )
+        return cursor.rowcount
+
+    def pending(self, limit: int = 100) -> List[Dict[str, Any]]:
+        """Oldest events not yet sent"""
+        cursor = self.conn.execute(
+            "SELECT id, search_id, user, transport_id, change, document, created_at "
+            "FROM alert_outbox WHERE status = 'pending' ORDER BY id LIMIT ?", (limit,)
+        )
+        return [
+            {
+                'id': row[0], 'search_id': row[1], 'user': row[2], 'transport_id': row[3],
+                'change': row[4], 'document': json.loads(row[5]), 'created_at': row[6],
+            }
+            for row in cursor.fetchall()
+        ]
+
+    def mark_sent(self, ids: List[int]):
+        """Mark events as delivered"""
+        now = datetime.utcnow().isoformat()
+        with self.conn:
+            self.conn.executemany(
+                "UPDATE alert_outbox SET status = 'sent', sent_at = ? WHERE id = ?",
+                [(now, event_id) for event_id in ids]
+            )
+
+    def close(self):
+        self.conn.close()
+
+
+class SavedSearchAlerts:
+    """
+    Evaluate every saved search against the records of one load
+
+    Wrap the load's batches with ``observe``: each batch is compared with
+    the live index by content hash (one ids lookup per batch), and only new
+    or changed documents are percolated together against all stored
+    queries. Cost follows the number of changed documents, not saved
+    searches x index size.
+    """
+
+    def __init__(self, es: Elasticsearch, live_index: str, search_index: str,
+                 outbox: AlertOutbox, run_id: Optional[str] = None,
+                 batch_size: int = 500):
+        """
+        Initialize alert evaluation for one load
+
+        Args:
+            es: Elasticsearch client
+            live_index: Index/alias currently served (compared against before
+                        it is overwritten; for partitioned loads the shared alias)
+            search_index: Percolator index with the saved searches
+            outbox: Outbox receiving match events
+            run_id: Id events are staged under (load start time if None)
+            batch_size: Documents per hash lookup / percolate request
+        """
+        self.es = es
+        self.live_index = live_index
+        self.search_index = search_index
+        self.outbox = outbox
+        self.run_id = run_id or datetime.utcnow().strftime('%Y%m%dT%H%M%S%f')
+        self.batch_size = batch_size
+        self.stats = {'checked': 0, 'new': 0, 'changed': 0, 'matches': 0}
+
+        ensure_saved_search_index(es, search_index)
+        # Without a live index there is nothing to compare against: the
+        # initial load is a baseline, not a flood of "new" alerts
+        self.enabled = es.indices.exists(index=live_index)
+        if not self.enabled:
+            logger.info(f"No live index '{live_index}' yet, saved-search alerts skipped for this load")
+        elif es.count(index=search_index)['count'] == 0:
+            logger.info("No saved searches, alerts skipped for this load")
+            self.enabled = False
+
+    def changed_documents(self, docs: List[Dict[str, Any]]) -> List[Tuple[Dict[str, Any], str]]:
+        """
+        Documents that are new or differ from the live copy
+
+        Documents whose live copy predates content hashing are skipped.
+
+        Returns:
+            (document, 'new' | 'changed') pairs
+        """
+        ids = [doc['transport_id'] for doc in docs]
+        response = self.es.search(
+            index=self.live_index,
+            query={'ids': {'values': ids}},
+            size=len(ids),
+            source=[DOC_HASH_FIELD],
+        )
+        live = {hit['_id']: hit['_source'].get(DOC_HASH_FIELD) for hit in response['hits']['hits']}
+
+        changed = []
+        for doc in docs:
+            transport_id = doc['transport_id']
+            if transport_id not in live:
+                changed.append((doc, 'new'))
+            elif live[transport_id] and live[transport_id] != doc[DOC_HASH_FIELD]:
+                changed.append((doc, 'changed'))
+        return changed
+
+    def percolate(self, docs: List[Dict[str, Any]]) -> Iterator[Tuple[Dict[str, Any], List[int]]]:
+        """
+        Match documents against all saved searches in one percolate query
+
+        Yields:
+            (saved search metadata, slots of the matching documents)
+        """
+        search_after = None
+        while True:
+            body = {
+                'query': {'percolate': {'field': 'query', 'documents': docs}},
+                'size': PERCOLATE_PAGE_SIZE,
+                'sort': [{f'{SAVED_SEARCH_FIELD}.id': 'asc'}],
+                '_source': [SAVED_SEARCH_FIELD],
+            }
+            if search_after:
+                body['search_after'] = search_after
+            response = self.es.search(index=self.search_index, body=body)
+            hits = response['hits']['hits']
+            for hit in hits:
+                slots = hit.get('fields', {}).get('_percolator_document_slot', [])
+                yield hit['_source'].get(SAVED_SEARCH_FIELD, {}), slots
+            if len(hits) < PERCOLATE_PAGE_SIZE:
+                return
+            search_after = hits[-1]['sort']
+
+    def process(self, docs: List[Dict[str, Any]]) -> int:
+        """
+        Stage match events for documents about to be loaded
+
+        Args:
+            docs: At most ``batch_size`` documents (one lookup, one percolate)
+
+        Returns:
+            Number of events staged
+        """
+        self.stats['checked'] += len(docs)
+        changed = self.changed_documents(docs)
+        if not changed:
+            return 0
+
+        events = []
+        for search, slots in self.percolate([doc for doc, _ in changed]):
+            for slot in slots:
+                doc, change = changed[slot]
+                events.append({
+                    'search_id': search.get('id'),
+                    'user': search.get('user'),
+                    'transport_id': doc['transport_id'],
+                    'change': change,
+                    'doc_hash': doc[DOC_HASH_FIELD],
+                    'document': doc,
+                })
+        staged = self.outbox.stage(self.run_id, events)
+
+        for _, change in changed:
+            self.stats[change] += 1
+        self.stats['matches'] += staged
+        return staged
+
+    def observe(self, batches: Iterable[List[Any]],
+                to_document: Callable[[Any], Dict[str, Any]]) -> Iterator[List[Any]]:
+        """
+        Evaluate record batches before they are loaded
+
+        Args:
+            batches: Iterable of record lists
+            to_document: ElasticsearchLoader.to_document of a hashing loader
+
+        Yields:
+            PreparedDocument batches the loader indexes without rebuilding
+            the documents (the record batches unchanged when alerts are off)
+        """
+        for batch in batches:
+            if not self.enabled:
+                yield batch
+                continue
+            prepared = [PreparedDocument(r.transport_id, to_document(r)) for r in batch]
+            for start in range(0, len(prepared), self.batch_size):
+                self.process([p.document for p in prepared[start:start + self.batch_size]])
+            yield prepared
+
+    def finish(self, published: bool) -> int:
+        """
+        Release the run's events if the load was published, drop them otherwise
+
+        Returns:
+            Number of events released (0 when discarded)
+        """
+        if not published:
+            dropped = self.outbox.discard(self.run_id)
+            logger.warning(f"⚠️  Load not published, {dropped} staged alerts discarded")
+            return 0
+        released = self.outbox.commit(self.run_id)
+        logger.info(f"🔔 Saved-search alerts: {self.stats['new']} new, {self.stats['changed']} changed "
+                    f"of {self.stats['checked']} documents -> {released} events queued")
+        return released
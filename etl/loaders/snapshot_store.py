@@ -0,0 +1,342 @@
+"""Columnar Parquet snapshots of transformed transport records"""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import json
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, get_args
+
+from models import PlaneTransport, AutomobileTransport, CompactRecord, RecordLayout, layout_for, manufacturer_state_key
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+    pq = None
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+SNAPSHOT_ROOT = Path("/app/data/snapshots")
+MANIFEST_NAME = "_manifest.json"
+NULL_GROUPS_COLUMN = "_null_groups"
+
+# Fields added to the models after snapshots were written that can be
+# rebuilt from other columns: field -> (function, source columns)
+DERIVED_FIELDS = {
+    'manufacturer_state': (manufacturer_state_key, ('manufacturer', 'location.state_province')),
+}
+
+# transport_type partition value -> model class
+MODELS_BY_TYPE = {
+    'plane': PlaneTransport,
+    'automobile': AutomobileTransport,
+}
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("pyarrow is required for Parquet snapshots (pip install pyarrow)")
+
+
+def _leaf_annotation(layout: RecordLayout, column: str) -> Any:
+    """Resolve the annotation of a dotted leaf path"""
+    model_cls = layout.model_cls
+    *parents, leaf = column.split('.')
+    for name in parents:
+        annotation = model_cls.model_fields[name].annotation
+        model_cls = next(a for a in (annotation, *get_args(annotation))
+                         if isinstance(a, type) and hasattr(a, 'model_fields'))
+    return model_cls.model_fields[leaf].annotation
+
+
+def arrow_schema(layout: RecordLayout) -> Tuple['pa.Schema', frozenset]:
+    """
+    Build Arrow schema for a record layout
+
+    Values are stored in their JSON form so a snapshot row rebuilds the exact
+    document the loader would have sent. Dates stay ISO strings, free-form
+    dict fields (power, coordinates) are JSON-encoded strings.
+
+    Returns:
+        Tuple of (schema, indices of JSON-encoded columns)
+    """
+    _require_pyarrow()
+    fields = []
+    json_columns = set()
+
+    for i, column in enumerate(layout.columns):
+        annotation = _leaf_annotation(layout, column)
+        candidates = [annotation, *get_args(annotation)]
+        if bool in candidates:
+            arrow_type = pa.bool_()
+        elif int in candidates:
+            arrow_type = pa.int64()
+        elif float in candidates:
+            arrow_type = pa.float64()
+        else:
+            if dict in candidates:
+                json_columns.add(i)
+            arrow_type = pa.string()
+        fields.append(pa.field(column, arrow_type))
+
+    fields.append(pa.field(NULL_GROUPS_COLUMN, pa.int64()))
+    return pa.schema(fields), frozenset(json_columns)
+
+
+class SnapshotWriter:
+    """
+    Write transformed records as a partitioned, compressed Parquet snapshot
+
+    Layout::
+
+        <root>/<source>/<checksum>/transport_type=<type>/part-00000.parquet
+        <root>/<source>/<checksum>/_manifest.json
+    """
+
+    def __init__(self, source: str, checksum: str, root: Path = SNAPSHOT_ROOT,
+                 compression: str = 'zstd', row_group_size: int = 50000,
+                 rows_per_file: int = 500000, path: Optional[Path] = None):
+        """
+        Initialize snapshot writer
+
+        Args:
+            source: Data source name (faa, nhtsa)
+            checksum: Checksum of the source artifact the records came from
+            root: Snapshot root directory
+            compression: Parquet codec (zstd, snappy, gzip, none)
+            row_group_size: Rows buffered per row group
+            rows_per_file: Rows per part file before rotating
+            path: Explicit snapshot directory (instead of root/source/checksum)
+        """
+        _require_pyarrow()
+        self.source = source
+        self.checksum = checksum
+        self.path = Path(path) if path else Path(root) / source / checksum
+        self.compression = compression
+        self.row_group_size = row_group_size
+        self.rows_per_file = rows_per_file
+
+        self._partitions: Dict[str, Dict[str, Any]] = {}
+        self.path.mkdir(parents=True, exist_ok=True)
+        logger.info(f"Snapshot writer initialized: {self.path}")
+
+    def _partition(self, transport_type: str, layout: RecordLayout) -> Dict[str, Any]:
+        partition = self._partitions.get(transport_type)
+        if partition is None:
+            schema, json_columns = arrow_schema(layout)
+            directory = self.path / f"transport_type={transport_type}"
+            directory.mkdir(parents=True, exist_ok=True)
+            partition = self._partitions[transport_type] = {
+                'layout': layout,
+                'schema': schema,
+                'json_columns': json_columns,
+                'directory': directory,
+                'buffer': [],
+                'writer': None,
+                'file_rows': 0,
+                'files': [],
+                'rows': 0,
+            }
+        return partition
+
+    def write(self, records: Iterable[Any]) -> int:
+        """
+        Append records to the snapshot
+
+        Args:
+            records: PlaneTransport/AutomobileTransport or CompactRecord objects
+
+        Returns:
+            Number of records written
+        """
+        count = 0
+        for record in records:
+            if not isinstance(record, CompactRecord):
+                record = CompactRecord.from_model(record)
+            transport_type = record.get('transport_type')
+            partition = self._partition(transport_type, record.layout)
+            partition['buffer'].append((record.values, record.nulls))
+            if len(partition['buffer']) >= self.row_group_size:
+                self._flush(partition)
+            count += 1
+        return count
+
+    def _flush(self, partition: Dict[str, Any]):
+        buffer = partition['buffer']
+        if not buffer:
+            return
+
+        if partition['writer'] is None:
+            filename = f"part-{len(partition['files']):05d}.parquet"
+            partition['writer'] = pq.ParquetWriter(
+                partition['directory'] / filename,
+                partition['schema'],
+                compression=self.compression,
+            )
+            partition['files'].append(filename)
+            partition['file_rows'] = 0
+
+        json_columns = partition['json_columns']
+        columns = []
+        for i in range(len(partition['layout'].columns)):
+            if i in json_columns:
+                columns.append([None if values[i] is None else json.dumps(values[i])
+                                for values, _ in buffer])
+            else:
+                columns.append([values[i] for values, _ in buffer])
+        columns.append([nulls for _, nulls in buffer])
+
+        schema = partition['schema']
+        table = pa.Table.from_arrays(
+            [pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+            schema=schema
+        )
+        partition['writer'].write_table(table)
+        partition['rows'] += len(buffer)
+        partition['file_rows'] += len(buffer)
+        partition['buffer'] = []
+
+        if partition['file_rows'] >= self.rows_per_file:
+            partition['writer'].close()
+            partition['writer'] = None
+
+    def abort(self):
+        """Close open files without a manifest (the snapshot stays incomplete)"""
+        for partition in self._partitions.values():
+            if partition['writer'] is not None:
+                partition['writer'].close()
+                partition['writer'] = None
+
+    def close(self, extra: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Flush buffers, close files and write the manifest
+
+        Args:
+            extra: Additional metadata to store in the manifest
+
+        Returns:
+            Manifest dictionary
+        """
+        partitions = {}
+        for transport_type, partition in self._partitions.items():
+            self._flush(partition)
+            if partition['writer'] is not None:
+                partition['writer'].close()
+                partition['writer'] = None
+            partitions[transport_type] = {
+                'rows': partition['rows'],
+                'files': partition['files'],
+            }
+
+        manifest = {
+            'source': self.source,
+            'checksum': self.checksum,
+            'created_at': datetime.utcnow().isoformat(),
+            'compression': self.compression,
+            'total_rows': sum(p['rows'] for p in partitions.values()),
+            'partitions': partitions,
+        }
+        if extra:
+            manifest.update(extra)
+
+        with open(self.path / MANIFEST_NAME, 'w') as f:
+            json.dump(manifest, f, indent=2)
+
+        logger.info(f"✅ Snapshot written: {manifest['total_rows']} records -> {self.path}")
+        return manifest
+
+
+class SnapshotReader:
+    """Stream records back out of a Parquet snapshot"""
+
+    def __init__(self, path: Path):
+        """
+        Open snapshot
+
+        Args:
+            path: Snapshot directory (the one containing _manifest.json)
+        """
+        _require_pyarrow()
+        self.path = Path(path)
+        manifest_path = self.path / MANIFEST_NAME
+        if not manifest_path.exists():
+            raise FileNotFoundError(f"Snapshot manifest not found: {manifest_path}")
+        with open(manifest_path) as f:
+            self.manifest = json.load(f)
+
+    @property
+    def total_rows(self) -> int:
+        return self.manifest['total_rows']
+
+    def iter_batches(self, batch_size: int = 10000) -> Iterator[List[CompactRecord]]:
+        """
+        Yield lists of CompactRecord, one Parquet record batch at a time
+
+        Args:
+            batch_size: Maximum records per yielded batch
+        """
+        for transport_type, partition in self.manifest['partitions'].items():
+            layout = layout_for(MODELS_BY_TYPE[transport_type])
+            _, json_columns = arrow_schema(layout)
+            directory = self.path / f"transport_type={transport_type}"
+
+            for filename in partition['files']:
+                parquet_file = pq.ParquetFile(directory / filename)
+                for batch in parquet_file.iter_batches(batch_size=batch_size):
+                    yield self._to_records(batch, layout, json_columns)
+
+    def _to_records(self, batch: 'pa.RecordBatch', layout: RecordLayout,
+                    json_columns: frozenset) -> List[CompactRecord]:
+        names = set(batch.schema.names)
+        columns = []
+        for i, column in enumerate(layout.columns):
+            if column not in names:
+                # Optional field added to the model after this snapshot
+                columns.append([None] * batch.num_rows)
+                continue
+            values = batch.column(column).to_pylist()
+            if i in json_columns:
+                values = [None if v is None else json.loads(v) for v in values]
+            elif i in layout.categorical:
+                values = [sys.intern(v) if v is not None else None for v in values]
+            columns.append(values)
+        for field, (derive, sources) in DERIVED_FIELDS.items():
+            if field in names or field not in layout.columns:
+                continue
+            inputs = [columns[layout.column_index(source)] for source in sources]
+            derived = [derive(*args) for args in zip(*inputs)]
+            if layout.column_index(field) in layout.categorical:
+                derived = [sys.intern(v) if v is not None else None for v in derived]
+            columns[layout.column_index(field)] = derived
+        nulls = batch.column(NULL_GROUPS_COLUMN).to_pylist()
+
+        return [CompactRecord(layout, values, null_groups)
+                for values, null_groups in zip(zip(*columns), nulls)]
+
+
+def find_snapshot(source: str, checksum: Optional[str] = None,
+                  root: Path = SNAPSHOT_ROOT) -> Optional[Path]:
+    """
+    Locate a snapshot directory
+
+    Args:
+        source: Data source name
+        checksum: Source checksum, or None for the most recently created snapshot
+        root: Snapshot root directory
+
+    Returns:
+        Path to snapshot directory, or None if not found
+    """
+    source_dir = Path(root) / source
+    if checksum:
+        path = source_dir / checksum
+        return path if (path / MANIFEST_NAME).exists() else None
+
+    manifests = sorted(source_dir.glob(f"*/{MANIFEST_NAME}"),
+                       key=lambda p: p.stat().st_mtime)
+    return manifests[-1].parent if manifests else None
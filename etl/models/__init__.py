@@ -1,7 +1,8 @@
 """Transportation Data Models"""
-from .common import TransportBase, Location, Dates, Owner, Specifications, Metadata
+from .common import TransportBase, Location, Dates, Owner, Specifications, Metadata, manufacturer_state_key
 from .planes import PlaneData, PlaneTransport
 from .automobiles import AutomobileData, AutomobileTransport
+from .compact import CompactRecord, RecordLayout, layout_for
 
 __all__ = [
     'TransportBase',
@@ -10,8 +11,12 @@ __all__ = [
     'Owner',
     'Specifications',
     'Metadata',
+    'manufacturer_state_key',
     'PlaneData',
     'PlaneTransport',
     'AutomobileData',
     'AutomobileTransport',
+    'CompactRecord',
+    'RecordLayout',
+    'layout_for',
 ]
@@ -56,6 +56,13 @@ class Metadata(BaseModel):
     last_updated: Optional[datetime] = None
 
 
+def manufacturer_state_key(manufacturer: Optional[str], state: Optional[str]) -> Optional[str]:
+    """Composite 'Manufacturer|STATE' key used by the manufacturer/state picker"""
+    if not manufacturer or not state:
+        return None
+    return f"{manufacturer}|{state}"
+
+
 class TransportBase(BaseModel):
     """Base model with common fields for all transport types"""
     transport_id: str = Field(..., description="Unified ID: type-sourceId")
@@ -90,6 +97,10 @@ class TransportBase(BaseModel):
     owner: Optional[Owner] = None
     specifications: Optional[Specifications] = None
     metadata: Metadata
+    
+    # Derived: manufacturer_state_key(manufacturer, location.state_province),
+    # lets combo filters use one terms query
+    manufacturer_state: Optional[str] = None
 
     class Config:
         """Pydantic configuration"""
@@ -0,0 +1,211 @@
+"""Compact in-memory representation of transformed transport records"""
+import sys
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Type, get_args
+
+from pydantic import BaseModel
+
+
+# Low-cardinality fields that repeat across hundreds of thousands of rows.
+# Values are interned so every record points at one shared string object.
+CATEGORICAL_FIELDS = frozenset({
+    'transport_type',
+    'category',
+    'manufacturer',
+    'manufacturer_country',
+    'manufacturer_state',
+    'model',
+    'registration_country',
+    'registration_status',
+    'location.city',
+    'location.state_province',
+    'location.country',
+    'owner.type',
+    'owner.country',
+    'specifications.engine_type',
+    'specifications.fuel_type',
+    'metadata.source',
+    'plane_data.aircraft_type',
+    'plane_data.engine_manufacturer',
+    'plane_data.engine_model',
+    'plane_data.airworthiness_class',
+    'automobile_data.vehicle_type',
+    'automobile_data.body_class',
+    'automobile_data.drive_type',
+    'automobile_data.transmission_style',
+    'automobile_data.plant_country',
+})
+
+
+def _nested_model(annotation: Any) -> Optional[Type[BaseModel]]:
+    """Return the pydantic model wrapped by an annotation (unwrapping Optional)"""
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation
+    for arg in get_args(annotation):
+        if isinstance(arg, type) and issubclass(arg, BaseModel):
+            return arg
+    return None
+
+
+class RecordLayout:
+    """
+    Flattened column layout derived from a transport model
+
+    Every leaf field of the model (including fields of nested objects such as
+    ``location`` or ``plane_data``) becomes one column. Nested objects are
+    tracked as groups so a ``None`` object round-trips as ``None`` rather
+    than as an object full of nulls.
+    """
+
+    def __init__(self, model_cls: Type[BaseModel], categorical: Iterable[str] = CATEGORICAL_FIELDS):
+        """
+        Build layout for a model class
+
+        Args:
+            model_cls: Pydantic model (e.g. PlaneTransport)
+            categorical: Dotted field paths whose string values are interned
+        """
+        self.model_cls = model_cls
+        self.columns: List[str] = []
+        self.groups: List[str] = []
+        self._plan = self._build_plan(model_cls, '')
+        categorical = set(categorical)
+        self.categorical = frozenset(
+            i for i, column in enumerate(self.columns) if column in categorical
+        )
+        self._index = {column: i for i, column in enumerate(self.columns)}
+
+    def _build_plan(self, model_cls: Type[BaseModel], prefix: str) -> List[Tuple]:
+        """Walk model fields in declaration order (the order model_dump uses)"""
+        plan = []
+        for name, field in model_cls.model_fields.items():
+            path = f"{prefix}{name}"
+            nested = _nested_model(field.annotation)
+            if nested is None:
+                plan.append((name, len(self.columns), None, None))
+                self.columns.append(path)
+            else:
+                group = len(self.groups)
+                self.groups.append(path)
+                plan.append((name, None, self._build_plan(nested, f"{path}."), group))
+        return plan
+
+    def column_index(self, path: str) -> int:
+        """Position of a dotted field path in the value tuple"""
+        return self._index[path]
+
+    def pack(self, doc: Dict[str, Any]) -> Tuple[tuple, int]:
+        """
+        Flatten a JSON-mode document into a value tuple
+
+        Args:
+            doc: Output of ``model_dump(mode='json')``
+
+        Returns:
+            Tuple of (values, null_groups bitmask)
+        """
+        values: List[Any] = [None] * len(self.columns)
+        nulls = 0
+        categorical = self.categorical
+        stack = [(self._plan, doc)]
+
+        while stack:
+            plan, source = stack.pop()
+            for name, column, subplan, group in plan:
+                value = source.get(name)
+                if subplan is None:
+                    if column in categorical and isinstance(value, str):
+                        value = sys.intern(value)
+                    values[column] = value
+                elif value is None:
+                    nulls |= 1 << group
+                else:
+                    stack.append((subplan, value))
+
+        return tuple(values), nulls
+
+    def unpack(self, values: tuple, nulls: int = 0) -> Dict[str, Any]:
+        """Rebuild the nested JSON-mode document from a value tuple"""
+        return self._unpack(self._plan, values, nulls)
+
+    def _unpack(self, plan: List[Tuple], values: tuple, nulls: int) -> Dict[str, Any]:
+        doc = {}
+        for name, column, subplan, group in plan:
+            if subplan is None:
+                doc[name] = values[column]
+            elif nulls & (1 << group):
+                doc[name] = None
+            else:
+                doc[name] = self._unpack(subplan, values, nulls)
+        return doc
+
+
+_LAYOUTS: Dict[Type[BaseModel], RecordLayout] = {}
+
+
+def layout_for(model_cls: Type[BaseModel]) -> RecordLayout:
+    """Get the shared layout for a model class"""
+    layout = _LAYOUTS.get(model_cls)
+    if layout is None:
+        layout = _LAYOUTS[model_cls] = RecordLayout(model_cls)
+    return layout
+
+
+class CompactRecord:
+    """
+    Slotted, flattened stand-in for a validated transport model
+
+    Holds JSON-ready values in a single tuple instead of a graph of pydantic
+    objects, so buffered batches (retries, sorting, dedup) cost a fraction of
+    the memory. ``to_document()`` yields exactly what
+    ``model_dump(mode='json')`` would have produced.
+    """
+
+    __slots__ = ('layout', 'values', 'nulls')
+
+    def __init__(self, layout: RecordLayout, values: tuple, nulls: int = 0):
+        self.layout = layout
+        self.values = values
+        self.nulls = nulls
+
+    @classmethod
+    def from_model(cls, record: BaseModel) -> 'CompactRecord':
+        """Compact a validated PlaneTransport/AutomobileTransport"""
+        layout = layout_for(type(record))
+        values, nulls = layout.pack(record.model_dump(mode='json'))
+        return cls(layout, values, nulls)
+
+    @classmethod
+    def from_document(cls, model_cls: Type[BaseModel], doc: Dict[str, Any]) -> 'CompactRecord':
+        """Compact an already-serialized document (e.g. an indexed _source)"""
+        layout = layout_for(model_cls)
+        values, nulls = layout.pack(doc)
+        return cls(layout, values, nulls)
+
+    @property
+    def transport_id(self) -> str:
+        return self.values[self.layout.column_index('transport_id')]
+
+    def get(self, path: str, default: Any = None) -> Any:
+        """Read a leaf value by dotted path (e.g. 'location.state_province')"""
+        index = self.layout._index.get(path)
+        if index is None:
+            return default
+        return self.values[index]
+
+    def to_document(self) -> Dict[str, Any]:
+        """Rebuild the Elasticsearch document"""
+        return self.layout.unpack(self.values, self.nulls)
+
+    def to_model(self) -> BaseModel:
+        """Re-inflate into the original pydantic model"""
+        return self.layout.model_cls.model_validate(self.to_document())
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, CompactRecord):
+            return NotImplemented
+        return (self.layout is other.layout
+                and self.values == other.values
+                and self.nulls == other.nulls)
+
+    def __repr__(self) -> str:
+        return f"CompactRecord({self.transport_id!r})"
@@ -0,0 +1,36 @@
+"""Token-bucket rate limiting shared by extractors and loaders"""
+import threading
+import time
+from typing import Optional
+
+
+class RateLimiter:
+    """Token bucket shared by concurrent workers (units per second)"""
+
+    def __init__(self, rate: Optional[float], burst: Optional[float] = None):
+        """
+        Initialize limiter
+
+        Args:
+            rate: Units (documents, requests) per second across all workers
+                  (None = unlimited)
+            burst: Bucket size (one second's worth if None)
+        """
+        self.rate = rate
+        self.capacity = burst or rate or 0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, amount: int):
+        """Block until ``amount`` units may be used"""
+        if not self.rate:
+            return
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= amount
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0
+        if wait:
+            time.sleep(wait)
@@ -0,0 +1,245 @@
+"""Reconcile source records against the index with hashed bucket checksums"""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import argparse
+import json
+import logging
+import time
+from collections import defaultdict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from elasticsearch import Elasticsearch
+
+from loaders.elasticsearch_loader import (
+    ElasticsearchLoader, DOC_HASH_FIELD, DOC_HASH32_FIELD, RECON_BUCKET_FIELD, RECON_BUCKETS
+)
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+# Buckets per composite aggregation page / hits per drill-down page
+AGG_PAGE_SIZE = 1000
+DRILL_PAGE_SIZE = 5000
+
+# Differences listed per category in the report (all are counted)
+MAX_LISTED = 100
+
+Checksum = Tuple[int, int]  # (documents, sum of doc_hash32)
+
+
+class Reconciler:
+    """
+    Compare source records with their indexed copies without reading every document
+
+    Both sides group documents by ``recon_bucket`` and reduce each bucket to
+    (count, sum of doc_hash32): the index side with one composite
+    aggregation, the source side in one pass over the records. Only buckets
+    whose checksums differ are drilled into, comparing transport_id ->
+    doc_hash for the few documents they hold.
+    """
+
+    def __init__(self, es: Elasticsearch, index: str, to_document: Callable[[Any], Dict[str, Any]],
+                 query: Optional[Dict[str, Any]] = None):
+        """
+        Initialize reconciler
+
+        Args:
+            es: Elasticsearch client
+            index: Index or alias the records were loaded into
+            to_document: Record -> document exactly as loaded (ElasticsearchLoader.to_document)
+            query: Restricts the index side to the source's documents
+                   (e.g. a term on metadata.source)
+        """
+        self.es = es
+        self.index = index
+        self.to_document = to_document
+        self.query = query or {'match_all': {}}
+
+    def source_checksums(self, batches: Iterable[List[Any]]) -> Dict[int, Checksum]:
+        """Bucket checksums of the source records"""
+        counts = defaultdict(int)
+        sums = defaultdict(int)
+        for batch in batches:
+            for record in batch:
+                doc = self.to_document(record)
+                bucket = doc[RECON_BUCKET_FIELD]
+                counts[bucket] += 1
+                sums[bucket] += doc[DOC_HASH32_FIELD]
+        return {bucket: (counts[bucket], sums[bucket]) for bucket in counts}
+
+    def index_checksums(self) -> Tuple[Dict[int, Checksum], int]:
+        """
+        Bucket checksums of the indexed documents
+
+        Returns:
+            Tuple of (checksums by bucket, documents without reconciliation
+            fields, i.e. loaded before they existed)
+        """
+        checksums = {}
+        after = None
+        while True:
+            composite = {
+                'size': AGG_PAGE_SIZE,
+                'sources': [{'bucket': {'terms': {'field': RECON_BUCKET_FIELD}}}],
+            }
+            if after:
+                composite['after'] = after
+            response = self.es.search(index=self.index, body={
+                'size': 0,
+                'query': self.query,
+                'aggs': {
+                    'buckets': {
+                        'composite': composite,
+                        'aggs': {'hash_sum': {'sum': {'field': DOC_HASH32_FIELD}}},
+                    },
+                    'unbucketed': {'missing': {'field': RECON_BUCKET_FIELD}},
+                },
+            })
+            aggs = response['aggregations']
+            for entry in aggs['buckets']['buckets']:
+                checksums[entry['key']['bucket']] = (entry['doc_count'], int(entry['hash_sum']['value']))
+            after = aggs['buckets'].get('after_key')
+            if not after or len(aggs['buckets']['buckets']) < AGG_PAGE_SIZE:
+                return checksums, aggs['unbucketed']['doc_count']
+
+    def source_hashes(self, batches: Iterable[List[Any]], buckets: Set[int]) -> Dict[str, str]:
+        """transport_id -> doc_hash of the source records in the given buckets"""
+        hashes = {}
+        for batch in batches:
+            for record in batch:
+                doc = self.to_document(record)
+                if doc[RECON_BUCKET_FIELD] in buckets:
+                    hashes[doc['transport_id']] = doc[DOC_HASH_FIELD]
+        return hashes
+
+    def index_hashes(self, buckets: Set[int]) -> Dict[str, str]:
+        """transport_id -> doc_hash of the indexed documents in the given buckets"""
+        hashes = {}
+        search_after = None
+        while True:
+            body = {
+                'size': DRILL_PAGE_SIZE,
+                'query': {'bool': {'filter': [self.query,
+                                              {'terms': {RECON_BUCKET_FIELD: sorted(buckets)}}]}},
+                'sort': [{'transport_id': 'asc'}],
+                '_source': False,
+                'docvalue_fields': ['transport_id', DOC_HASH_FIELD],
+                'track_total_hits': False,
+            }
+            if search_after:
+                body['search_after'] = search_after
+            hits = self.es.search(index=self.index, body=body)['hits']['hits']
+            for hit in hits:
+                fields = hit['fields']
+                hashes[fields['transport_id'][0]] = (fields.get(DOC_HASH_FIELD) or [None])[0]
+            if len(hits) < DRILL_PAGE_SIZE:
+                return hashes
+            search_after = hits[-1]['sort']
+
+    def reconcile(self, batches_factory: Callable[[], Iterable[List[Any]]]) -> Dict[str, Any]:
+        """
+        Compare source and index
+
+        Args:
+            batches_factory: Returns a fresh iterable of record batches; called
+                             once for checksums and again only if buckets differ
+
+        Returns:
+            Report with bucket/document totals and the diverged transport_ids
+            (missing from the index, unexpected in the index, changed)
+        """
+        started = time.monotonic()
+        source = self.source_checksums(batches_factory())
+        indexed, unbucketed = self.index_checksums()
+        if unbucketed:
+            logger.warning(f"⚠️  {unbucketed} indexed documents have no {RECON_BUCKET_FIELD} "
+                           f"(loaded before reconciliation fields existed); reload to include them")
+
+        differing = {b for b in set(source) | set(indexed) if source.get(b) != indexed.get(b)}
+        missing, extra, changed = [], [], []
+        if differing:
+            source_hashes = self.source_hashes(batches_factory(), differing)
+            index_hashes = self.index_hashes(differing)
+            missing = sorted(set(source_hashes) - set(index_hashes))
+            extra = sorted(set(index_hashes) - set(source_hashes))
+            changed = sorted(i for i in set(source_hashes) & set(index_hashes)
+                             if source_hashes[i] != index_hashes[i])
+
+        report = {
+            'index': self.index,
+            'buckets': RECON_BUCKETS,
+            'source_docs': sum(c for c, _ in source.values()),
+            'index_docs': sum(c for c, _ in indexed.values()),
+            'unbucketed_index_docs': unbucketed,
+            'differing_buckets': len(differing),
+            'missing_count': len(missing),
+            'extra_count': len(extra),
+            'changed_count': len(changed),
+            'missing': missing[:MAX_LISTED],
+            'extra': extra[:MAX_LISTED],
+            'changed': changed[:MAX_LISTED],
+            'seconds': round(time.monotonic() - started, 2),
+        }
+        report['in_sync'] = not differing and not unbucketed
+        return report
+
+
+def log_report(report: Dict[str, Any]):
+    """Log a reconciliation report"""
+    status = "✅ In sync" if report['in_sync'] else "❌ Diverged"
+    logger.info(f"{status}: {report['source_docs']} source / {report['index_docs']} indexed documents, "
+                f"{report['differing_buckets']}/{report['buckets']} buckets differ "
+                f"({report['seconds']}s)")
+    for key in ('missing', 'extra', 'changed'):
+        if report[f'{key}_count']:
+            logger.warning(f"  {key}: {report[f'{key}_count']} "
+                           f"(e.g. {', '.join(report[key][:5])})")
+
+
+def main():
+    from loaders.snapshot_store import SnapshotReader, SNAPSHOT_ROOT, find_snapshot
+
+    parser = argparse.ArgumentParser(
+        description='Reconcile a snapshot against the index (documents must have been '
+                    'loaded with --reconcile or --alerts, which add the hash fields)')
+    parser.add_argument('--source', default='faa', help='Data source of the snapshot')
+    parser.add_argument('--snapshot', default='latest', metavar='PATH|CHECKSUM')
+    parser.add_argument('--snapshot-dir', type=Path, default=SNAPSHOT_ROOT)
+    parser.add_argument('--index', default=None, help='Index or alias (defaults to ES_INDEX_NAME)')
+    parser.add_argument('--trim-documents', action='store_true',
+                        help='Records were loaded with --trim-documents')
+    parser.add_argument('--json', type=Path, default=None, help='Also write the report as JSON')
+    args = parser.parse_args()
+
+    if Path(args.snapshot).is_dir():
+        path = Path(args.snapshot)
+    else:
+        path = find_snapshot(args.source, None if args.snapshot == 'latest' else args.snapshot,
+                             root=args.snapshot_dir)
+    if path is None:
+        parser.error(f"No snapshot found for '{args.snapshot}'")
+
+    reader = SnapshotReader(path)
+    loader = ElasticsearchLoader(index_name=args.index, trim_documents=args.trim_documents,
+                                  hash_documents=True)
+    reconciler = Reconciler(loader.es, loader.index_name, loader.to_document,
+                            query={'term': {'metadata.source': args.source}})
+    report = reconciler.reconcile(lambda: reader.iter_batches())
+    log_report(report)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n📄 Report written to {args.json}")
+
+    sys.exit(0 if report['in_sync'] else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,10 +6,26 @@ sys.path.insert(0, str(Path(__file__).parent))
 import argparse
 import logging
 from datetime import datetime
+from typing import Optional
 
 from extractors.faa_extractor import FAAExtractor
+from extractors.nhtsa_extractor import NHTSAExtractor, VinDecodeCache, VPICClient, CACHE_PATH, VPIC_URL
+from extractors.vpic_offline import OfflineVINDecoder
 from transformers.faa_transformer import FAATransformer
+from transformers.nhtsa_transformer import NHTSATransformer
+from transformers.rollups import RollupAccumulator
 from loaders.elasticsearch_loader import ElasticsearchLoader
+from loaders.snapshot_store import SnapshotWriter, SnapshotReader, SNAPSHOT_ROOT, find_snapshot
+from loaders.bulk_export import BulkExportSender, read_export_rollups, write_export_rollups
+from loaders.fanout import LoadTarget
+from loaders.generation_marker import new_generation
+from loaders.saved_searches import AlertOutbox, SavedSearchAlerts, OUTBOX_PATH
+from loaders.index_export import SlicedIndexExporter, EXPORT_ROOT
+from index_layout import IndexLayout
+from index_mappings import PROFILES
+from settings import ElasticsearchSettings
+from reconcile import Reconciler, log_report
+from warmup import PAIR_KINDS, warm_index, warmup_queries
 
 logging.basicConfig(
     level=logging.INFO,
@@ -18,13 +34,214 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-def run_faa_pipeline(limit: int = None, force_download: bool = False):
+# Transport types each source loads (a partitioned load only switches these)
+SOURCE_TYPES = {
+    'faa': ['plane'],
+    'nhtsa': ['automobile'],
+}
+
+
+def make_layout(checksum: str, source: str, per_snapshot: bool = False,
+                profile: str = 'search', data_nodes: int = 1) -> IndexLayout:
+    """
+    Partitioned layout for a load, one generation per source snapshot if requested
+    
+    The generation suffix is the first 12 hex digits of the source checksum
+    (plus any -limitN marker), so reloading the same snapshot reuses its indices.
+    The layout covers only the source's transport types, so loading one
+    source leaves the other sources' indices and aliases in place. The shared
+    alias is the configured index name (ES_INDEX_NAME).
+    
+    Args:
+        profile: Mapping profile from index_mappings.PROFILES
+        data_nodes: Data nodes to plan shard counts for
+    """
+    options = dict(alias=ElasticsearchSettings().index_name, profile=profile,
+                   data_nodes=data_nodes, types=SOURCE_TYPES[source])
+    if not per_snapshot:
+        return IndexLayout(**options)
+    digest, sep, rest = checksum.partition('-')
+    return IndexLayout(generation=f"{digest[:12]}{sep}{rest}".lower(), **options)
+
+
+def warm_generation(loader: ElasticsearchLoader, queries: Optional[list],
+                    indices: bool = True, pairs: bool = True) -> Optional[dict]:
+    """
+    Replay the warmup queries against the loaded indices (primary target)
+    
+    Args:
+        indices: Include the queries served by the loaded indices
+        pairs: Include the picker queries (PAIR_KINDS), served by the pair index
+    
+    Returns:
+        Warmup report (see warm_index), {'error': ...} if warming failed,
+        None when there was nothing to warm
+    """
+    queries = [q for q in queries or [] if (pairs if q.kind in PAIR_KINDS else indices)]
+    if not queries:
+        return None
+    logger.info("\nWARMUP")
+    logger.info("-" * 80)
+    try:
+        return warm_index(loader.es, loader.write_indices, queries, pairs_index=loader.pairs_index)
+    except Exception as e:
+        # A cold start is slower, not wrong: the load still goes live
+        logger.warning(f"⚠️  Warmup failed: {e}")
+        return {'error': str(e)}
+
+
+def load_with_layout(loader: ElasticsearchLoader, batches, delete_previous: bool = False,
+                     warmup: Optional[list] = None) -> dict:
+    """
+    Create the layout's indices, load, and switch aliases if the load was clean
+    
+    A load that indexed nothing (e.g. no valid records) never goes live, so
+    the aliases, and with delete_previous the previous generation, stay put.
+    
+    The new generation is warmed (if warmup queries are given) before the
+    aliases move, so the first readers after the swap hit warm caches.
+    Picker queries are left to publish_load, which writes the new pairs.
+    
+    Returns:
+        Dictionary with success/error counts (see load_records) and the
+        warmup reports under 'warmup'
+    """
+    created = loader.prepare_layout()
+    if created:
+        logger.info(f"Created indices: {', '.join(created)}")
+    
+    result = load_records(loader, batches)
+    
+    if result['errors']:
+        logger.warning(f"⚠️  {result['errors']} errors, aliases left on the previous generation")
+    elif not result['success']:
+        logger.warning("⚠️  No documents loaded, aliases left on the previous generation")
+    else:
+        warmed = warm_generation(loader, warmup, pairs=False)
+        if warmed:
+            result.setdefault('warmup', []).append(warmed)
+        loader.activate_layout(delete_previous=delete_previous)
+    return result
+
+
+def make_alerts(loader: ElasticsearchLoader, outbox_path: Optional[Path]) -> Optional[SavedSearchAlerts]:
+    """
+    Saved-search alert evaluation for a load, compared against the live index
+    
+    Returns:
+        None when alerts are off (no outbox path)
+    """
+    if outbox_path is None:
+        return None
+    return SavedSearchAlerts(loader.es, loader.index_name, loader.saved_search_index,
+                             AlertOutbox(outbox_path))
+
+
+def export_records(batches, export_dir: Path, rollup: RollupAccumulator, checksum: str,
+                   source: str, compression: str = 'gzip', trim_documents: bool = False) -> dict:
+    """
+    Write records as an offline bulk export together with the run's rollups
+    
+    The rollup and pair documents are stored next to the parts, so send-bulk
+    publishes them with the documents before it marks the generation.
+    
+    Returns:
+        Export manifest
+    """
+    loader = ElasticsearchLoader(offline=True, trim_documents=trim_documents)
+    manifest = loader.export_bulk(
+        batches, export_dir,
+        compression=compression,
+        extra={'source': source, 'checksum': checksum}
+    )
+    write_export_rollups(export_dir, rollup.documents(generation=checksum, source=source),
+                         rollup.pair_documents(generation=checksum), rollup.transport_types)
+    logger.info(f"Records exported: {manifest['total_docs']} -> {export_dir}")
+    return manifest
+
+
+def reconcile_load(loader: ElasticsearchLoader, batches_factory, source: str) -> bool:
+    """
+    Verify the loaded documents against the source records by bucket checksums
+    
+    Returns:
+        True if index and source agree
+    """
+    reconciler = Reconciler(loader.es, loader.index_name, loader.to_document,
+                            query={'term': {'metadata.source': source}})
+    report = reconciler.reconcile(batches_factory)
+    log_report(report)
+    return report['in_sync']
+
+
+def publish_load(loader: ElasticsearchLoader, rollup: Optional[RollupAccumulator], result: dict,
+                 checksum: str, source: str, alerts: Optional[SavedSearchAlerts] = None,
+                 warmup: Optional[list] = None):
+    """
+    Finish a load unless it had errors
+    
+    Writes dashboard rollups and picker pairs, warms the picker queries
+    against the new pairs and the loaded index (unless load_with_layout
+    already did before its alias swap), then writes the generation marker
+    that tells the API to drop its cached responses. Warmup reports are
+    added to ``result['warmup']``.
+    Staged saved-search alerts are released once the generation is live.
+    """
+    if result['errors'] or not result['success']:
+        logger.warning("⚠️  Load had errors or no documents, rollups and generation marker not updated")
+        if alerts is not None:
+            alerts.finish(published=False)
+        return
+    if rollup is not None:
+        loader.write_rollups(rollup.documents(generation=checksum, source=source))
+        loader.write_pairs(rollup.pair_documents(generation=checksum), generation=checksum,
+                           transport_types=rollup.transport_types)
+    warmed = warm_generation(loader, warmup, indices=loader.layout is None)
+    if warmed:
+        result.setdefault('warmup', []).append(warmed)
+    loader.mark_generation(new_generation(checksum), source=source, checksum=checksum,
+                           documents=result['success'])
+    if alerts is not None:
+        alerts.finish(published=True)
+
+
+def run_faa_pipeline(limit: int = None, force_download: bool = False,
+                     snapshot_root: Path = None, export_dir: Path = None,
+                     compression: str = 'gzip', targets: list = None,
+                     trim_documents: bool = False, partitioned: bool = False,
+                     per_snapshot: bool = False, delete_previous: bool = False,
+                     alerts_outbox: Path = None, reconcile: bool = False,
+                     warmup: list = None, profile: str = 'search', data_nodes: int = 1):
     """
     Run complete FAA aircraft ETL pipeline
     
     Args:
         limit: Optional limit on number of records to process
         force_download: Force re-download of FAA data
+        snapshot_root: If set, write a Parquet snapshot of the transformed
+                       records under this directory before loading
+        export_dir: If set, write offline _bulk NDJSON here instead of
+                    loading into Elasticsearch
+        compression: Compression for the bulk export (gzip, zstd, none)
+        targets: Extra LoadTargets to fan the load out to
+        trim_documents: Drop null fields/empty objects from documents
+        partitioned: Load into per-transport-type indices behind the
+                     transport-unified alias (see index_layout.py)
+        per_snapshot: With partitioned, create a new index generation per
+                      source checksum and switch aliases after the load
+        delete_previous: Delete the generation the aliases pointed at before
+        alerts_outbox: If set, evaluate saved searches against new/changed
+                       records and queue match events in this SQLite outbox
+        reconcile: Verify indexed documents against the transformed records
+                   (bucket checksums) after the load
+        warmup: Queries replayed against the loaded index before it goes live
+                (see warmup.warmup_queries)
+        profile: With partitioned, mapping profile of the created indices
+        data_nodes: With partitioned, data nodes to plan shard counts for
+    
+    Returns:
+        True if the load had no errors (and, with reconcile, the index
+        matches the records)
     """
     logger.info("="*80)
     logger.info("FAA AIRCRAFT ETL PIPELINE")
@@ -50,22 +267,52 @@ def run_faa_pipeline(limit: int = None, force_download: bool = False):
     transformer = FAATransformer()
     transformer.load_reference_data(files['aircraft_ref'], files['engine'])
     
-    planes = transformer.transform_file(files['master'], limit=limit)
+    rollup = RollupAccumulator()
+    planes = transformer.transform_file(files['master'], limit=limit, compact=True, rollup=rollup)
     
     if not planes:
         logger.error("No valid records transformed")
         return False
     
+    checksum = extractor.source_checksum() or 'unknown'
+    if limit:
+        checksum = f"{checksum}-limit{limit}"
+    
+    if snapshot_root:
+        writer = SnapshotWriter('faa', checksum, root=snapshot_root)
+        try:
+            writer.write(planes)
+        except BaseException:
+            writer.abort()
+            raise
+        writer.close(extra={'limit': limit})
+    
+    if export_dir:
+        logger.info("\nSTEP 3: BULK EXPORT (offline)")
+        logger.info("-" * 80)
+        export_records([planes], export_dir, rollup, checksum, 'faa',
+                       compression=compression, trim_documents=trim_documents)
+        return True
+    
     # Step 3: Load
     logger.info("\nSTEP 3: LOADING")
     logger.info("-" * 80)
-    loader = ElasticsearchLoader()
+    layout = make_layout(checksum, 'faa', per_snapshot, profile, data_nodes) if partitioned else None
+    loader = ElasticsearchLoader(targets=targets, trim_documents=trim_documents, layout=layout,
+                                  hash_documents=reconcile or alerts_outbox is not None)
+    alerts = make_alerts(loader, alerts_outbox)
+    batches = alerts.observe([planes], loader.to_document) if alerts else [planes]
     
-    if not loader.verify_index_exists():
+    if layout:
+        result = load_with_layout(loader, batches, delete_previous=delete_previous, warmup=warmup)
+    elif not loader.verify_index_exists():
         logger.error("Target index does not exist. Run create_indices.py first!")
         return False
+    else:
+        result = load_records(loader, batches)
     
-    result = loader.load_and_refresh(planes)
+    publish_load(loader, rollup, result, checksum=checksum, source='faa', alerts=alerts,
+                 warmup=warmup)
     
     # Summary
     logger.info("\n" + "="*80)
@@ -84,10 +331,336 @@ def run_faa_pipeline(limit: int = None, force_download: bool = False):
     for t_type, count in type_counts.items():
         logger.info(f"  - {t_type}: {count}")
     
+    in_sync = True
+    if reconcile:
+        logger.info("\nRECONCILIATION")
+        logger.info("-" * 80)
+        in_sync = reconcile_load(loader, lambda: [planes], source='faa')
+    
     logger.info(f"\nCompleted at: {datetime.now().isoformat()}")
     logger.info("="*80)
     
-    return True
+    return in_sync and result['errors'] == 0
+
+
+def run_nhtsa_pipeline(limit: int = None, vin_path: Path = None,
+                       cache_path: Path = CACHE_PATH, vpic_url: str = VPIC_URL,
+                       concurrency: int = 8, requests_per_second: float = 5.0,
+                       vpic_db: Path = None, snapshot_root: Path = None, export_dir: Path = None,
+                       compression: str = 'gzip', targets: list = None,
+                       trim_documents: bool = False, partitioned: bool = False,
+                       per_snapshot: bool = False, delete_previous: bool = False,
+                       alerts_outbox: Path = None, reconcile: bool = False,
+                       warmup: list = None, profile: str = 'search', data_nodes: int = 1):
+    """
+    Run the NHTSA automobile ETL pipeline
+    
+    VINs from the VIN list are decoded with batched vPIC calls (or read from
+    the decode cache) and streamed through the transformer into the loader
+    window by window, so the full run is never held in memory.
+    
+    Args:
+        limit: Optional limit on number of distinct VINs
+        vin_path: VIN list (NHTSAExtractor.DATA_DIR/vins.txt if None)
+        cache_path: SQLite decode cache
+        vpic_url: DecodeVINValuesBatch endpoint
+        concurrency: vPIC batch calls in flight
+        requests_per_second: vPIC call rate limit
+        vpic_db: If set, decode offline from this vPIC database (SQLite)
+                 instead of calling the API (see extractors/vpic_offline.py)
+        (other arguments and return value as for run_faa_pipeline)
+    """
+    logger.info("="*80)
+    logger.info("NHTSA AUTOMOBILE ETL PIPELINE")
+    logger.info("="*80)
+    logger.info(f"Started at: {datetime.now().isoformat()}")
+    if limit:
+        logger.info(f"Record limit: {limit}")
+    logger.info("")
+    
+    # Step 1: Extract (decode VINs, streamed)
+    logger.info("STEP 1: EXTRACTION (VIN decoding)")
+    logger.info("-" * 80)
+    if vpic_db:
+        decoder = OfflineVINDecoder(vpic_db)
+    else:
+        decoder = VPICClient(vpic_url, concurrency=concurrency,
+                             requests_per_second=requests_per_second)
+    extractor = NHTSAExtractor(vin_path, cache=VinDecodeCache(cache_path), decoder=decoder)
+    if not extractor.vin_path.exists():
+        logger.error(f"VIN list not found: {extractor.vin_path}")
+        return False
+    if decoder.cacheable:
+        logger.info(f"Decode cache: {cache_path} ({len(extractor.cache)} VINs)")
+    
+    checksum = extractor.source_checksum()
+    if limit:
+        checksum = f"{checksum}-limit{limit}"
+    
+    # Step 2: Transform (streamed with extraction)
+    transformer = NHTSATransformer()
+    rollup = RollupAccumulator()
+    batches = rollup.observe(transformer.transform_batches(extractor.iter_decoded(limit), compact=True))
+    
+    if snapshot_root:
+        writer = SnapshotWriter('nhtsa', checksum, root=snapshot_root)
+        batches = _written(batches, writer, extra={'limit': limit})
+    
+    if export_dir:
+        logger.info("\nSTEP 2-3: TRANSFORM + BULK EXPORT (offline)")
+        logger.info("-" * 80)
+        export_records(batches, export_dir, rollup, checksum, 'nhtsa',
+                       compression=compression, trim_documents=trim_documents)
+        return True
+    
+    # Step 3: Load
+    logger.info("\nSTEP 2-3: TRANSFORM + LOADING")
+    logger.info("-" * 80)
+    layout = make_layout(checksum, 'nhtsa', per_snapshot, profile, data_nodes) if partitioned else None
+    loader = ElasticsearchLoader(targets=targets, trim_documents=trim_documents, layout=layout,
+                                  hash_documents=reconcile or alerts_outbox is not None)
+    alerts = make_alerts(loader, alerts_outbox)
+    if alerts:
+        batches = alerts.observe(batches, loader.to_document)
+    
+    if layout:
+        result = load_with_layout(loader, batches, delete_previous=delete_previous, warmup=warmup)
+    elif not loader.verify_index_exists():
+        logger.error("Target index does not exist. Run create_indices.py first!")
+        return False
+    else:
+        result = load_records(loader, batches)
+    
+    if not transformer.stats['valid']:
+        logger.error("No valid records transformed")
+        return False
+    
+    publish_load(loader, rollup, result, checksum=checksum, source='nhtsa', alerts=alerts,
+                 warmup=warmup)
+    
+    # Summary
+    logger.info("\n" + "="*80)
+    logger.info("PIPELINE SUMMARY")
+    logger.info("="*80)
+    logger.info(f"VINs decoded: {extractor.stats['decoded']} new, {extractor.stats['cached']} from cache, "
+                f"{extractor.stats['failed']} failed")
+    logger.info(f"Records transformed: {transformer.stats['valid']}")
+    logger.info(f"Records loaded: {result['success']}")
+    logger.info(f"Errors: {result['errors']}")
+    
+    in_sync = True
+    if reconcile:
+        logger.info("\nRECONCILIATION")
+        logger.info("-" * 80)
+        # Re-read what was loaded: vPIC results come from the cache only, so
+        # VINs whose calls failed stay out instead of being decoded anew; the
+        # offline decoder is local and deterministic and simply decodes again
+        in_sync = reconcile_load(
+            loader,
+            lambda: NHTSATransformer().transform_batches(
+                extractor.iter_decoded(limit, cached_only=True), compact=True),
+            source='nhtsa'
+        )
+    
+    logger.info(f"\nCompleted at: {datetime.now().isoformat()}")
+    logger.info("="*80)
+    
+    return in_sync and result['errors'] == 0
+
+
+def _written(batches, writer: SnapshotWriter, extra: dict):
+    """
+    Pass batches through while writing them to a snapshot (closed at the end)
+    
+    If extraction/transform raises, or the consumer stops early, the writer is
+    aborted so no file handles stay open and no manifest is written.
+    """
+    try:
+        for batch in batches:
+            writer.write(batch)
+            yield batch
+    except BaseException:
+        writer.abort()
+        raise
+    writer.close(extra=extra)
+
+
+def load_records(loader: ElasticsearchLoader, batches) -> dict:
+    """
+    Load record batches through the loader, fanning out when it has extra targets
+    
+    Returns:
+        Dictionary with success count (primary target) and errors summed
+        across all targets, including documents dropped by detached targets
+    """
+    if len(loader.targets) == 1:
+        return loader.load_stream(batches)
+    
+    results = loader.load_fanout(batches)
+    return {
+        'success': results['primary']['success'],
+        'errors': sum(r['errors'] + r['dropped'] for r in results.values())
+    }
+
+
+def run_snapshot_load(source: str, snapshot: str = 'latest',
+                      snapshot_root: Path = SNAPSHOT_ROOT, batch_size: int = 10000,
+                      export_dir: Path = None, compression: str = 'gzip',
+                      targets: list = None, trim_documents: bool = False,
+                      partitioned: bool = False, per_snapshot: bool = False,
+                      delete_previous: bool = False, alerts_outbox: Path = None,
+                      reconcile: bool = False, warmup: list = None,
+                      profile: str = 'search', data_nodes: int = 1):
+    """
+    Reload a previously written snapshot straight into Elasticsearch
+    
+    Args:
+        source: Data source name the snapshot was written for
+        snapshot: Snapshot directory, source checksum, or 'latest'
+        snapshot_root: Snapshot root directory
+        batch_size: Records per streamed batch
+        export_dir: If set, write offline _bulk NDJSON here instead of loading
+        compression: Compression for the bulk export (gzip, zstd, none)
+        targets: Extra LoadTargets to fan the load out to
+        trim_documents: Drop null fields/empty objects from documents
+        partitioned: Load into per-transport-type indices behind aliases
+        per_snapshot: With partitioned, one index generation per snapshot checksum
+        delete_previous: Delete the generation the aliases pointed at before
+        alerts_outbox: If set, queue saved-search alerts in this SQLite outbox
+        reconcile: Verify indexed documents against the snapshot after the load
+        warmup: Queries replayed against the loaded index before it goes live
+        profile: With partitioned, mapping profile of the created indices
+        data_nodes: With partitioned, data nodes to plan shard counts for
+    """
+    logger.info("="*80)
+    logger.info(f"SNAPSHOT LOAD ({source.upper()})")
+    logger.info("="*80)
+    
+    if Path(snapshot).is_dir():
+        path = Path(snapshot)
+    else:
+        path = find_snapshot(source, None if snapshot == 'latest' else snapshot, root=snapshot_root)
+    
+    if path is None:
+        logger.error(f"No snapshot found for '{snapshot}' under {snapshot_root}/{source}")
+        return False
+    
+    reader = SnapshotReader(path)
+    logger.info(f"Snapshot: {path}")
+    logger.info(f"Checksum: {reader.manifest['checksum']}")
+    logger.info(f"Records: {reader.total_rows}")
+    
+    if export_dir:
+        rollup = RollupAccumulator()
+        export_records(rollup.observe(reader.iter_batches(batch_size=batch_size)), export_dir,
+                       rollup, reader.manifest['checksum'], source,
+                       compression=compression, trim_documents=trim_documents)
+        return True
+    
+    layout = make_layout(reader.manifest['checksum'], source, per_snapshot,
+                         profile, data_nodes) if partitioned else None
+    loader = ElasticsearchLoader(targets=targets, trim_documents=trim_documents, layout=layout,
+                                  hash_documents=reconcile or alerts_outbox is not None)
+    rollup = RollupAccumulator()
+    batches = rollup.observe(reader.iter_batches(batch_size=batch_size))
+    alerts = make_alerts(loader, alerts_outbox)
+    if alerts:
+        batches = alerts.observe(batches, loader.to_document)
+    
+    if layout:
+        result = load_with_layout(loader, batches, delete_previous=delete_previous, warmup=warmup)
+    elif not loader.verify_index_exists():
+        logger.error("Target index does not exist. Run create_indices.py first!")
+        return False
+    else:
+        result = load_records(loader, batches)
+    
+    publish_load(loader, rollup, result, checksum=reader.manifest['checksum'], source=source,
+                 alerts=alerts, warmup=warmup)
+    
+    logger.info(f"Records loaded: {result['success']}")
+    logger.info(f"Errors: {result['errors']}")
+    logger.info(f"Total documents in index: {loader.get_record_count()}")
+    
+    if reconcile and not reconcile_load(
+            loader, lambda: reader.iter_batches(batch_size=batch_size), source=source):
+        return False
+    
+    return result['errors'] == 0
+
+
+def run_bulk_send(export_dir: Path, index: str = None, workers: int = 4):
+    """
+    Stream an offline bulk export into Elasticsearch
+    
+    Args:
+        export_dir: Directory written by --export-bulk
+        index: Target index (defaults to the index recorded in the manifest)
+        workers: Number of parts sent concurrently
+    """
+    logger.info("="*80)
+    logger.info("BULK EXPORT SEND")
+    logger.info("="*80)
+    
+    loader = ElasticsearchLoader(index_name=index) if index else ElasticsearchLoader()
+    if not loader.verify_index_exists():
+        logger.error("Target index does not exist. Run create_indices.py first!")
+        return False
+    
+    sender = BulkExportSender(loader.es, export_dir)
+    result = sender.send(index=loader.index_name, workers=workers)
+    loader.es.indices.refresh(index=loader.index_name)
+    
+    rollups = read_export_rollups(export_dir)
+    if rollups is None:
+        # Marking a generation without its rollups would leave the dashboard
+        # and picker on the previous run's numbers
+        logger.warning("⚠️  Export has no rollups (written by an older version): rollups, pairs "
+                       "and generation marker not updated; re-export or reload the source")
+    else:
+        publish_load(loader, rollups, result, checksum=sender.manifest.get('checksum', 'unknown'),
+                     source=sender.manifest.get('source', 'faa'))
+    
+    logger.info(f"Records loaded: {result['success']}")
+    logger.info(f"Errors: {result['errors']}")
+    logger.info(f"Total documents in index: {loader.get_record_count()}")
+    
+    return result['errors'] == 0
+
+
+def run_index_export(output_dir: Path = None, index: str = None, slices: int = 4,
+                     page_size: int = 1000, max_docs_per_second: float = None,
+                     compression: str = 'zstd', resume: bool = True):
+    """
+    Export the index to partitioned Parquet with parallel point-in-time slices
+    
+    Args:
+        output_dir: Export directory (EXPORT_ROOT/<index> if None)
+        index: Index or alias to export (defaults to ES_INDEX_NAME)
+        slices: Parallel slice readers
+        page_size: Hits per search request
+        max_docs_per_second: Read throttle across all slices
+        compression: Parquet codec
+        resume: Continue an interrupted export in output_dir
+    """
+    logger.info("="*80)
+    logger.info("INDEX EXPORT (Parquet)")
+    logger.info("="*80)
+    
+    loader = ElasticsearchLoader(index_name=index) if index else ElasticsearchLoader()
+    exporter = SlicedIndexExporter(
+        loader.es, loader.index_name,
+        output_dir or EXPORT_ROOT / loader.index_name,
+        slices=slices,
+        page_size=page_size,
+        max_docs_per_second=max_docs_per_second,
+        compression=compression
+    )
+    manifest = exporter.run(resume=resume)
+    
+    logger.info(f"Slices complete: {len(manifest['completed'])}/{slices}")
+    logger.info(f"Documents exported: {sum(s['docs'] for s in manifest['completed'].values())}")
+    return len(manifest['completed']) == slices
 
 
 def main():
@@ -95,6 +668,15 @@ def main():
     parser = argparse.ArgumentParser(
         description='Transportation Data ETL Pipeline'
     )
+    parser.add_argument(
+        'command',
+        nargs='?',
+        choices=['run', 'load', 'send-bulk', 'export-parquet'],
+        default='run',
+        help='run: full extract/transform/load; load: load from an existing snapshot; '
+             'send-bulk: stream an offline bulk export into the cluster; '
+             'export-parquet: export the index to Parquet with parallel slices'
+    )
     parser.add_argument(
         '--source',
         choices=['faa', 'nhtsa', 'all'],
@@ -117,20 +699,341 @@ def main():
         action='store_true',
         help='Process all records (no limit)'
     )
+    parser.add_argument(
+        '--snapshot',
+        action='store_true',
+        help='Write a Parquet snapshot of transformed records (run command)'
+    )
+    parser.add_argument(
+        '--from-snapshot',
+        nargs='?',
+        const='latest',
+        default='latest',
+        metavar='PATH|CHECKSUM',
+        help='Snapshot to load (load command, default: latest)'
+    )
+    parser.add_argument(
+        '--snapshot-dir',
+        type=Path,
+        default=SNAPSHOT_ROOT,
+        help='Snapshot root directory'
+    )
+    parser.add_argument(
+        '--export-bulk',
+        type=Path,
+        default=None,
+        metavar='DIR',
+        help='Write offline _bulk NDJSON parts to DIR instead of loading (run/load commands)'
+    )
+    parser.add_argument(
+        '--compression',
+        choices=['gzip', 'zstd', 'none'],
+        default=None,
+        help='Compression for --export-bulk parts (default gzip) or export-parquet files (default zstd)'
+    )
+    parser.add_argument(
+        '--bulk-dir',
+        type=Path,
+        default=None,
+        metavar='DIR',
+        help='Bulk export directory to send (send-bulk command)'
+    )
+    parser.add_argument(
+        '--index',
+        default=None,
+        help='Target index override (send-bulk command) / index to export (export-parquet)'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=4,
+        help='Parallel part senders (send-bulk command)'
+    )
+    parser.add_argument(
+        '--target',
+        action='append',
+        default=[],
+        metavar='NAME=URL[/INDEX]',
+        help='Also load into this cluster/index (repeatable, run/load commands)'
+    )
+    parser.add_argument(
+        '--max-stall',
+        type=float,
+        default=30.0,
+        help='Seconds in total a slow --target may block the load before it is detached'
+    )
+    parser.add_argument(
+        '--trim-documents',
+        action='store_true',
+        help='Drop null fields and empty objects from documents (use with the storage index profile)'
+    )
+    
+    parser.add_argument(
+        '--partitioned',
+        action='store_true',
+        help='Load into one index per transport type behind the transport-unified alias'
+    )
+    parser.add_argument(
+        '--per-snapshot',
+        action='store_true',
+        help='With --partitioned: new index generation per source snapshot, aliases switched after load'
+    )
+    parser.add_argument(
+        '--delete-previous',
+        action='store_true',
+        help='With --per-snapshot: delete the previous generation after switching aliases'
+    )
+    parser.add_argument(
+        '--profile',
+        choices=PROFILES,
+        default='search',
+        help='With --partitioned: mapping profile of the created indices'
+    )
+    parser.add_argument(
+        '--data-nodes',
+        type=int,
+        default=1,
+        help='With --partitioned: data nodes to plan shard counts for'
+    )
+    
+    parser.add_argument(
+        '--export-dir',
+        type=Path,
+        default=None,
+        metavar='DIR',
+        help=f'Parquet export directory (export-parquet command, default: {EXPORT_ROOT}/<index>)'
+    )
+    parser.add_argument(
+        '--slices',
+        type=int,
+        default=4,
+        help='Parallel point-in-time slices (export-parquet command)'
+    )
+    parser.add_argument(
+        '--page-size',
+        type=int,
+        default=1000,
+        help='Hits per search request (export-parquet command)'
+    )
+    parser.add_argument(
+        '--max-docs-per-second',
+        type=float,
+        default=None,
+        help='Throttle export reads to protect live search (export-parquet command)'
+    )
+    parser.add_argument(
+        '--no-resume',
+        action='store_true',
+        help='Fail instead of resuming when --export-dir holds an export'
+    )
+    parser.add_argument(
+        '--reconcile',
+        action='store_true',
+        help='After loading, verify indexed documents against the source records '
+             'with bucket checksums (run/load commands)'
+    )
+    parser.add_argument(
+        '--warmup',
+        nargs='?',
+        type=int,
+        const=50,
+        default=None,
+        metavar='N',
+        help='Replay the N most common queries (default 50) against the loaded index '
+             'before it goes live and report before/after latencies (run/load commands)'
+    )
+    parser.add_argument(
+        '--warmup-workload',
+        type=Path,
+        default=None,
+        metavar='FILE',
+        help='Recorded workload (JSON lines) to take warmup queries from'
+    )
+    parser.add_argument(
+        '--warmup-log',
+        type=Path,
+        default=None,
+        metavar='FILE',
+        help='API access log to take warmup queries from'
+    )
+    parser.add_argument(
+        '--alerts',
+        nargs='?',
+        type=Path,
+        const=OUTBOX_PATH,
+        default=None,
+        metavar='OUTBOX',
+        help=f'Percolate new/changed records against saved searches and queue matches '
+             f'in a SQLite outbox (default: {OUTBOX_PATH}; run/load commands)'
+    )
+    parser.add_argument(
+        '--vin-file',
+        type=Path,
+        default=None,
+        metavar='FILE',
+        help='VIN list for --source nhtsa, one VIN or VIN,MODEL_YEAR per line '
+             f'(default: {NHTSAExtractor.DATA_DIR}/vins.txt)'
+    )
+    parser.add_argument(
+        '--vin-cache',
+        type=Path,
+        default=CACHE_PATH,
+        metavar='FILE',
+        help='SQLite VIN decode cache; only VINs missing from it are sent to vPIC'
+    )
+    parser.add_argument(
+        '--vpic-url',
+        default=VPIC_URL,
+        help='vPIC DecodeVINValuesBatch endpoint'
+    )
+    parser.add_argument(
+        '--vpic-db',
+        type=Path,
+        default=None,
+        metavar='FILE',
+        help='Decode VINs offline from the vPIC standalone database (as SQLite) instead of the API'
+    )
+    parser.add_argument(
+        '--vpic-concurrency',
+        type=int,
+        default=8,
+        help='vPIC batch calls (50 VINs each) in flight'
+    )
+    parser.add_argument(
+        '--vpic-rate',
+        type=float,
+        default=5.0,
+        help='Maximum vPIC calls per second'
+    )
     
     args = parser.parse_args()
     
+    if args.per_snapshot and not args.partitioned:
+        parser.error('--per-snapshot requires --partitioned')
+    if args.reconcile and args.export_bulk:
+        parser.error('--reconcile compares against the index; not available with --export-bulk')
+    if args.warmup and args.export_bulk:
+        parser.error('--warmup needs a loaded index; not available with --export-bulk')
+    if args.alerts and args.export_bulk:
+        parser.error('--alerts needs a live index to compare against; not available with --export-bulk')
+    if args.partitioned and args.export_bulk:
+        parser.error('--export-bulk writes index-agnostic parts; use send-bulk --index instead of --partitioned')
+    
+    warmup = None
+    if args.warmup:
+        warmup = warmup_queries(args.warmup, workload_path=args.warmup_workload,
+                                access_log=args.warmup_log)
+    
     # Set limit based on args
     limit = None if args.full else args.limit
     
+    try:
+        targets = [LoadTarget.parse(spec, max_stall_seconds=args.max_stall) for spec in args.target]
+    except ValueError as e:
+        parser.error(str(e))
+    
+    if args.command == 'export-parquet':
+        if not run_index_export(
+            args.export_dir, index=args.index,
+            slices=args.slices,
+            page_size=args.page_size,
+            max_docs_per_second=args.max_docs_per_second,
+            compression=args.compression or 'zstd',
+            resume=not args.no_resume
+        ):
+            sys.exit(1)
+        logger.info("\n✅ Index export completed successfully!")
+        return
+    
+    if args.command == 'send-bulk':
+        if not args.bulk_dir:
+            parser.error('send-bulk requires --bulk-dir')
+        if not run_bulk_send(args.bulk_dir, index=args.index, workers=args.workers):
+            sys.exit(1)
+        logger.info("\n✅ Bulk send completed successfully!")
+        return
+    
+    if args.command == 'load':
+        sources = list(SOURCE_TYPES) if args.source == 'all' else [args.source]
+        if len(sources) > 1 and args.from_snapshot != 'latest':
+            parser.error('--source all loads each source\'s latest snapshot; '
+                         'pick a --source to load a specific one')
+        for source in sources:
+            # One export per source, the parts of both would collide in one directory
+            export_dir = args.export_bulk / source if args.export_bulk and len(sources) > 1 \
+                else args.export_bulk
+            success = run_snapshot_load(
+                source, args.from_snapshot, args.snapshot_dir,
+                export_dir=export_dir,
+                compression=args.compression or 'gzip',
+                targets=targets,
+                trim_documents=args.trim_documents,
+                partitioned=args.partitioned,
+                per_snapshot=args.per_snapshot,
+                delete_previous=args.delete_previous,
+                alerts_outbox=args.alerts,
+                reconcile=args.reconcile,
+                warmup=warmup,
+                profile=args.profile,
+                data_nodes=args.data_nodes
+            )
+            if not success:
+                sys.exit(1)
+        logger.info("\n✅ Snapshot load completed successfully!")
+        return
+    
+    def source_export_dir(source):
+        # One export per source when both run, as with load --source all
+        if args.export_bulk and args.source == 'all':
+            return args.export_bulk / source
+        return args.export_bulk
+    
     if args.source == 'faa' or args.source == 'all':
-        success = run_faa_pipeline(limit=limit, force_download=args.force_download)
+        success = run_faa_pipeline(
+            limit=limit,
+            force_download=args.force_download,
+            snapshot_root=args.snapshot_dir if args.snapshot else None,
+            export_dir=source_export_dir('faa'),
+            compression=args.compression or 'gzip',
+            targets=targets,
+            trim_documents=args.trim_documents,
+            partitioned=args.partitioned,
+            per_snapshot=args.per_snapshot,
+            delete_previous=args.delete_previous,
+            alerts_outbox=args.alerts,
+            reconcile=args.reconcile,
+            warmup=warmup,
+            profile=args.profile,
+            data_nodes=args.data_nodes
+        )
         if not success:
             sys.exit(1)
     
-    # Future: Add NHTSA pipeline here
-    # if args.source == 'nhtsa' or args.source == 'all':
-    #     run_nhtsa_pipeline(limit=limit)
+    if args.source == 'nhtsa' or args.source == 'all':
+        success = run_nhtsa_pipeline(
+            limit=limit,
+            vin_path=args.vin_file,
+            cache_path=args.vin_cache,
+            vpic_url=args.vpic_url,
+            concurrency=args.vpic_concurrency,
+            requests_per_second=args.vpic_rate,
+            vpic_db=args.vpic_db,
+            snapshot_root=args.snapshot_dir if args.snapshot else None,
+            export_dir=source_export_dir('nhtsa'),
+            compression=args.compression or 'gzip',
+            targets=targets,
+            trim_documents=args.trim_documents,
+            partitioned=args.partitioned,
+            per_snapshot=args.per_snapshot,
+            delete_previous=args.delete_previous,
+            alerts_outbox=args.alerts,
+            reconcile=args.reconcile,
+            warmup=warmup,
+            profile=args.profile,
+            data_nodes=args.data_nodes
+        )
+        if not success:
+            sys.exit(1)
     
     logger.info("\n✅ ETL Pipeline completed successfully!")
 
@@ -0,0 +1,66 @@
+"""ETL configuration loaded from environment variables / .env"""
+from typing import List, Optional, Tuple
+
+from pydantic import Field
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class ElasticsearchSettings(BaseSettings):
+    """
+    Elasticsearch connection and transport tuning
+
+    Every field can be set with an ``ES_`` prefixed environment variable,
+    e.g. ``ES_HOSTS=http://es1:9200,http://es2:9200`` or
+    ``ES_CONNECTIONS_PER_NODE=32``.
+    """
+    model_config = SettingsConfigDict(env_prefix='ES_', env_file='.env', extra='ignore')
+
+    hosts: str = Field(
+        default='http://thor:30398',
+        description="Comma-separated seed node URLs"
+    )
+    index_name: str = "transport-unified"
+    # Precomputed dashboard rollups (one small document per transport type)
+    rollup_index: str = "transport-rollups"
+    # Manufacturer x state pairs for the search picker
+    pairs_index: str = "transport-manufacturer-states"
+    # Index-generation marker read by the API to invalidate its caches
+    meta_index: str = "transport-meta"
+    # Percolator index of saved searches evaluated during loads
+    saved_search_index: str = "transport-saved-searches"
+
+    # Authentication / TLS
+    username: Optional[str] = None
+    password: Optional[str] = None
+    api_key: Optional[str] = None
+    verify_certs: bool = True
+    ca_certs: Optional[str] = None
+
+    # Connection pool
+    connections_per_node: int = Field(10, ge=1, description="HTTP connections kept per node")
+
+    # Gzip-compress request bodies (bulk payloads shrink several times)
+    http_compress: bool = True
+
+    # Timeouts and retries
+    request_timeout: float = Field(30.0, gt=0)
+    max_retries: int = Field(3, ge=0)
+    retry_on_timeout: bool = True
+    retry_on_status: Tuple[int, ...] = (429, 502, 503, 504)
+
+    # Node sniffing: discover every data node so requests spread across the
+    # cluster. Leave off when nodes are only reachable through a single
+    # proxy/NodePort address (sniffed publish addresses would be unreachable).
+    sniff_on_start: bool = False
+    sniff_before_requests: bool = False
+    sniff_on_node_failure: bool = False
+    sniff_timeout: float = Field(1.0, gt=0)
+    min_delay_between_sniffing: float = Field(60.0, ge=0)
+
+    @property
+    def host_list(self) -> List[str]:
+        return [host.strip() for host in self.hosts.split(',') if host.strip()]
+
+    @property
+    def sniffing_enabled(self) -> bool:
+        return self.sniff_on_start or self.sniff_before_requests or self.sniff_on_node_failure
@@ -0,0 +1,111 @@
+"""Synthetic FAA-shaped records for benchmarks and size experiments"""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import random
+from typing import Iterator, List
+
+from models import PlaneTransport
+from transformers.faa_transformer import FAATransformer
+
+
+# (manufacturer, [models], aircraft type code, engine type code, seats, weight)
+AIRCRAFT = [
+    ('CESSNA', ['172N', '172S', '182P', '150M', '206H', '310R'], '4', '1', '4', 30),
+    ('PIPER', ['PA-28-181', 'PA-28-140', 'PA-32R-301', 'PA-18-150'], '4', '1', '4', 18),
+    ('BEECH', ['A36', 'V35B', 'C90', 'B200'], '5', '2', '6', 9),
+    ('CIRRUS DESIGN CORP', ['SR22', 'SR20', 'SR22T'], '4', '1', '4', 6),
+    ('MOONEY', ['M20J', 'M20K'], '4', '1', '4', 3),
+    ('BELL', ['206B', '407', '206L-4'], '6', '3', '5', 4),
+    ('ROBINSON HELICOPTER', ['R44 II', 'R22 BETA'], '6', '1', '4', 4),
+    ('BOEING', ['737-800', '737-7H4', '757-232'], '5', '5', '160', 5),
+    ('EMBRAER', ['ERJ 170-200 LR', 'EMB-145LR'], '5', '5', '76', 3),
+    ('AIR TRACTOR INC', ['AT-502B', 'AT-802A'], '4', '2', '1', 2),
+    ('SCHWEIZER', ['SGS 2-33A'], '1', '0', '2', 2),
+    ('VANS', ['RV-7A', 'RV-8', 'RV-10'], '4', '1', '2', 8),
+    ('CAMERON BALLOONS', ['O-105'], '2', '0', '4', 1),
+]
+
+STATES = [
+    ('TX', 10), ('CA', 10), ('FL', 9), ('AK', 4), ('WA', 4), ('AZ', 4), ('CO', 3),
+    ('GA', 3), ('IL', 3), ('OH', 3), ('NY', 3), ('MI', 3), ('NC', 3), ('PA', 3),
+    ('MN', 2), ('OR', 2), ('WI', 2), ('MO', 2), ('OK', 2), ('KS', 2), ('TN', 2),
+    ('UT', 1), ('NV', 1), ('ID', 1), ('MT', 1), ('NM', 1), ('NE', 1), ('IA', 1),
+]
+
+CITIES = ['SPRINGFIELD', 'FRANKLIN', 'GREENVILLE', 'CLINTON', 'SALEM', 'MADISON',
+          'GEORGETOWN', 'ARLINGTON', 'ASHLAND', 'BURLINGTON', 'FAIRVIEW', 'RIVERSIDE']
+
+OWNER_WORDS = ['AVIATION', 'AIR', 'FLIGHT', 'AERO', 'SKY', 'WINGS', 'HOLDINGS', 'LEASING']
+SURNAMES = ['SMITH', 'JOHNSON', 'WILLIAMS', 'BROWN', 'JONES', 'GARCIA', 'MILLER', 'DAVIS']
+
+
+def _reference_tables(transformer: FAATransformer):
+    """Register synthetic ACFTREF/ENGINE rows with the transformer"""
+    for i, (manufacturer, models, type_aircraft, type_engine, seats, _) in enumerate(AIRCRAFT):
+        for j, model in enumerate(models):
+            transformer.aircraft_ref[f"{i:03d}{j:02d}01"] = {
+                'manufacturer': manufacturer,
+                'model': model,
+                'type_aircraft': type_aircraft,
+                'type_engine': type_engine,
+                'num_engines': '2' if type_aircraft == '5' else '1',
+                'num_seats': seats,
+            }
+    transformer.engine_ref['41514'] = {
+        'manufacturer': 'LYCOMING', 'model': 'O-360-A4M', 'type': '1', 'horsepower': '180'
+    }
+    transformer.engine_ref['52010'] = {
+        'manufacturer': 'P&W CANADA', 'model': 'PT6A-60A', 'type': '2', 'horsepower': '1050'
+    }
+
+
+def generate_master_rows(count: int, seed: int = 42) -> Iterator[List[str]]:
+    """Yield MASTER.txt-shaped rows with realistic value distributions"""
+    rng = random.Random(seed)
+    aircraft_weights = [a[5] for a in AIRCRAFT]
+    states, state_weights = zip(*STATES)
+
+    for n in range(count):
+        i = rng.choices(range(len(AIRCRAFT)), weights=aircraft_weights)[0]
+        j = rng.randrange(len(AIRCRAFT[i][1]))
+        registrant = rng.choices(['1', '3', '7', '2', '5'], weights=[55, 20, 18, 4, 3])[0]
+        if registrant == '1':
+            name = f"{rng.choice(SURNAMES)} {rng.choice(SURNAMES)[0]} {rng.choice(SURNAMES)}"
+        else:
+            name = f"{rng.choice(SURNAMES)} {rng.choice(OWNER_WORDS)} LLC"
+
+        row = [''] * 34
+        row[0] = f"{n + 1}{chr(65 + rng.randrange(26))}"
+        row[1] = f"{rng.randrange(10000, 99999999)}"
+        row[2] = f"{i:03d}{j:02d}01"
+        row[3] = rng.choice(['41514', '52010'])
+        row[4] = str(rng.choices(range(1940, 2025), weights=[1 + (y > 1965) * 3 + (y > 2000) * 2
+                                                             for y in range(1940, 2025)])[0])
+        row[5] = registrant
+        row[6] = name
+        row[9] = rng.choice(CITIES)
+        row[10] = rng.choices(states, weights=state_weights)[0]
+        yield row
+
+
+def generate_planes(count: int, seed: int = 42) -> List[PlaneTransport]:
+    """
+    Generate transformed PlaneTransport records
+
+    Rows go through FAATransformer.transform_row so documents have exactly
+    the shape of a real FAA load.
+
+    Args:
+        count: Number of records
+        seed: Random seed (same seed -> same records, apart from ingest_date)
+    """
+    transformer = FAATransformer()
+    _reference_tables(transformer)
+    planes = []
+    for row in generate_master_rows(count, seed):
+        plane = transformer.transform_row(row)
+        if plane:
+            planes.append(plane)
+    return planes
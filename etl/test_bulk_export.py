@@ -0,0 +1,91 @@
+"""Tests for offline _bulk NDJSON export and replay"""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import json
+
+import pytest
+
+from loaders.bulk_export import (
+    BulkExportWriter, BulkExportSender, verify_export, read_manifest, read_export_rollups,
+    write_export_rollups
+)
+from synthetic_data import generate_planes
+from transformers.rollups import RollupAccumulator
+
+
+class FakeBulkClient:
+    """Records bulk bodies instead of talking to a cluster"""
+
+    def __init__(self):
+        self.requests = []
+
+    def bulk(self, operations, index):
+        lines = operations.decode('utf-8').splitlines()
+        self.requests.append((index, lines))
+        items = [{'index': {'_id': json.loads(a)['index']['_id'], 'status': 201}}
+                 for a in lines[::2]]
+        return {'errors': False, 'items': items}
+
+
+def _documents(count: int):
+    for i in range(count):
+        yield f"plane-N{i}", {'transport_id': f"plane-N{i}", 'manufacturer': 'Cessna', 'year': 1970 + i % 50}
+
+
+@pytest.mark.parametrize('compression', ['gzip', 'zstd', 'none'])
+def test_export_and_send(tmp_path, compression):
+    """Exported parts are size-capped, checksummed and replay every document"""
+    if compression == 'zstd':
+        pytest.importorskip('zstandard')
+
+    writer = BulkExportWriter(tmp_path, compression=compression, max_part_bytes=4096)
+    writer.write(_documents(500))
+    manifest = writer.close(extra={'source': 'faa'})
+
+    assert manifest['total_docs'] == 500
+    assert len(manifest['parts']) > 1
+    assert all(part['bytes'] <= 4096 for part in manifest['parts'])
+    assert read_manifest(tmp_path)['source'] == 'faa'
+    assert verify_export(tmp_path) == []
+
+    client = FakeBulkClient()
+    result = BulkExportSender(client, tmp_path).send(index='transport-staging', workers=3,
+                                                     docs_per_request=40)
+
+    assert result == {'success': 500, 'errors': 0}
+    assert {index for index, _ in client.requests} == {'transport-staging'}
+    assert all(len(lines) <= 80 for _, lines in client.requests)
+    sent_ids = sorted(json.loads(a)['index']['_id'] for _, lines in client.requests for a in lines[::2])
+    assert sent_ids == sorted(doc_id for doc_id, _ in _documents(500))
+
+
+def test_send_refuses_corrupt_export(tmp_path):
+    """Tampered parts are rejected before anything is sent"""
+    writer = BulkExportWriter(tmp_path, compression='gzip', max_part_bytes=4096)
+    writer.write(_documents(100))
+    manifest = writer.close()
+
+    with open(tmp_path / manifest['parts'][0]['file'], 'ab') as f:
+        f.write(b'garbage')
+
+    client = FakeBulkClient()
+    with pytest.raises(ValueError):
+        BulkExportSender(client, tmp_path).send()
+    assert client.requests == []
+
+
+def test_rollups_ship_with_the_export(tmp_path):
+    rollup = RollupAccumulator()
+    for plane in generate_planes(50):
+        rollup.add(plane)
+    assert read_export_rollups(tmp_path) is None
+
+    write_export_rollups(tmp_path, rollup.documents(generation='abc', source='faa'),
+                         rollup.pair_documents(generation='abc'), rollup.transport_types)
+    shipped = read_export_rollups(tmp_path)
+
+    assert shipped.transport_types == ['plane']
+    assert shipped.documents(generation='abc', source='faa')[0]['stats'] == rollup.stats('plane')
+    assert shipped.pair_documents(generation='abc') == rollup.pair_documents(generation='abc')
@@ -0,0 +1,115 @@
+"""Tests for the compact record representation"""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from models import PlaneTransport, CompactRecord, layout_for
+from transformers.faa_transformer import FAATransformer
+
+
+def _master_row(n_number: str, name: str, city: str = "WICHITA", state: str = "KS") -> list:
+    """Build a MASTER.txt-shaped row (only the positions the transformer reads)"""
+    row = [''] * 34
+    row[0] = n_number
+    row[1] = f"SN-{n_number}"
+    row[2] = "2072738"
+    row[3] = "41514"
+    row[4] = "1979"
+    row[5] = "1"
+    row[6] = name
+    row[9] = city
+    row[10] = state
+    return row
+
+
+def _transformer() -> FAATransformer:
+    transformer = FAATransformer()
+    transformer.aircraft_ref["2072738"] = {
+        'manufacturer': 'CESSNA', 'model': '172N', 'type_aircraft': '4',
+        'type_engine': '1', 'num_engines': '1', 'num_seats': '4'
+    }
+    transformer.engine_ref["41514"] = {
+        'manufacturer': 'LYCOMING', 'model': 'O-320', 'type': '1', 'horsepower': '160'
+    }
+    return transformer
+
+
+def _deep_size(obj, seen=None) -> int:
+    """Approximate retained size of an object graph"""
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(_deep_size(k, seen) + _deep_size(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(_deep_size(v, seen) for v in obj)
+    elif hasattr(obj, '__dict__'):
+        size += _deep_size(vars(obj), seen)
+    if hasattr(obj, '__slots__'):
+        size += sum(_deep_size(getattr(obj, s), seen) for s in obj.__slots__
+                    if hasattr(obj, s) and s != 'layout')
+    return size
+
+
+def test_compact_round_trip():
+    """CompactRecord must yield the same ES document as model_dump"""
+    plane = _transformer().transform_row(_master_row("N12345", "JOHN SMITH"))
+    compact = CompactRecord.from_model(plane)
+
+    assert compact.transport_id == "plane-N12345"
+    assert compact.get('location.state_province') == "KS"
+    assert compact.to_document() == plane.model_dump(mode='json')
+    assert compact.to_model() == plane
+
+
+def test_compact_null_groups():
+    """Absent nested objects stay None instead of becoming empty objects"""
+    plane = PlaneTransport(
+        transport_id="plane-N1",
+        transport_type="plane",
+        metadata={"source": "faa", "source_id": "N1"},
+        plane_data={"n_number": "N1"}
+    )
+    doc = CompactRecord.from_model(plane).to_document()
+
+    assert doc['location'] is None
+    assert doc['owner'] is None
+    assert doc == plane.model_dump(mode='json')
+
+
+def test_compact_interns_categorical_fields():
+    """Repeated categorical strings are shared across records"""
+    transformer = _transformer()
+    a = CompactRecord.from_model(transformer.transform_row(_master_row("N1", "A")))
+    b = CompactRecord.from_model(transformer.transform_row(_master_row("N2", "B")))
+    layout = layout_for(PlaneTransport)
+
+    for path in ('manufacturer', 'category', 'location.state_province', 'owner.type'):
+        i = layout.column_index(path)
+        assert a.values[i] is b.values[i]
+
+
+def test_compact_is_smaller():
+    """Compact batches use several times less memory than pydantic graphs"""
+    transformer = _transformer()
+    planes = [transformer.transform_row(_master_row(f"N{i}", f"OWNER {i}")) for i in range(200)]
+    compact = [CompactRecord.from_model(p) for p in planes]
+
+    seen = set()
+    full_size = sum(_deep_size(p, seen) for p in planes)
+    seen = set()
+    compact_size = sum(_deep_size(c, seen) for c in compact)
+
+    print(f"pydantic: {full_size / len(planes):.0f} B/record, "
+          f"compact: {compact_size / len(compact):.0f} B/record")
+    assert compact_size * 2 < full_size
+
+
+if __name__ == "__main__":
+    test_compact_round_trip()
+    test_compact_null_groups()
+    test_compact_interns_categorical_fields()
+    test_compact_is_smaller()
+    print("✅ Compact record tests passed")
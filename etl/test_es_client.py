@@ -0,0 +1,45 @@
+"""Tests for the shared Elasticsearch client factory"""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from es_client import create_es_client
+from settings import ElasticsearchSettings
+
+
+def test_settings_from_environment(monkeypatch):
+    monkeypatch.setenv('ES_HOSTS', 'http://es1:9200, http://es2:9200')
+    monkeypatch.setenv('ES_CONNECTIONS_PER_NODE', '32')
+    monkeypatch.setenv('ES_SNIFF_ON_START', 'true')
+    settings = ElasticsearchSettings()
+
+    assert settings.host_list == ['http://es1:9200', 'http://es2:9200']
+    assert settings.connections_per_node == 32
+    assert settings.sniffing_enabled
+
+
+def test_client_applies_transport_settings():
+    settings = ElasticsearchSettings(
+        hosts='http://es1:9200,http://es2:9200',
+        connections_per_node=7,
+        http_compress=True,
+        request_timeout=12.5,
+        max_retries=5,
+    )
+    client = create_es_client(settings)
+    nodes = client.transport.node_pool.all()
+
+    assert len(nodes) == 2
+    assert all(node.config.connections_per_node == 7 for node in nodes)
+    assert all(node.config.http_compress for node in nodes)
+    assert client._request_timeout == 12.5
+    assert client._max_retries == 5
+    assert client._retry_on_timeout is True
+
+
+def test_host_override_gets_own_pool():
+    a = create_es_client(hosts=['http://staging:9200'])
+    b = create_es_client(hosts=['http://production:9200'])
+
+    assert a.transport.node_pool is not b.transport.node_pool
+    assert a.transport.node_pool.all()[0].config.host == 'staging'
@@ -0,0 +1,97 @@
+"""Tests for the fan-out loader"""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import threading
+import time
+
+from loaders.fanout import FanOutLoader, LoadTarget
+
+
+class FakeClient:
+    """Stand-in client; only refresh is called directly by the loader"""
+
+    def __init__(self):
+        self.refreshed = []
+        self.indices = self
+
+    def refresh(self, index):
+        self.refreshed.append(index)
+
+
+class Record:
+    def __init__(self, transport_id):
+        self.transport_id = transport_id
+
+
+def _target(name, **kwargs):
+    return LoadTarget(name, 'http://unused:9200', index_name=f"transport-{name}",
+                      es=FakeClient(), **kwargs)
+
+
+def test_fanout_serializes_once_and_loads_all_targets():
+    """Every target receives the identical body for each chunk"""
+    bodies = {}
+
+    def send(es, body, index):
+        bodies.setdefault(index, []).append(body)
+        return {'success': body.count(b'\n') // 2, 'errors': 0}
+
+    targets = [_target('staging'), _target('production')]
+    batches = [[Record(f"plane-N{i}") for i in range(start, start + 100)] for start in (0, 100, 200)]
+    results = FanOutLoader(targets, send=send).load(
+        batches, lambda r: {'transport_id': r.transport_id}, chunk_size=64)
+
+    assert results['staging']['success'] == 300
+    assert results['production']['success'] == 300
+    assert bodies['transport-staging'] == bodies['transport-production']
+    assert all(t.es.refreshed == [t.index_name] for t in targets)
+
+
+def test_slow_target_is_detached():
+    """A stuck target is dropped after max_stall_seconds without blocking the rest"""
+    release = threading.Event()
+
+    def send(es, body, index):
+        if index == 'transport-slow':
+            release.wait(0.3)
+        return {'success': body.count(b'\n') // 2, 'errors': 0}
+
+    targets = [_target('fast'), _target('slow', max_pending=1, max_stall_seconds=0.05)]
+    batches = [[Record(f"plane-N{i}") for i in range(1000)]]
+    try:
+        results = FanOutLoader(targets, send=send).load(
+            batches, lambda r: {'transport_id': r.transport_id}, chunk_size=10)
+    finally:
+        release.set()
+
+    assert results['fast']['success'] == 1000
+    assert results['fast']['detached'] is False
+    assert results['slow']['detached'] is True
+    assert results['slow']['dropped'] > 0
+    assert results['slow']['success'] + results['slow']['dropped'] == 1000
+
+
+def test_stall_budget_is_cumulative():
+    """Many short stalls, each under max_stall_seconds, still detach the target"""
+
+    def send(es, body, index):
+        if index == 'transport-slow':
+            time.sleep(0.02)
+        return {'success': body.count(b'\n') // 2, 'errors': 0}
+
+    targets = [_target('fast'), _target('slow', max_pending=1, max_stall_seconds=0.1)]
+    batches = [[Record(f"plane-N{i}") for i in range(500)]]
+    results = FanOutLoader(targets, send=send).load(
+        batches, lambda r: {'transport_id': r.transport_id}, chunk_size=10)
+
+    assert results['slow']['detached'] is True
+    assert results['slow']['stalled_seconds'] < 0.2
+    assert results['fast']['success'] == 500
+
+
+def test_parse_target_spec():
+    target = LoadTarget.parse('staging=http://staging-es:9200/transport-staging', es=FakeClient())
+    assert (target.name, target.es_url, target.index_name) == \
+        ('staging', 'http://staging-es:9200', 'transport-staging')
@@ -0,0 +1,134 @@
+"""Tests for the partitioned index layout"""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import pytest
+
+from index_layout import IndexLayout, plan_shards
+
+
+class FakeIndices:
+    """Minimal indices API: concrete indices and their aliases"""
+
+    def __init__(self, aliases=None):
+        self.aliases = {index: set(names) for index, names in (aliases or {}).items()}
+        self.created = {}
+        self.docs = {}
+
+    def exists(self, index):
+        return index in self.aliases or self.exists_alias(index)
+
+    def exists_alias(self, name):
+        return any(name in names for names in self.aliases.values())
+
+    def get_alias(self, name):
+        return {index: {} for index, names in self.aliases.items() if name in names}
+
+    def create(self, index, body):
+        self.created[index] = body
+        self.aliases[index] = set()
+
+    def update_aliases(self, actions):
+        for action in actions:
+            (op, spec), = action.items()
+            names = self.aliases[spec['index']]
+            names.add(spec['alias']) if op == 'add' else names.discard(spec['alias'])
+
+    def delete(self, index):
+        for name in index.split(','):
+            del self.aliases[name]
+            self.docs.pop(name, None)
+
+
+class FakeClient:
+    def __init__(self, aliases=None):
+        self.indices = FakeIndices(aliases)
+
+
+def test_plan_shards():
+    """Small indices get one shard; large ones split by size and node count"""
+    assert plan_shards(400_000, 1_200) == 1
+    assert plan_shards(300_000_000, 1_500) == 21
+    assert plan_shards(300_000_000, 1_500, data_nodes=4) == 24
+    # Document limit dominates for tiny documents
+    assert plan_shards(1_000_000_000, 10, growth=1.0) == 5
+
+
+def test_routing_by_transport_type():
+    layout = IndexLayout(generation='abc123')
+    assert layout.route({'transport_type': 'plane'}) == 'transport-plane-abc123'
+    assert layout.type_alias('automobile') == 'transport-automobiles'
+    with pytest.raises(ValueError):
+        layout.route({'transport_type': 'train'})
+
+
+def test_index_body_maps_only_its_model():
+    layout = IndexLayout()
+    plane = layout.index_body('plane')['mappings']['properties']
+    assert 'plane_data' in plane and 'automobile_data' not in plane
+    assert layout.index_body('automobile')['settings']['number_of_shards'] > 1
+
+
+def test_activate_swaps_generations_atomically():
+    es = FakeClient({
+        'transport-plane-old': {'transport-unified', 'transport-planes'},
+        'transport-automobile-old': {'transport-unified', 'transport-automobiles'},
+    })
+    layout = IndexLayout(generation='new')
+    assert layout.ensure_indices(es) == ['transport-plane-new', 'transport-automobile-new']
+
+    previous = layout.activate(es, delete_previous=True)
+
+    assert previous == ['transport-automobile-old', 'transport-plane-old']
+    assert es.indices.aliases == {
+        'transport-plane-new': {'transport-unified', 'transport-planes'},
+        'transport-automobile-new': {'transport-unified', 'transport-automobiles'},
+    }
+
+
+def test_concrete_unified_index_is_rejected():
+    """The old single index must go before its name can become an alias"""
+    es = FakeClient({'transport-unified': set()})
+    with pytest.raises(RuntimeError):
+        IndexLayout().ensure_indices(es)
+
+
+def _load(es, layout, docs):
+    """Create, fill (by routing) and activate a layout's indices"""
+    layout.ensure_indices(es)
+    for doc in docs:
+        index = layout.route(doc)
+        es.indices.docs[index] = es.indices.docs.get(index, 0) + 1
+    layout.activate(es, delete_previous=True)
+
+
+def test_source_loads_leave_other_types_alone():
+    """An FAA load then an NHTSA load keep both aliases on populated indices"""
+    es = FakeClient()
+    _load(es, IndexLayout(generation='faa1', types=['plane']), [{'transport_type': 'plane'}] * 3)
+    _load(es, IndexLayout(generation='nhtsa1', types=['automobile']), [{'transport_type': 'automobile'}] * 2)
+    _load(es, IndexLayout(generation='faa2', types=['plane']), [{'transport_type': 'plane'}] * 4)
+
+    aliases = es.indices.aliases
+    assert aliases == {
+        'transport-automobile-nhtsa1': {'transport-unified', 'transport-automobiles'},
+        'transport-plane-faa2': {'transport-unified', 'transport-planes'},
+    }
+    for alias in ('transport-planes', 'transport-automobiles', 'transport-unified'):
+        assert all(es.indices.docs.get(index) for index in es.indices.get_alias(alias))
+    with pytest.raises(ValueError):
+        IndexLayout(types=['plane']).route({'transport_type': 'automobile'})
+
+
+def test_make_layout_follows_settings_and_options(monkeypatch):
+    """Load layouts use the configured alias, mapping profile and node count"""
+    from run_etl import make_layout
+
+    monkeypatch.setenv('ES_INDEX_NAME', 'transport-staging')
+    layout = make_layout('ABCDEF0123456789-limit10', 'faa', per_snapshot=True,
+                         profile='storage', data_nodes=3)
+
+    assert layout.alias == 'transport-staging'
+    assert (layout.profile, layout.data_nodes) == ('storage', 3)
+    assert layout.indices() == ['transport-plane-abcdef012345-limit10']
@@ -0,0 +1,113 @@
+"""Tests for the model-driven index mapping generator"""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import pytest
+
+from index_mappings import (build_index_body, build_mappings, iter_field_paths, QUERIED_FIELDS,
+                            SUGGEST_FIELDS)
+
+
+def _field(mappings, path):
+    node = {"properties": mappings["properties"]}
+    for part in path.split('.'):
+        if "properties" in node:
+            node = node["properties"][part]
+        else:
+            node = node["fields"][part]
+    return node
+
+
+def test_default_profile_matches_hand_written_types():
+    mappings = build_mappings('default')
+    expected = {
+        'transport_id': 'keyword',
+        'category': 'keyword',
+        'manufacturer': 'text',
+        'manufacturer.keyword': 'keyword',
+        'model.keyword': 'keyword',
+        'year': 'integer',
+        'location.state_province': 'keyword',
+        'location.coordinates': 'geo_point',
+        'dates.manufactured': 'date',
+        'owner.name': 'text',
+        'specifications.capacity': 'integer',
+        'metadata.ingest_date': 'date',
+        'plane_data.n_number': 'keyword',
+        'plane_data.fractional_ownership': 'boolean',
+        'automobile_data.displacement_l': 'float',
+    }
+    for path, es_type in expected.items():
+        assert _field(mappings, path)['type'] == es_type, path
+    assert _field(mappings, 'manufacturer')['analyzer'] == 'transport_analyzer'
+    assert 'dynamic' not in mappings
+
+
+def test_search_profile_tuning():
+    body = build_index_body('search')
+    mappings = body['mappings']
+
+    assert body['settings']['index']['sort']['field'] == ['year']
+    assert body['settings']['index']['sort']['order'] == ['desc']
+    assert mappings['dynamic'] is False
+
+    for path in ('manufacturer.keyword', 'location.state_province', 'category'):
+        assert _field(mappings, path).get('eager_global_ordinals') is True, path
+
+    for path in ('year', 'registration_id', 'plane_data.n_number', 'transport_type'):
+        field = _field(mappings, path)
+        assert field.get('index', True) and field.get('doc_values', True), path
+
+    cold = _field(mappings, 'plane_data.engine_model')
+    assert cold['index'] is False and cold['doc_values'] is False
+    assert _field(mappings, 'specifications.power') == {'type': 'object', 'enabled': False}
+
+
+def test_queried_fields_exist_in_models():
+    paths = set(iter_field_paths(build_mappings('search')['properties']))
+    assert QUERIED_FIELDS <= paths
+
+
+@pytest.mark.parametrize('profile', ['default', 'search', 'storage'])
+def test_suggest_subfields(profile):
+    mappings = build_mappings(profile)
+    for path in SUGGEST_FIELDS:
+        assert _field(mappings, f"{path}.suggest")['type'] == 'search_as_you_type', path
+    # Parent fields keep their own type and keyword subfield
+    assert _field(mappings, 'manufacturer.keyword')['type'] == 'keyword'
+    assert _field(mappings, 'plane_data.n_number')['type'] == 'keyword'
+
+
+def test_unknown_profile():
+    with pytest.raises(ValueError):
+        build_mappings('fastest')
+
+
+def test_storage_profile():
+    body = build_index_body('storage')
+    mappings = body['mappings']
+    excludes = mappings['_source']['excludes']
+
+    assert body['settings']['index']['codec'] == 'best_compression'
+    assert body['settings']['index']['sort']['field'] == ['year']
+    assert _field(mappings, 'manufacturer')['norms'] is False
+    assert _field(mappings, 'owner.name')['norms'] is False
+    assert 'dates.*' in excludes
+    assert 'plane_data.aircraft_mfr_model_code' in excludes
+    assert 'plane_data.n_number' not in excludes
+    assert 'norms' not in _field(build_mappings('search'), 'manufacturer')
+
+
+def test_trim_document():
+    from loaders.elasticsearch_loader import trim_document
+    from synthetic_data import generate_planes
+
+    doc = generate_planes(1)[0].model_dump(mode='json')
+    trimmed = trim_document(doc)
+
+    assert 'model_variant' not in trimmed
+    assert 'coordinates' not in trimmed['location']
+    assert trimmed['dates'] == {'manufactured': doc['dates']['manufactured']}
+    assert trimmed['plane_data']['fractional_ownership'] is False
+    assert trim_document({'dates': {'registered': None}}) == {}
@@ -0,0 +1,156 @@
+"""Tests for the NHTSA vPIC extractor/transformer against a local stub vPIC server"""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+import pytest
+
+from extractors.nhtsa_extractor import NHTSAExtractor, VinDecodeCache, VPICClient
+from transformers.nhtsa_transformer import NHTSATransformer
+
+
+VINS = [f"1HGCV1F3XLA{i:06d}" for i in range(120)]
+
+
+def stub_result(vin, year=''):
+    return {
+        'VIN': vin, 'Make': 'HONDA', 'MakeID': '474', 'Model': 'Accord', 'ModelID': '1861',
+        'ModelYear': year or '2020', 'VehicleType': 'PASSENGER CAR', 'BodyClass': 'Sedan/Saloon',
+        'Doors': '4', 'DisplacementL': '1.5', 'EngineCylinders': '4', 'EngineHP': '192',
+        'DriveType': 'FWD/Front-Wheel Drive', 'FuelTypePrimary': 'Gasoline',
+        'TransmissionSpeeds': '', 'PlantCountry': 'UNITED STATES (USA)', 'ErrorCode': '0',
+        'SeatRows': '9', 'Trim': 'Not Applicable',
+    }
+
+
+class StubVPIC(BaseHTTPRequestHandler):
+    """
+    DecodeVINValuesBatch stand-in; fails the first ``failures`` calls with 503,
+    answers in reverse order if ``reverse`` and leaves out ``omit`` VINs
+    """
+
+    calls = []
+    failures = 0
+    reverse = False
+    omit = set()
+    lock = threading.Lock()
+
+    def do_POST(self):
+        form = parse_qs(self.rfile.read(int(self.headers['Content-Length'])).decode())
+        queries = [q.split(',') for q in form['data'][0].split(';')]
+        with self.lock:
+            fail = StubVPIC.failures > 0
+            StubVPIC.failures -= 1
+            StubVPIC.calls.append(len(queries))
+        if fail:
+            self.send_response(503)
+            self.end_headers()
+            return
+        results = [stub_result(*q) for q in queries if q[0] not in StubVPIC.omit]
+        if StubVPIC.reverse:
+            results.reverse()
+        body = json.dumps({'Count': len(results), 'Results': results}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def vpic_url():
+    StubVPIC.calls = []
+    StubVPIC.failures = 0
+    StubVPIC.reverse = False
+    StubVPIC.omit = set()
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubVPIC)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/"
+    server.shutdown()
+
+
+@pytest.fixture
+def vin_file(tmp_path):
+    path = tmp_path / 'vins.txt'
+    path.write_text('\n'.join(VINS + [VINS[0], 'not-a-vin', f"{VINS[1]},2019"]) + '\n')
+    return path
+
+
+def _extractor(vin_file, cache, url, **kwargs):
+    client = VPICClient(url, concurrency=4, requests_per_second=None, **kwargs)
+    return NHTSAExtractor(vin_file, cache=cache, decoder=client, window=100)
+
+
+def test_decodes_in_batches_and_transforms(vin_file, vpic_url):
+    extractor = _extractor(vin_file, VinDecodeCache(':memory:'), vpic_url)
+    transformer = NHTSATransformer()
+
+    records = [r for batch in transformer.transform_batches(extractor.iter_decoded()) for r in batch]
+
+    assert len(records) == 121  # duplicate and malformed lines dropped
+    assert extractor.stats['invalid'] == 1
+    assert max(StubVPIC.calls) <= 50 and sum(StubVPIC.calls) == 121
+    car = records[0]
+    assert car.transport_id == f"auto-{VINS[0]}"
+    assert car.manufacturer == 'Honda'
+    assert car.metadata.source == 'nhtsa'
+    assert car.automobile_data.drive_type == 'FWD'
+    assert car.automobile_data.seat_rows is None  # out of range, not a validation failure
+    assert car.model_variant is None
+    assert any(r.year == 2019 for r in records if r.automobile_data.vin == VINS[1])
+
+
+def test_rerun_only_decodes_uncached_vins(vin_file, vpic_url, tmp_path):
+    cache = VinDecodeCache(tmp_path / 'cache.sqlite')
+    list(_extractor(vin_file, cache, vpic_url).iter_decoded(limit=60))
+    StubVPIC.calls = []
+
+    extractor = _extractor(vin_file, VinDecodeCache(tmp_path / 'cache.sqlite'), vpic_url)
+    results = [r for batch in extractor.iter_decoded() for r in batch]
+
+    assert len(results) == 121
+    assert extractor.stats['cached'] == 60
+    assert sum(StubVPIC.calls) == 61
+
+
+def test_failed_calls_are_retried_then_left_uncached(vin_file, vpic_url):
+    cache = VinDecodeCache(':memory:')
+    StubVPIC.failures = 1
+    extractor = _extractor(vin_file, cache, vpic_url, max_retries=2)
+    assert sum(len(b) for b in extractor.iter_decoded(limit=10)) == 10
+
+    StubVPIC.failures = 10 ** 6
+    extractor = _extractor(vin_file, cache, vpic_url, max_retries=1)
+    results = [r for batch in extractor.iter_decoded(limit=20) for r in batch]
+
+    assert len(results) == 10
+    assert extractor.stats['failed'] == 10
+    assert len(cache) == 10
+
+    # Re-reading what was loaded (reconcile) leaves the failed VINs out
+    StubVPIC.calls = []
+    results = [r for batch in extractor.iter_decoded(limit=20, cached_only=True) for r in batch]
+    assert len(results) == 10 and StubVPIC.calls == []
+
+
+def test_results_are_matched_by_vin(vpic_url):
+    StubVPIC.reverse = True
+    StubVPIC.omit = {VINS[3]}
+    client = VPICClient(vpic_url, concurrency=2, requests_per_second=None)
+    queries = [(vin, '') for vin in VINS[:60]] + [(VINS[1], '2019')]
+
+    results, failed = client.decode_many(queries)
+
+    assert all(result['VIN'] == vin for (vin, _), result in results.items())
+    assert results[(VINS[1], '2019')]['ModelYear'] == '2019'
+    assert failed == [(VINS[3], '')]
+    assert len(results) == 60
@@ -0,0 +1,67 @@
+"""Tests for the manufacturer x state pair index"""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import pytest
+
+from loaders import pair_index
+
+
+class FakeIndices:
+    def exists(self, index):
+        return True
+
+    def refresh(self, index):
+        pass
+
+
+class FakeClient:
+    """Pair documents by _id; delete_by_query understands write_pairs' bool query"""
+
+    def __init__(self):
+        self.indices = FakeIndices()
+        self.docs = {}
+
+    def delete_by_query(self, index, body, refresh):
+        query = body['query']['bool']
+        types = query['filter']['terms']['transport_type']
+        generation = query['must_not']['term']['generation']
+        stale = [i for i, d in self.docs.items()
+                 if d['transport_type'] in types and d['generation'] != generation]
+        for doc_id in stale:
+            del self.docs[doc_id]
+        return {'deleted': len(stale)}
+
+
+@pytest.fixture
+def es(monkeypatch):
+    client = FakeClient()
+
+    def fake_bulk(es, actions, **kwargs):
+        actions = list(actions)
+        for action in actions:
+            es.docs[action['_id']] = action['_source']
+        return len(actions), []
+
+    monkeypatch.setattr(pair_index, 'bulk', fake_bulk)
+    return client
+
+
+def _pair(transport_type, manufacturer, state, generation):
+    return {'pair_key': f"{manufacturer}|{state}", 'transport_type': transport_type,
+            'manufacturer': manufacturer, 'state': state, 'count': 1,
+            'manufacturer_count': 1, 'generation': generation}
+
+
+def test_publishing_one_source_keeps_the_other_sources_pairs(es):
+    pair_index.write_pairs(es, [_pair('plane', 'Cessna', 'TX', 'faa1'),
+                                _pair('plane', 'Piper', 'FL', 'faa1')],
+                           'pairs', 'faa1', ['plane'])
+    pair_index.write_pairs(es, [_pair('automobile', 'Honda', 'OH', 'nhtsa1')],
+                           'pairs', 'nhtsa1', ['automobile'])
+    result = pair_index.write_pairs(es, [_pair('plane', 'Cessna', 'TX', 'faa2')],
+                                    'pairs', 'faa2', ['plane'])
+
+    assert result == {'written': 1, 'deleted': 1}  # Piper|FL left; Honda|OH untouched
+    assert set(es.docs) == {'plane:Cessna|TX', 'automobile:Honda|OH'}
@@ -0,0 +1,72 @@
+"""Tests for bucket-checksum reconciliation"""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from loaders.elasticsearch_loader import (
+    DOC_HASH_FIELD, DOC_HASH32_FIELD, RECON_BUCKET_FIELD, document_hash, hash32, recon_bucket
+)
+from reconcile import Reconciler
+
+
+def to_document(record):
+    doc = dict(record)
+    doc[DOC_HASH_FIELD] = document_hash(doc)
+    doc[DOC_HASH32_FIELD] = hash32(doc[DOC_HASH_FIELD])
+    doc[RECON_BUCKET_FIELD] = recon_bucket(doc['transport_id'])
+    return doc
+
+
+class FakeClient:
+    """Composite/sum aggregations and bucket drill-down over in-memory documents"""
+
+    def __init__(self, docs):
+        self.docs = docs
+        self.drilled = []
+
+    def search(self, index, body):
+        if 'aggs' in body:
+            sums = {}
+            for doc in self.docs:
+                count, total = sums.get(doc[RECON_BUCKET_FIELD], (0, 0))
+                sums[doc[RECON_BUCKET_FIELD]] = (count + 1, total + doc[DOC_HASH32_FIELD])
+            buckets = [{'key': {'bucket': b}, 'doc_count': c, 'hash_sum': {'value': float(t)}}
+                       for b, (c, t) in sorted(sums.items())]
+            return {'aggregations': {'buckets': {'buckets': buckets},
+                                     'unbucketed': {'doc_count': 0}}}
+        buckets = set(body['query']['bool']['filter'][1]['terms'][RECON_BUCKET_FIELD])
+        self.drilled.append(buckets)
+        hits = [{'fields': {'transport_id': [d['transport_id']], DOC_HASH_FIELD: [d[DOC_HASH_FIELD]]}}
+                for d in self.docs if d[RECON_BUCKET_FIELD] in buckets]
+        return {'hits': {'hits': hits}}
+
+
+def _records(n):
+    return [{'transport_id': f'plane-N{i}', 'manufacturer': 'CESSNA', 'year': 1970 + i % 40}
+            for i in range(n)]
+
+
+def test_in_sync_without_drill_down():
+    records = _records(500)
+    es = FakeClient([to_document(r) for r in records])
+    report = Reconciler(es, 'idx', to_document).reconcile(lambda: [records])
+    assert report['in_sync'] and report['source_docs'] == report['index_docs'] == 500
+    assert es.drilled == []
+
+
+def test_pinpoints_diverged_documents():
+    records = _records(500)
+    docs = [to_document(r) for r in records]
+    del docs[10]                                            # missing from index
+    docs.append(to_document({'transport_id': 'plane-X', 'manufacturer': 'PIPER'}))  # extra
+    docs[20] = to_document({**records[21], 'year': 1901})   # changed content
+
+    es = FakeClient(docs)
+    report = Reconciler(es, 'idx', to_document).reconcile(lambda: [records])
+
+    assert not report['in_sync']
+    assert report['missing'] == ['plane-N10']
+    assert report['extra'] == ['plane-X']
+    assert report['changed'] == ['plane-N21']
+    assert report['differing_buckets'] == len(es.drilled[0]) <= 3
+
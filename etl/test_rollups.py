@@ -0,0 +1,68 @@
+"""Tests for the streaming dashboard rollups"""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from collections import Counter
+
+from models import CompactRecord
+from synthetic_data import generate_planes
+from transformers.rollups import RollupAccumulator
+
+
+def test_rollup_counts_match_records():
+    planes = generate_planes(2000)
+    rollup = RollupAccumulator(reference_year=2025)
+    for plane in planes:
+        rollup.add(plane)
+
+    stats = rollup.stats('plane')
+    assert stats['total'] == len(planes)
+
+    manufacturers = Counter(p.manufacturer for p in planes)
+    assert stats['manufacturers'][0] == {'key': manufacturers.most_common(1)[0][0],
+                                         'count': manufacturers.most_common(1)[0][1]}
+    assert stats['manufacturers_cardinality'] == len(manufacturers)
+    assert sum(e['count'] for e in stats['states']) == len(planes)
+    assert sum(e['count'] for e in stats['age_bands']) == len(planes)
+    assert [e['key'] for e in stats['years']] == sorted({p.year for p in planes}, reverse=True)
+
+
+def test_compact_and_model_records_roll_up_identically():
+    planes = generate_planes(500)
+    from_models = RollupAccumulator(reference_year=2025)
+    from_compact = RollupAccumulator(reference_year=2025)
+
+    for plane in planes:
+        from_models.add(plane)
+    for batch in from_compact.observe([[CompactRecord.from_model(p) for p in planes]]):
+        assert len(batch) == len(planes)
+
+    assert from_models.stats('plane') == from_compact.stats('plane')
+
+
+def test_documents_tagged_with_generation():
+    rollup = RollupAccumulator()
+    for plane in generate_planes(10):
+        rollup.add(plane)
+
+    docs = rollup.documents(generation='abc123', source='faa')
+    assert [d['scope'] for d in docs] == ['plane']
+    assert docs[0]['generation'] == 'abc123'
+    assert docs[0]['stats']['total'] == 10
+
+
+def test_pair_documents_cover_every_record_with_both_fields():
+    planes = generate_planes(1000)
+    rollup = RollupAccumulator()
+    for plane in planes:
+        rollup.add(plane)
+
+    docs = rollup.pair_documents(generation='g1')
+    expected = Counter((p.manufacturer, p.location.state_province) for p in planes)
+
+    assert {(d['manufacturer'], d['state']): d['count'] for d in docs} == expected
+    assert len({d['pair_key'] for d in docs}) == len(docs)
+    for doc in docs:
+        assert doc['manufacturer_count'] == sum(c for (m, _), c in expected.items()
+                                                if m == doc['manufacturer'])
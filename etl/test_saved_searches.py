@@ -0,0 +1,164 @@
+"""Tests for saved-search alerts (change detection, percolation, outbox)"""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from loaders.elasticsearch_loader import DOC_HASH_FIELD, ElasticsearchLoader, document_hash
+from loaders.saved_searches import AlertOutbox, SavedSearchAlerts, saved_search_index_body
+
+
+class FakeIndices:
+    def __init__(self, existing):
+        self.existing = set(existing)
+
+    def exists(self, index):
+        return index in self.existing
+
+    def create(self, index, body):
+        self.existing.add(index)
+
+
+class FakeClient:
+    """Live documents by id and saved searches as predicates over documents"""
+
+    def __init__(self, live, searches):
+        self.indices = FakeIndices({'live', 'searches'})
+        self.live = live
+        self.searches = searches
+        self.percolated = []
+
+    def count(self, index):
+        return {'count': len(self.searches)}
+
+    def search(self, index, query=None, size=None, source=None, body=None):
+        if index == 'live':
+            hits = [{'_id': i, '_source': {DOC_HASH_FIELD: self.live[i]}}
+                    for i in query['ids']['values'] if i in self.live]
+            return {'hits': {'hits': hits}}
+        docs = body['query']['percolate']['documents']
+        self.percolated.append(docs)
+        hits = []
+        for search_id, predicate in sorted(self.searches.items()):
+            slots = [slot for slot, doc in enumerate(docs) if predicate(doc)]
+            if slots:
+                hits.append({'_source': {'saved_search': {'id': search_id, 'user': 'u1'}},
+                             'fields': {'_percolator_document_slot': slots},
+                             'sort': [search_id]})
+        return {'hits': {'hits': hits}}
+
+
+def _doc(transport_id, manufacturer):
+    doc = {'transport_id': transport_id, 'manufacturer': manufacturer,
+           'metadata': {'source': 'faa', 'ingest_date': '2026-01-01T00:00:00'}}
+    doc[DOC_HASH_FIELD] = document_hash(doc)
+    return doc
+
+
+class Record:
+    """Stand-in for a transformed record; to_document returns its document"""
+
+    def __init__(self, doc):
+        self.transport_id = doc['transport_id']
+        self.doc = doc
+
+
+def test_document_hash_ignores_volatile_fields():
+    doc = _doc('plane-N1', 'CESSNA')
+    later = {**doc, 'metadata': {'source': 'faa', 'ingest_date': '2026-02-01T00:00:00'}}
+    assert document_hash(later) == doc[DOC_HASH_FIELD]
+    assert document_hash({**doc, 'year': None}) == doc[DOC_HASH_FIELD]
+    assert document_hash({**doc, 'manufacturer': 'PIPER'}) != doc[DOC_HASH_FIELD]
+
+
+def test_only_new_and_changed_documents_are_percolated():
+    unchanged = _doc('plane-N1', 'CESSNA')
+    changed = _doc('plane-N2', 'CESSNA')
+    es = FakeClient(
+        live={'plane-N1': unchanged[DOC_HASH_FIELD], 'plane-N2': 'old-hash'},
+        searches={'cessnas': lambda d: d['manufacturer'] == 'CESSNA',
+                  'pipers': lambda d: d['manufacturer'] == 'PIPER'}
+    )
+    outbox = AlertOutbox(':memory:')
+    alerts = SavedSearchAlerts(es, 'live', 'searches', outbox, run_id='r1')
+
+    batches = [[Record(unchanged), Record(changed), Record(_doc('plane-N3', 'PIPER'))]]
+    built = []
+
+    def to_document(record):
+        built.append(record.transport_id)
+        return record.doc
+
+    [prepared] = list(alerts.observe(batches, to_document))
+
+    # Each document is built once and the loader indexes it as is
+    assert built == ['plane-N1', 'plane-N2', 'plane-N3']
+    actions = ElasticsearchLoader(offline=True, index_name='live').prepare_bulk_actions(prepared)
+    assert [a['_source'] for a in actions] == [r.doc for r in batches[0]]
+    assert built == ['plane-N1', 'plane-N2', 'plane-N3']
+
+    assert [d['transport_id'] for d in es.percolated[0]] == ['plane-N2', 'plane-N3']
+    assert alerts.stats == {'checked': 3, 'new': 1, 'changed': 1, 'matches': 2}
+
+    # Staged events stay invisible until the load is published
+    assert outbox.pending() == []
+    assert alerts.finish(published=True) == 2
+    events = {(e['search_id'], e['transport_id'], e['change']) for e in outbox.pending()}
+    assert events == {('cessnas', 'plane-N2', 'changed'), ('pipers', 'plane-N3', 'new')}
+
+
+def test_outbox_discards_unpublished_and_ignores_duplicates():
+    outbox = AlertOutbox(':memory:')
+    event = {'search_id': 's', 'user': 'u', 'transport_id': 't', 'change': 'new',
+             'doc_hash': 'h', 'document': {}}
+    assert outbox.stage('r1', [event]) == 1
+    assert outbox.discard('r1') == 1
+
+    assert outbox.stage('r2', [event, event]) == 1
+    outbox.commit('r2')
+    assert outbox.stage('r3', [event]) == 0
+
+    [pending] = outbox.pending()
+    outbox.mark_sent([pending['id']])
+    assert outbox.pending() == []
+
+
+def test_first_load_is_a_baseline():
+    es = FakeClient(live={}, searches={'all': lambda d: True})
+    es.indices.existing.discard('live')
+    alerts = SavedSearchAlerts(es, 'live', 'searches', AlertOutbox(':memory:'))
+    batches = [[Record(_doc('plane-N1', 'CESSNA'))]]
+    assert list(alerts.observe(batches, lambda r: r.doc)) == batches
+    assert es.percolated == []
+
+
+def test_percolator_index_maps_document_fields():
+    properties = saved_search_index_body()['mappings']['properties']
+    assert properties['query'] == {'type': 'percolator'}
+    assert properties['manufacturer_state']['type'] == 'keyword'
+    assert 'owner' in properties and 'saved_search' in properties
+
+
+BUILTIN_ANALYZERS = {'standard', 'simple', 'whitespace', 'stop', 'keyword', 'pattern', 'english'}
+
+
+def _analysis_references(mapping):
+    """(kind, name) of every analyzer/normalizer a mapping references"""
+    if isinstance(mapping, dict):
+        for key, value in mapping.items():
+            if key in ('analyzer', 'search_analyzer', 'search_quote_analyzer') and isinstance(value, str):
+                yield 'analyzer', value
+            elif key == 'normalizer' and isinstance(value, str):
+                yield 'normalizer', value
+            else:
+                yield from _analysis_references(value)
+
+
+def test_percolator_index_defines_referenced_analyzers():
+    body = saved_search_index_body()
+    analysis = body['settings'].get('analysis', {})
+    references = set(_analysis_references(body['mappings']))
+
+    assert ('analyzer', 'transport_analyzer') in references
+    for kind, name in references:
+        assert name in analysis.get(kind, {}) or (kind == 'analyzer' and name in BUILTIN_ANALYZERS), \
+            f"{kind} '{name}' is not defined in the index settings"
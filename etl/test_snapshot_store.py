@@ -0,0 +1,80 @@
+"""Tests for Parquet transform snapshots"""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from models import PlaneTransport
+from loaders.snapshot_store import SnapshotWriter, SnapshotReader, find_snapshot
+from test_compact import _transformer, _master_row
+
+
+def test_snapshot_round_trip(tmp_path):
+    """Records read back from a snapshot rebuild identical documents"""
+    transformer = _transformer()
+    planes = [transformer.transform_row(_master_row(f"N{i}", f"OWNER {i}")) for i in range(250)]
+    planes.append(PlaneTransport(
+        transport_id="plane-N0",
+        transport_type="plane",
+        metadata={"source": "faa", "source_id": "N0"},
+        plane_data={"n_number": "N0"}
+    ))
+
+    writer = SnapshotWriter('faa', 'abc123', root=tmp_path, row_group_size=100, rows_per_file=200)
+    writer.write(planes)
+    manifest = writer.close()
+
+    assert manifest['total_rows'] == len(planes)
+    assert len(manifest['partitions']['plane']['files']) == 2
+
+    path = find_snapshot('faa', root=tmp_path)
+    assert path == tmp_path / 'faa' / 'abc123'
+    assert find_snapshot('faa', 'missing', root=tmp_path) is None
+
+    batches = list(SnapshotReader(path).iter_batches(batch_size=64))
+    records = [record for batch in batches for record in batch]
+
+    assert all(len(batch) <= 64 for batch in batches)
+    assert [r.to_document() for r in records] == [p.model_dump(mode='json') for p in planes]
+
+
+def test_snapshot_without_new_field_derives_it(tmp_path):
+    """Snapshots written before manufacturer_state existed still load it"""
+    import pyarrow.parquet as pq
+
+    transformer = _transformer()
+    planes = [transformer.transform_row(_master_row(f"N{i}", f"OWNER {i}")) for i in range(10)]
+
+    writer = SnapshotWriter('faa', 'old', root=tmp_path)
+    writer.write(planes)
+    writer.close()
+
+    part = next((tmp_path / 'faa' / 'old').rglob('*.parquet'))
+    table = pq.read_table(part)
+    pq.write_table(table.drop(['manufacturer_state']), part)
+
+    records = [r for batch in SnapshotReader(tmp_path / 'faa' / 'old').iter_batches() for r in batch]
+    assert [r.get('manufacturer_state') for r in records] == [p.manufacturer_state for p in planes]
+    assert planes[0].manufacturer_state is not None
+
+
+def test_failed_stream_aborts_snapshot(tmp_path):
+    """A transform error mid-stream leaves no manifest and no open files"""
+    from run_etl import _written
+
+    transformer = _transformer()
+
+    def batches():
+        yield [transformer.transform_row(_master_row("N1", "OWNER 1"))]
+        raise RuntimeError("transform failed")
+
+    writer = SnapshotWriter('faa', 'broken', root=tmp_path, rows_per_file=1)
+    with pytest.raises(RuntimeError):
+        for _ in _written(batches(), writer, extra={}):
+            pass
+
+    assert find_snapshot('faa', 'broken', root=tmp_path) is None
+    assert all(p['writer'] is None for p in writer._partitions.values())
@@ -0,0 +1,130 @@
+"""Tests for the offline vPIC pattern-table VIN decoder"""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import sqlite3
+
+import pytest
+
+from extractors.nhtsa_extractor import NHTSAExtractor, VinDecodeCache
+from extractors.vpic_offline import OfflineVINDecoder, check_digit, cross_check
+from transformers.nhtsa_transformer import NHTSATransformer
+
+
+TABLES = {
+    'Element': ("Id, Name, Code, LookupTable, IsPrivate", [
+        (28, 'Model', 'Model', 'Model', 0),
+        (5, 'Body Class', 'BodyClass', 'BodyStyle', 0),
+        (13, 'Displacement (L)', 'DisplacementL', None, 0),
+        (15, 'Drive Type', 'DriveType', 'DriveType', 0),
+        (31, 'Plant City', 'PlantCity', None, 0),
+        (99, 'Internal Note', 'InternalNote', None, 1),
+    ]),
+    'Make': ("Id, Name", [(474, 'HONDA'), (9000, 'SMALLCO')]),
+    'Model': ("Id, Name", [(1861, 'Accord'), (1863, 'Civic')]),
+    'Make_Model': ("Id, MakeId, ModelId", [(1, 474, 1861), (2, 474, 1863)]),
+    'Manufacturer': ("Id, Name", [(988, 'AMERICAN HONDA MOTOR CO., INC.'), (5000, 'SMALL CO')]),
+    'VehicleType': ("Id, Name", [(2, 'PASSENGER CAR')]),
+    'BodyStyle': ("Id, Name", [(13, 'Sedan/Saloon')]),
+    'DriveType': ("Id, Name", [(1, 'FWD/Front-Wheel Drive')]),
+    'Wmi': ("Id, Wmi, ManufacturerId, MakeId, VehicleTypeId", [
+        (1, '1HG', 988, 474, 2),
+        (2, '1X9ABC', 5000, 9000, 2),
+    ]),
+    'Wmi_VinSchema': ("Id, WmiId, VinSchemaId, YearFrom, YearTo", [
+        (1, 1, 10, 2018, 2022),
+        (2, 2, 20, 2000, None),
+    ]),
+    'Pattern': ("Id, VinSchemaId, Keys, ElementId, AttributeId", [
+        (1, 10, 'CV***', 13, '2.0'),
+        (2, 10, 'CV1F3', 28, '1861'),
+        (3, 10, 'CV1F3', 13, '1.5'),
+        (4, 10, 'CV[1-2]F', 5, '13'),
+        (5, 10, 'CV1F3', 15, '1'),
+        (6, 10, 'CV1F3|*A', 31, 'MARYSVILLE'),
+        (7, 10, 'CV1F3', 99, 'hidden'),
+        (8, 10, 'FC2F7', 28, '1863'),
+        (9, 20, '*****', 13, '0.8'),
+    ]),
+}
+
+
+def make_vin(prefix: str, suffix: str) -> str:
+    """VIN from positions 1-8 and 10-17 with a valid check digit"""
+    vin = f"{prefix}0{suffix}"
+    return vin[:8] + check_digit(vin) + vin[9:]
+
+
+@pytest.fixture(scope='module')
+def decoder(tmp_path_factory):
+    path = tmp_path_factory.mktemp('vpic') / 'vpic.sqlite'
+    conn = sqlite3.connect(str(path))
+    for table, (columns, rows) in TABLES.items():
+        conn.execute(f"CREATE TABLE {table} ({columns})")
+        conn.executemany(f"INSERT INTO {table} VALUES ({', '.join('?' * len(rows[0]))})", rows)
+    conn.commit()
+    conn.close()
+    return OfflineVINDecoder(path)
+
+
+def test_decodes_most_specific_patterns(decoder):
+    result = decoder.decode(make_vin('1HGCV1F3', 'LA000123'))
+
+    assert result['Make'] == 'HONDA'
+    assert result['Model'] == 'Accord' and result['ModelID'] == '1861'
+    assert result['ModelYear'] == '2020'
+    assert result['DisplacementL'] == '1.5'  # CV1F3 beats CV***
+    assert result['BodyClass'] == 'Sedan/Saloon'
+    assert result['PlantCity'] == 'MARYSVILLE'
+    assert result['VehicleType'] == 'PASSENGER CAR'
+    assert result['ErrorCode'] == '0'
+    assert 'InternalNote' not in result
+
+
+def test_decode_errors(decoder):
+    vin = make_vin('1HGCV1F3', 'LB000123')
+    bad_check = vin[:8] + ('0' if vin[8] != '0' else '1') + vin[9:]
+    assert decoder.decode(bad_check)['ErrorCode'] == '1'
+    assert decoder.decode(make_vin('1HGCV1F3', 'FA000123'))['ErrorCode'] == '8'  # 2015: no schema
+    assert decoder.decode(make_vin('5YJ3E1EA', 'LF000001'))['ErrorCode'] == '7'
+    assert decoder.decode(make_vin('1HGCV1F3', 'LB000123'), '2019')['ModelYear'] == '2019'
+
+
+def test_small_manufacturer_wmi(decoder):
+    result = decoder.decode(make_vin('1X9AA1F3', 'LAABC123'))
+    assert result['Make'] == 'SMALLCO'
+    assert result['DisplacementL'] == '0.8'
+
+
+def test_fills_automobile_data_without_cache(decoder, tmp_path):
+    vins = [make_vin('1HGCV1F3', f"LA{i:06d}") for i in range(30)]
+    vin_file = tmp_path / 'vins.txt'
+    vin_file.write_text('\n'.join(vins) + '\n')
+    cache = VinDecodeCache(':memory:')
+
+    extractor = NHTSAExtractor(vin_file, cache=cache, decoder=decoder)
+    records = [r for b in NHTSATransformer().transform_batches(extractor.iter_decoded()) for r in b]
+
+    assert len(records) == 30
+    assert records[0].automobile_data.drive_type == 'FWD'
+    assert records[0].automobile_data.displacement_l == 1.5
+    assert len(cache) == 0
+
+
+def test_cross_check_reports_disagreements(decoder):
+    queries = [(make_vin('1HGCV1F3', f"LA{i:06d}"), '') for i in range(10)]
+
+    class Reference:
+        def decode_many(self, queries):
+            results, _ = decoder.decode_many(queries)
+            results[queries[0]] = {**results[queries[0]], 'Model': 'Accord Sport', 'DisplacementL': '1.50'}
+            return results, []
+
+    report = cross_check(decoder, Reference(), queries)
+
+    assert report['compared'] == 10
+    assert report['fields']['Model'] == {'agree': 9, 'disagree': 1, 'missing_offline': 0, 'extra_offline': 0}
+    assert report['fields']['DisplacementL']['disagree'] == 0
+    assert report['examples'] == [{'vin': queries[0][0], 'field': 'Model',
+                                   'offline': 'Accord', 'online': 'Accord Sport'}]
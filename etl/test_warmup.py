@@ -0,0 +1,116 @@
+"""Tests for the post-load warmup stage"""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from warmup import DEFAULT_QUERIES, warm_index, warmup_queries
+from workload_replay import WorkloadRequest, save_workload
+
+
+class FakeClient:
+    def __init__(self):
+        self.searches = []
+
+    def search(self, index, body):
+        self.searches.append(index)
+        return {}
+
+
+def test_warmup_queries_rank_recorded_traffic(tmp_path):
+    popular = WorkloadRequest('search', {'manufacturer': 'CESSNA', 'page': 1})
+    path = tmp_path / 'workload.jsonl'
+    save_workload(path, [popular] * 5 + [WorkloadRequest('suggest', {'prefix': 'ce'})])
+
+    queries = warmup_queries(top_n=3, workload_path=path)
+
+    assert queries[0].key == popular.key
+    assert len(queries) == 3
+    assert len(warmup_queries(top_n=50, workload_path=path)) == 2 + len(DEFAULT_QUERIES)
+
+
+def test_warm_index_reports_before_and_after():
+    es = FakeClient()
+    report = warm_index(es, 'transport-plane-new', DEFAULT_QUERIES, passes=3, concurrency=2)
+
+    assert len(es.searches) == 3 * len(DEFAULT_QUERIES)
+    assert 'transport-plane-new' in es.searches
+    assert report['before']['label'] == 'cold' and report['after']['label'] == 'warm'
+    assert set(report['comparison']) >= {'overall', 'statistics', 'search'}
+
+
+class FailingPickerClient(FakeClient):
+    def search(self, index, body):
+        if index == 'pairs':
+            raise ConnectionError('pair index unavailable')
+        return super().search(index, body)
+
+
+def test_warm_index_reports_failures():
+    report = warm_index(FailingPickerClient(), 'transport-plane-new', DEFAULT_QUERIES,
+                        pairs_index='pairs', concurrency=1)
+
+    assert report['failures'] == {'picker': {'errors': 1, 'queries': 1,
+                                             'error': 'pair index unavailable'}}
+
+
+class FakeLoader:
+    """Records the order of load, warmup and publish steps"""
+
+    def __init__(self, events):
+        self.events = events
+        self.es = self
+        self.targets = ['primary']
+        self.layout = object()
+        self.write_indices = 'transport-plane-new'
+        self.pairs_index = 'pairs'
+
+    def search(self, index, body):
+        self.events.append(f"search {index}")
+        return {}
+
+    def prepare_layout(self):
+        return []
+
+    def load_stream(self, batches):
+        return {'success': sum(len(b) for b in batches), 'errors': 0}
+
+    def activate_layout(self, delete_previous=False):
+        self.events.append('activate')
+
+    def write_rollups(self, documents):
+        pass
+
+    def write_pairs(self, documents, generation, transport_types):
+        self.events.append('write_pairs')
+
+    def mark_generation(self, generation, **kwargs):
+        self.events.append('mark_generation')
+
+
+def test_picker_is_warmed_after_the_new_pairs_are_written():
+    from run_etl import load_with_layout, publish_load
+    from transformers.rollups import RollupAccumulator
+
+    events = []
+    loader = FakeLoader(events)
+    result = load_with_layout(loader, [['plane-N1']], warmup=DEFAULT_QUERIES)
+    publish_load(loader, RollupAccumulator(), result, checksum='abc', source='faa',
+                 warmup=DEFAULT_QUERIES)
+
+    activate, pairs = events.index('activate'), events.index('write_pairs')
+    assert 'search pairs' not in events[:pairs]
+    assert events[activate - 1] == 'search transport-plane-new'
+    assert events[pairs + 1:] == ['search pairs', 'search pairs', 'mark_generation']
+    assert len(result['warmup']) == 2
+
+
+def test_empty_load_does_not_go_live():
+    from run_etl import load_with_layout, publish_load
+    from transformers.rollups import RollupAccumulator
+
+    events = []
+    loader = FakeLoader(events)
+    result = load_with_layout(loader, [], delete_previous=True, warmup=DEFAULT_QUERIES)
+    publish_load(loader, RollupAccumulator(), result, checksum='abc', source='nhtsa')
+
+    assert events == []
@@ -0,0 +1,147 @@
+"""Tests for the workload replay harness"""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import json
+import shutil
+import subprocess
+import time
+
+import pytest
+
+from workload_replay import (
+    WorkloadRequest, build_query, compare_reports, es_request, parse_access_log, percentile, replay,
+    top_requests
+)
+
+BACKEND = Path(__file__).parent.parent / 'backend'
+
+# Builds each request's body with backend/src/utils/searchBodies.js, deriving
+# paging and limits from the query parameters the way the controllers do
+BACKEND_BODIES = """
+const { sourceFilter } = require('./src/utils/queryBuilder');
+require('./src/utils/mappingFeatures').setPairKeys(true);
+const bodies = require('./src/utils/searchBodies');
+const requests = JSON.parse(require('fs').readFileSync(0, 'utf8'));
+const referenceYear = parseInt(process.argv[1]);
+const paging = ({ page = 1, size = 20 }) => {
+  const pageSize = parseInt(size);
+  return { from: (parseInt(page) - 1) * pageSize, size: pageSize };
+};
+console.log(JSON.stringify(requests.map(({ kind, params }) => {
+  if (kind === 'search') {
+    const { from, size } = paging(params);
+    return bodies.searchBody(params, { from, size, trackTotalHits: 10000, source: sourceFilter(params) });
+  }
+  if (kind === 'search_statistics') return bodies.searchStatisticsBody(params);
+  if (kind === 'statistics') return bodies.statisticsBody(params, referenceYear);
+  if (kind === 'picker') {
+    const { from, size } = paging(params);
+    return bodies.pairSearchBody((params.search || '').trim(), from, size);
+  }
+  const target = bodies.SUGGEST_TARGETS[params.field || 'manufacturer'];
+  const prefix = (params.prefix || '').trim().slice(0, 64);
+  if (!target || !prefix) return null;
+  const size = Math.min(Math.max(parseInt(params.size || 10) || 10, 1), 20);
+  return bodies.suggestBody(target, prefix, size);
+})));
+"""
+
+
+def test_parse_access_log():
+    lines = [
+        '10.0.0.1 - - [18/Oct/2026:10:00:00 +0000] "GET /api/v1/aircraft?manufacturer=CESSNA&page=2 HTTP/1.1" 200 512',
+        'GET /api/v1/statistics 200 12ms',
+        '"GET /api/v1/aircraft/plane-N1 HTTP/1.1" 200',
+        '"GET /api/v1/manufacturer-state-combinations?search=pi HTTP/1.1" 200',
+        'POST /api/v1/saved-searches 201',
+    ]
+    workload = parse_access_log(lines)
+    assert [(r.kind, r.params) for r in workload] == [
+        ('search', {'manufacturer': 'CESSNA', 'page': '2'}),
+        ('statistics', {}),
+        ('picker', {'search': 'pi'}),
+    ]
+
+
+def test_top_requests_ranks_by_frequency():
+    workload = [WorkloadRequest('statistics')] * 3 + [WorkloadRequest('search', {'page': 1})] * 5 \
+        + [WorkloadRequest('picker')]
+    assert [r.kind for r in top_requests(workload, 2)] == ['search', 'statistics']
+
+
+def test_build_query_mirrors_api_filters():
+    assert build_query({}) == {'match_all': {}}
+    query = build_query({'manufacturer_state_combos': 'CESSNA:TX,PIPER:FL', 'manufacturer': 'X',
+                         'year_min': '1990'})
+    assert query == {'bool': {'must': [
+        {'terms': {'manufacturer_state': ['CESSNA|TX', 'PIPER|FL']}},
+        {'range': {'year': {'gte': 1990}}},
+    ]}}
+
+    # Indices mapped before manufacturer_state existed
+    query = build_query({'manufacturer_state_combos': 'CESSNA:TX'}, pair_keys=False)
+    assert query == {'bool': {'must': [{'bool': {'should': [
+        {'bool': {'must': [{'term': {'manufacturer.keyword': 'CESSNA'}},
+                           {'term': {'location.state_province': 'TX'}}]}},
+    ], 'minimum_should_match': 1}}]}}
+
+
+def test_percentile_nearest_rank():
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 99) == 99
+    assert percentile([7], 95) == 7
+    assert percentile([], 50) is None
+
+
+class SleepyTarget:
+    name = 'fake'
+
+    def execute(self, request):
+        if request.kind == 'picker':
+            raise RuntimeError('boom')
+        time.sleep(0.001)
+
+
+def test_replay_reports_per_kind():
+    workload = [WorkloadRequest('search')] * 20 + [WorkloadRequest('picker')] * 2
+    report = replay(SleepyTarget(), workload, concurrency=4)
+
+    assert report['kinds']['search']['count'] == 20
+    assert report['kinds']['search']['p50_ms'] >= 1
+    assert report['kinds']['picker'] == {**report['kinds']['picker'], 'count': 2, 'errors': 2}
+    assert report['overall']['count'] == 22
+
+    comparison = compare_reports(report, report)
+    assert comparison['search']['p95_ms']['change_pct'] == 0.0
+
+
+@pytest.mark.skipif(shutil.which('node') is None or not (BACKEND / 'src').is_dir(),
+                    reason='needs node and the backend sources')
+def test_es_request_bodies_match_the_backend():
+    filters = {'manufacturer_state_combos': ' PIPER : FL,CESSNA:TX,PIPER:FL', 'model': '172',
+               'year_min': '1990', 'year_max': '2005.5', 'query': ' skyhawk '}
+    workload = [
+        WorkloadRequest('search', {'page': 3, 'size': 20}),
+        WorkloadRequest('search', {**filters, 'view': 'full'}),
+        WorkloadRequest('search', {'manufacturer': 'CESSNA', 'state': 'TX', 'fields': 'model,-owner'}),
+        WorkloadRequest('search_statistics', filters),
+        WorkloadRequest('statistics'),
+        WorkloadRequest('statistics', {'manufacturer': 'PIPER'}),
+        WorkloadRequest('picker', {'page': 2, 'size': 20, 'search': ' ce'}),
+        WorkloadRequest('picker', {'search': 'c'}),
+        WorkloadRequest('suggest', {'field': 'owner', 'prefix': 'smi', 'size': 50}),
+        WorkloadRequest('suggest', {'prefix': 'ce'}),
+        WorkloadRequest('suggest', {'field': 'color', 'prefix': 'r'}),
+        WorkloadRequest('suggest', {'prefix': '  '}),
+    ]
+    result = subprocess.run(['node', '-e', BACKEND_BODIES, '2026'], cwd=BACKEND, check=True,
+                            input=json.dumps([r.to_dict() for r in workload]),
+                            capture_output=True, text=True)
+    backend = json.loads(result.stdout)
+
+    for request, expected in zip(workload, backend):
+        search = es_request(request, 'transports', reference_year=2026)
+        assert (search and json.loads(json.dumps(search['body']))) == expected, request
@@ -6,8 +6,9 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 import csv
 import logging
 from datetime import datetime
-from typing import Optional, Dict, List
-from models import PlaneTransport, PlaneData, Location, Dates, Owner, Specifications, Metadata
+from typing import Optional, Dict, List, Union
+from models import PlaneTransport, PlaneData, Location, Dates, Owner, Specifications, Metadata, CompactRecord, manufacturer_state_key
+from transformers.rollups import RollupAccumulator
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -195,15 +196,16 @@ class FAATransformer:
             # Extract type aircraft from aircraft_info, not from row position
             type_aircraft = aircraft_info.get('type_aircraft', '').strip()
             
+            manufacturer = self.normalize_manufacturer(aircraft_info.get('manufacturer', ''))
+            state = row[10].strip() or None  # STATE is at position 10
+            
             # Build transport model
             transport = PlaneTransport(
                 transport_id=f"plane-{n_number}",
                 transport_type="plane",
                 category=self.AIRCRAFT_TYPE_MAP.get(type_aircraft, 'other'),
                 
-                manufacturer=self.normalize_manufacturer(
-                    aircraft_info.get('manufacturer', '')
-                ),
+                manufacturer=manufacturer,
                 manufacturer_country='US',
                 
                 model=aircraft_info.get('model', ''),
@@ -216,7 +218,7 @@ class FAATransformer:
                 
                 location=Location(
                     city=row[9].strip() or None,  # CITY is at position 9
-                    state_province=row[10].strip() or None,  # STATE is at position 10
+                    state_province=state,
                     country='US'
                 ),
                 
@@ -265,7 +267,9 @@ class FAATransformer:
                     fractional_ownership=False,
                     aircraft_mfr_model_code=aircraft_code or None,
                     engine_mfr_model_code=engine_code or None
-                )
+                ),
+                
+                manufacturer_state=manufacturer_state_key(manufacturer, state)
             )
             
             return transport
@@ -274,8 +278,19 @@ class FAATransformer:
             logger.debug(f"Error transforming row: {e}")
             return None
     
-    def transform_file(self, master_path: Path, limit: Optional[int] = None) -> List[PlaneTransport]:
-        """Transform MASTER.txt file to list of PlaneTransport objects"""
+    def transform_file(self, master_path: Path, limit: Optional[int] = None,
+                       compact: bool = False,
+                       rollup: Optional[RollupAccumulator] = None) -> List[Union[PlaneTransport, CompactRecord]]:
+        """
+        Transform MASTER.txt file to list of PlaneTransport objects
+        
+        Args:
+            master_path: Path to MASTER.txt
+            limit: Optional limit on number of rows to read
+            compact: Keep validated records as CompactRecord instead of
+                     pydantic objects (much smaller when buffering full runs)
+            rollup: Accumulator updated with every valid record (dashboard stats)
+        """
         logger.info(f"Transforming {master_path}")
         if limit:
             logger.info(f"Limiting to {limit} records")
@@ -293,7 +308,9 @@ class FAATransformer:
                 
                 transport = self.transform_row(row)
                 if transport:
-                    results.append(transport)
+                    if rollup is not None:
+                        rollup.add(transport)
+                    results.append(CompactRecord.from_model(transport) if compact else transport)
                 else:
                     errors += 1
                 
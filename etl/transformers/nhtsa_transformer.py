@@ -0,0 +1,220 @@
+"""Transform NHTSA vPIC decode results to unified transport model"""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import logging
+from functools import partial
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
+from models import AutomobileTransport, AutomobileData, Specifications, Metadata, CompactRecord
+from models.automobiles import SafetyFeatures, ElectricVehicle
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class NHTSATransformer:
+    """Transform vPIC DecodeVINValues results to unified schema"""
+
+    # DriveType values start with the abbreviation ("FWD/Front-Wheel Drive")
+    DRIVE_TYPE_MAP = {
+        'FWD': 'FWD',
+        'RWD': 'RWD',
+        'AWD': 'AWD',
+        '4WD': '4WD',
+        '4X4': '4WD',
+        '4X2': 'RWD',
+        '6X4': 'RWD',
+        '6X6': '4WD',
+        '8X4': 'RWD',
+        '8X8': '4WD',
+    }
+
+    # FuelTypePrimary -> specifications.engine_type
+    ENGINE_TYPE_MAP = {
+        'Electric': 'electric',
+        'Gasoline': 'combustion',
+        'Diesel': 'combustion',
+        'Flexible Fuel Vehicle (FFV)': 'combustion',
+        'Compressed Natural Gas (CNG)': 'combustion',
+        'Liquefied Petroleum Gas (propane or LPG)': 'combustion',
+        'Ethanol (E85)': 'combustion',
+        'Hydrogen': 'fuel_cell',
+        'Fuel Cell': 'fuel_cell',
+    }
+
+    # Makes kept upper case when the rest are title-cased
+    ACRONYM_MAKES = {'BMW', 'GMC', 'RAM', 'MG', 'AM', 'BYD', 'VPG', 'FCA', 'NIO'}
+
+    def __init__(self):
+        """Initialize transformer"""
+        self.stats = {'valid': 0, 'skipped': 0}
+        logger.info("NHTSA Transformer initialized")
+
+    @staticmethod
+    def text(result: Dict[str, Any], key: str) -> Optional[str]:
+        """Variable value, None when vPIC left it empty"""
+        value = result.get(key)
+        if value is None:
+            return None
+        value = str(value).strip()
+        return value if value and value != 'Not Applicable' else None
+
+    def number(self, result: Dict[str, Any], key: str, lo: float = 0,
+               hi: Optional[float] = None) -> Optional[float]:
+        """Numeric variable, None if missing, unparsable or out of range"""
+        value = self.text(result, key)
+        try:
+            number = float(value.replace(',', '')) if value else None
+        except ValueError:
+            return None
+        if number is None or number < lo or (hi is not None and number > hi):
+            return None
+        return number
+
+    def integer(self, result: Dict[str, Any], key: str, lo: int = 0,
+                hi: Optional[int] = None) -> Optional[int]:
+        number = self.number(result, key, lo, hi)
+        return int(round(number)) if number is not None else None
+
+    def normalize_make(self, make: Optional[str]) -> Optional[str]:
+        """Title-case vPIC's upper-case makes, keeping acronyms"""
+        if not make:
+            return None
+        return ' '.join(w if w in self.ACRONYM_MAKES else w.title() for w in make.split())
+
+    def drive_type(self, value: Optional[str]) -> Optional[str]:
+        if not value:
+            return None
+        return self.DRIVE_TYPE_MAP.get(value.split('/')[0].strip().upper(), 'unknown')
+
+    def transform_result(self, result: Dict[str, Any]) -> Optional[AutomobileTransport]:
+        """Transform one vPIC result (DecodeVINValues variables) to AutomobileTransport"""
+        vin = (self.text(result, 'VIN') or '').upper()
+        make = self.normalize_make(self.text(result, 'Make'))
+        if len(vin) != 17 or not make:
+            return None  # Nothing decoded beyond the VIN itself
+
+        try:
+            t = partial(self.text, result)
+            fuel = t('FuelTypePrimary')
+            hp = self.integer(result, 'EngineHP')
+            electric = None
+            if t('ElectrificationLevel') or t('BatteryType') or t('BatteryKWh'):
+                electric = ElectricVehicle(
+                    battery_type=t('BatteryType'),
+                    battery_kwh=self.number(result, 'BatteryKWh'),
+                    battery_voltage=self.integer(result, 'BatteryV'),
+                    battery_amps=self.integer(result, 'BatteryA'),
+                    battery_modules=self.integer(result, 'BatteryModules'),
+                    battery_cells=self.integer(result, 'BatteryCells'),
+                    charger_level=t('ChargerLevel')
+                )
+
+            transport = AutomobileTransport(
+                transport_id=f"auto-{vin}",
+                transport_type="automobile",
+                category=t('VehicleType'),
+
+                manufacturer=make,
+
+                model=t('Model'),
+                model_variant=t('Trim') or t('Series'),
+
+                year=self.integer(result, 'ModelYear', 1900, 2030),
+
+                registration_id=vin,
+                registration_country='US',
+
+                specifications=Specifications(
+                    engine_type=self.ENGINE_TYPE_MAP.get(fuel, 'other') if fuel else None,
+                    fuel_type=fuel.lower() if fuel else None,
+                    capacity=self.integer(result, 'Seats', 1, 200),
+                    power={'value': hp, 'unit': 'hp'} if hp else None
+                ),
+
+                metadata=Metadata(
+                    source='nhtsa',
+                    source_id=vin,
+                    ingest_date=datetime.utcnow()
+                ),
+
+                automobile_data=AutomobileData(
+                    vin=vin,
+                    make_id=self.integer(result, 'MakeID'),
+                    model_id=self.integer(result, 'ModelID'),
+                    manufacturer_id=self.integer(result, 'ManufacturerId'),
+                    vehicle_type=t('VehicleType'),
+                    body_class=t('BodyClass'),
+                    series=t('Series'),
+                    doors=self.integer(result, 'Doors', 0, 6),
+                    seat_rows=self.integer(result, 'SeatRows', 1, 4),
+                    displacement_l=self.number(result, 'DisplacementL'),
+                    displacement_ci=self.number(result, 'DisplacementCI'),
+                    engine_cylinders=self.integer(result, 'EngineCylinders', 0, 16),
+                    engine_configuration=t('EngineConfiguration'),
+                    engine_hp=hp,
+                    engine_kw=self.integer(result, 'EngineKW'),
+                    engine_manufacturer=t('EngineManufacturer'),
+                    engine_model=t('EngineModel'),
+                    transmission_style=t('TransmissionStyle'),
+                    transmission_speeds=self.integer(result, 'TransmissionSpeeds', 1, 12),
+                    drive_type=self.drive_type(t('DriveType')),
+                    brake_system_type=t('BrakeSystemType'),
+                    brake_system_desc=t('BrakeSystemDesc'),
+                    gvwr=t('GVWR'),
+                    curb_weight_lb=self.integer(result, 'CurbWeightLB'),
+                    plant_city=t('PlantCity'),
+                    plant_state=t('PlantState'),
+                    plant_country=t('PlantCountry'),
+                    plant_company_name=t('PlantCompanyName'),
+                    destination_market=t('DestinationMarket'),
+                    base_price=self.integer(result, 'BasePrice'),
+                    ncsa_make=t('NCSAMake'),
+                    ncsa_model=t('NCSAModel'),
+                    ncsa_body_type=t('NCSABodyType'),
+                    safety=SafetyFeatures(
+                        abs=t('ABS'),
+                        esc=t('ESC'),
+                        tpms=t('TPMS'),
+                        other_restraint_info=t('OtherRestraintSystemInfo')
+                    ),
+                    electric=electric,
+                    error_code=t('ErrorCode'),
+                    error_text=t('ErrorText'),
+                    suggested_vin=t('SuggestedVIN')
+                )
+            )
+
+            return transport
+
+        except Exception as e:
+            logger.debug(f"Error transforming VIN {vin}: {e}")
+            return None
+
+    def transform_batches(self, batches: Iterable[List[Dict[str, Any]]],
+                          compact: bool = False) -> Iterator[List[Union[AutomobileTransport, CompactRecord]]]:
+        """
+        Transform streamed vPIC result batches (see NHTSAExtractor.iter_decoded)
+
+        Args:
+            batches: Iterable of vPIC result lists
+            compact: Yield CompactRecord instead of pydantic objects
+        """
+        self.stats = {'valid': 0, 'skipped': 0}
+        for batch in batches:
+            records = []
+            for result in batch:
+                transport = self.transform_result(result)
+                if transport is None:
+                    self.stats['skipped'] += 1
+                    continue
+                records.append(CompactRecord.from_model(transport) if compact else transport)
+            self.stats['valid'] += len(records)
+            if records:
+                yield records
+
+        logger.info(f"✅ Transformation complete")
+        logger.info(f"   Valid records: {self.stats['valid']}")
+        logger.info(f"   Errors/skipped: {self.stats['skipped']}")
@@ -0,0 +1,187 @@
+"""Dashboard rollups accumulated in one streaming pass over transformed records"""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from models import CompactRecord, manufacturer_state_key
+
+
+# Age bands in years relative to the generation date: (label, min age, max age)
+AGE_BANDS = [
+    ('0-10', 0, 10),
+    ('11-20', 11, 20),
+    ('21-30', 21, 30),
+    ('31-50', 31, 50),
+    ('51+', 51, None),
+]
+
+# Terms rollups: output key -> dotted record field
+TERMS_FIELDS = {
+    'manufacturers': 'manufacturer',
+    'states': 'location.state_province',
+    'categories': 'category',
+    'engine_types': 'specifications.engine_type',
+    'owner_types': 'owner.type',
+}
+
+# Entries kept per terms rollup; dashboard widgets show the top 10
+MAX_TERMS = 100
+
+
+def _value(record: Any, path: str) -> Any:
+    """Read a dotted field from a CompactRecord or a pydantic model"""
+    if isinstance(record, CompactRecord):
+        return record.get(path)
+    for name in path.split('.'):
+        record = getattr(record, name, None)
+        if record is None:
+            return None
+    return record
+
+
+def _age_band(year: Optional[int], reference_year: int) -> str:
+    if year is None:
+        return 'unknown'
+    age = reference_year - year
+    for label, low, high in AGE_BANDS:
+        if age >= low and (high is None or age <= high):
+            return label
+    return 'unknown'
+
+
+class _Counts:
+    """Exact counters for one transport type"""
+
+    def __init__(self):
+        self.total = 0
+        self.terms = {key: Counter() for key in TERMS_FIELDS}
+        self.years = Counter()
+        self.age_bands = Counter()
+        self.pairs = Counter()
+
+
+class RollupAccumulator:
+    """
+    Count everything the statistics dashboard shows while records stream by
+
+    Call ``add`` for each transformed record (transform_file does this when
+    given an accumulator) and ``documents`` once the run is loaded. Counters
+    are exact; adding a dashboard widget means adding a counter here, not
+    another aggregation over the whole index per page view.
+    """
+
+    def __init__(self, reference_year: Optional[int] = None):
+        """
+        Initialize accumulator
+
+        Args:
+            reference_year: Year ages are computed against (current year if None)
+        """
+        self.reference_year = reference_year or datetime.utcnow().year
+        self._counts: Dict[str, _Counts] = {}
+
+    def add(self, record: Any):
+        """Count one CompactRecord or transport model"""
+        transport_type = _value(record, 'transport_type')
+        counts = self._counts.get(transport_type)
+        if counts is None:
+            counts = self._counts[transport_type] = _Counts()
+
+        counts.total += 1
+        for key, path in TERMS_FIELDS.items():
+            value = _value(record, path)
+            if value:
+                counts.terms[key][value] += 1
+
+        manufacturer = _value(record, 'manufacturer')
+        state = _value(record, 'location.state_province')
+        if manufacturer and state:
+            counts.pairs[(manufacturer, state)] += 1
+
+        year = _value(record, 'year')
+        if year is not None:
+            counts.years[year] += 1
+        counts.age_bands[_age_band(year, self.reference_year)] += 1
+
+    def observe(self, batches: Iterable[List[Any]]) -> Iterator[List[Any]]:
+        """Pass record batches through while counting them (snapshot loads)"""
+        for batch in batches:
+            for record in batch:
+                self.add(record)
+            yield batch
+
+    @property
+    def transport_types(self) -> List[str]:
+        return sorted(self._counts)
+
+    def stats(self, transport_type: str) -> Dict[str, Any]:
+        """Rollup payload for one transport type"""
+        counts = self._counts[transport_type]
+        stats: Dict[str, Any] = {'total': counts.total}
+        for key, counter in counts.terms.items():
+            stats[key] = [{'key': k, 'count': c} for k, c in counter.most_common(MAX_TERMS)]
+            stats[f"{key}_cardinality"] = len(counter)
+        stats['years'] = [{'key': y, 'count': counts.years[y]}
+                          for y in sorted(counts.years, reverse=True)]
+        stats['age_bands'] = [{'key': label, 'count': counts.age_bands[label]}
+                              for label, _, _ in AGE_BANDS + [('unknown', None, None)]]
+        return stats
+
+    def documents(self, generation: str, source: str) -> List[Dict[str, Any]]:
+        """
+        Rollup documents for the rollup index, one per transport type
+
+        Args:
+            generation: Run generation the counts belong to (source checksum)
+            source: Data source name (faa, nhtsa, ...)
+
+        Returns:
+            Documents keyed by ``scope`` (the transport type)
+        """
+        generated_at = datetime.utcnow().isoformat()
+        return [
+            {
+                'scope': transport_type,
+                'generation': generation,
+                'source': source,
+                'generated_at': generated_at,
+                'reference_year': self.reference_year,
+                'stats': self.stats(transport_type),
+            }
+            for transport_type in self.transport_types
+        ]
+
+    def pair_documents(self, generation: str) -> List[Dict[str, Any]]:
+        """
+        One document per manufacturer/state pair for the picker index
+
+        ``manufacturer_count`` (the manufacturer's total over pairs) lets the
+        picker keep its order: manufacturers by size, then states by count.
+
+        Args:
+            generation: Run generation the counts belong to
+
+        Returns:
+            Pair documents across all transport types
+        """
+        documents = []
+        for transport_type in self.transport_types:
+            pairs = self._counts[transport_type].pairs
+            totals = Counter()
+            for (manufacturer, _), count in pairs.items():
+                totals[manufacturer] += count
+            for (manufacturer, state), count in pairs.items():
+                documents.append({
+                    'pair_key': manufacturer_state_key(manufacturer, state),
+                    'transport_type': transport_type,
+                    'manufacturer': manufacturer,
+                    'state': state,
+                    'count': count,
+                    'manufacturer_count': totals[manufacturer],
+                    'generation': generation,
+                })
+        return documents
@@ -0,0 +1,108 @@
+"""Warm a freshly loaded index generation with the most common queries before it goes live"""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import logging
+from typing import Any, Dict, List, Optional
+
+from elasticsearch import Elasticsearch
+
+from workload_replay import (
+    ElasticsearchTarget, WorkloadRequest, compare_reports, load_workload, parse_access_log,
+    replay, top_requests
+)
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+# Recorded workload used when neither a file nor an access log is given
+WARMUP_WORKLOAD = Path("/app/data/warmup/workload.jsonl")
+
+# Query kinds served by the picker pair index rather than the loaded indices;
+# they are warmed after the pairs of the new generation are written
+PAIR_KINDS = {'picker'}
+
+# Always warmed: the unfiltered dashboard, first search page and picker page
+# (what every visitor hits first), even without recorded traffic
+DEFAULT_QUERIES = [
+    WorkloadRequest('statistics'),
+    WorkloadRequest('search', {'page': 1, 'size': 20}),
+    WorkloadRequest('search_statistics'),
+    WorkloadRequest('picker', {'page': 1, 'size': 20}),
+]
+
+
+def warmup_queries(top_n: int = 50, workload_path: Optional[Path] = None,
+                   access_log: Optional[Path] = None) -> List[WorkloadRequest]:
+    """
+    The top N most common queries from recorded traffic plus DEFAULT_QUERIES
+
+    Args:
+        top_n: Distinct queries to keep
+        workload_path: Recorded workload (JSON lines, see workload_replay.py)
+        access_log: API access log (ACCESS_LOG=true) or ingress log
+
+    Returns:
+        Distinct queries, most common first
+    """
+    recorded: List[WorkloadRequest] = []
+    if access_log:
+        with open(access_log) as f:
+            recorded = parse_access_log(f)
+    elif workload_path or WARMUP_WORKLOAD.exists():
+        recorded = load_workload(workload_path or WARMUP_WORKLOAD)
+    if not recorded:
+        logger.info("No recorded traffic for warmup, using the default landing queries")
+    return top_requests(recorded + DEFAULT_QUERIES, top_n)
+
+
+def warm_index(es: Elasticsearch, index: str, queries: List[WorkloadRequest],
+               pairs_index: str = 'transport-manufacturer-states',
+               passes: int = 2, concurrency: int = 4) -> Dict[str, Any]:
+    """
+    Replay queries against a not-yet-live index until caches are warm
+
+    The first pass runs cold (filesystem cache, global ordinals, request
+    cache) and is the "before" measurement; the last pass is "after".
+
+    Args:
+        es: Elasticsearch client
+        index: Concrete index/indices of the new generation
+        queries: Queries to replay (see warmup_queries)
+        pairs_index: Picker pair index
+        passes: Replays of the query list (at least 2)
+        concurrency: Concurrent clients (keep low: the cluster still serves live traffic)
+
+    Returns:
+        Report with before/after latency summaries and their comparison
+    """
+    target = ElasticsearchTarget(es, index, pairs_index)
+    before = replay(target, queries, concurrency=concurrency, label='cold')
+    after = before
+    for _ in range(max(passes, 2) - 1):
+        after = replay(target, queries, concurrency=concurrency, label='warm')
+
+    report = {
+        'index': index,
+        'queries': len(queries),
+        'before': before,
+        'after': after,
+        'comparison': compare_reports(before, after),
+    }
+    logger.info(f"🔥 Warmed {index} with {len(queries)} queries: "
+                f"p50 {before['overall']['p50_ms']} -> {after['overall']['p50_ms']} ms, "
+                f"p95 {before['overall']['p95_ms']} -> {after['overall']['p95_ms']} ms")
+    for kind, stats in after['kinds'].items():
+        cold = before['kinds'].get(kind, {})
+        logger.info(f"  {kind}: p95 {cold.get('p95_ms')} -> {stats['p95_ms']} ms")
+    report['failures'] = {
+        kind: {'errors': stats['errors'], 'queries': stats['count'],
+               'error': after['first_errors'].get(kind)}
+        for kind, stats in after['kinds'].items() if stats['errors']
+    }
+    for kind, failure in report['failures'].items():
+        logger.warning(f"⚠️  Warmup {kind}: {failure['errors']}/{failure['queries']} queries failed "
+                       f"({failure['error']})")
+    return report
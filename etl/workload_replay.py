@@ -0,0 +1,621 @@
+"""Replay search workloads against the API or Elasticsearch and report latency percentiles"""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import argparse
+import json
+import logging
+import random
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+from urllib.parse import parse_qsl
+
+import requests
+from elasticsearch import Elasticsearch
+
+from transformers.rollups import AGE_BANDS
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+API_PREFIX = '/api/v1'
+
+# Request kind -> API path (backend/src/routes)
+ENDPOINTS = {
+    'search': '/aircraft',
+    'search_statistics': '/aircraft/statistics',
+    'statistics': '/statistics',
+    'picker': '/manufacturer-state-combinations',
+    'suggest': '/suggest',
+}
+KIND_BY_PATH = {path: kind for kind, path in ENDPOINTS.items()}
+
+# Share of each kind in a sampled workload (search page views dominate;
+# each filter change also fetches statistics)
+DEFAULT_MIX = {
+    'search': 0.55,
+    'search_statistics': 0.15,
+    'statistics': 0.10,
+    'picker': 0.15,
+    'suggest': 0.05,
+}
+
+# Mirrors backend/src/utils/queryBuilder.js FILTER_PARAMS / LIST_FIELDS
+FILTER_PARAMS = ('query', 'manufacturer', 'model', 'year_min', 'year_max', 'state',
+                 'manufacturer_state_combos')
+LIST_FIELDS = ['transport_id', 'transport_type', 'registration_id', 'manufacturer', 'model',
+               'year', 'category', 'location.state_province']
+
+# Mirrors backend/src/utils/searchBodies.js SUGGEST_TARGETS (field, exact-value field)
+# and the controllers' limits (SEARCH_TRACK_TOTAL_HITS default, MAX_SUGGESTIONS)
+SUGGEST_TARGETS = {
+    'manufacturer': ('manufacturer', 'manufacturer.keyword'),
+    'model': ('model', 'model.keyword'),
+    'registration': ('registration_id', 'registration_id'),
+    'n_number': ('plane_data.n_number', 'plane_data.n_number'),
+    'owner': ('owner.name', 'owner.name.keyword'),
+}
+TRACK_TOTAL_HITS = 10000
+MAX_SUGGESTIONS = 20
+
+ACCESS_LOG_PATTERN = re.compile(r'GET (/api/v1/[^\s"?]+)(?:\?([^\s"]*))?')
+
+
+class WorkloadRequest:
+    """One API request of a workload: kind plus query parameters"""
+
+    __slots__ = ('kind', 'params')
+
+    def __init__(self, kind: str, params: Optional[Dict[str, str]] = None):
+        if kind not in ENDPOINTS:
+            raise ValueError(f"Unknown request kind '{kind}' (choose from {', '.join(ENDPOINTS)})")
+        self.kind = kind
+        self.params = {k: str(v) for k, v in (params or {}).items() if v is not None and v != ''}
+
+    @property
+    def key(self) -> str:
+        """Canonical form; equal requests share a key (used to rank the most common)"""
+        return f"{self.kind}?{json.dumps(self.params, sort_keys=True)}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'kind': self.kind, 'params': self.params}
+
+    def __repr__(self) -> str:
+        return f"WorkloadRequest({self.kind!r}, {self.params!r})"
+
+
+def parse_access_log(lines: Iterable[str]) -> List[WorkloadRequest]:
+    """
+    Requests from access log lines (combined/ingress format or the API's own log)
+
+    Lines for other endpoints (details, export, saved searches) are skipped.
+    """
+    workload = []
+    for line in lines:
+        match = ACCESS_LOG_PATTERN.search(line)
+        if not match:
+            continue
+        kind = KIND_BY_PATH.get(match.group(1)[len(API_PREFIX):])
+        if kind:
+            workload.append(WorkloadRequest(kind, dict(parse_qsl(match.group(2) or ''))))
+    return workload
+
+
+def load_workload(path: Path) -> List[WorkloadRequest]:
+    """Read a recorded workload (JSON lines of {kind, params})"""
+    with open(path) as f:
+        return [WorkloadRequest(**json.loads(line)) for line in f if line.strip()]
+
+
+def save_workload(path: Path, workload: Iterable[WorkloadRequest]):
+    """Write a workload as JSON lines"""
+    with open(path, 'w') as f:
+        for request in workload:
+            f.write(json.dumps(request.to_dict()) + '\n')
+
+
+def top_requests(workload: Iterable[WorkloadRequest], n: int) -> List[WorkloadRequest]:
+    """The n most frequent distinct requests, most common first"""
+    counts = Counter()
+    first = {}
+    for request in workload:
+        counts[request.key] += 1
+        first.setdefault(request.key, request)
+    return [first[key] for key, _ in counts.most_common(n)]
+
+
+def sample_workload(es: Elasticsearch, index: str, count: int,
+                    mix: Optional[Dict[str, float]] = None, seed: int = 42) -> List[WorkloadRequest]:
+    """
+    Draw a realistic request mix from the indexed data's value distributions
+
+    Manufacturers, states and models are picked in proportion to their
+    document counts, so popular filters are popular in the workload too.
+
+    Args:
+        es: Elasticsearch client
+        index: Index to read distributions from
+        count: Requests to generate
+        mix: Share per request kind (DEFAULT_MIX)
+        seed: Random seed (same seed and data -> same workload)
+    """
+    response = es.search(index=index, body={
+        'size': 0,
+        'aggs': {
+            'manufacturers': {'terms': {'field': 'manufacturer.keyword', 'size': 200}},
+            'states': {'terms': {'field': 'location.state_province', 'size': 60}},
+            'models': {'terms': {'field': 'model.keyword', 'size': 200}},
+            'years': {'stats': {'field': 'year'}},
+        },
+    })
+    aggs = response['aggregations']
+    values = {name: ([b['key'] for b in aggs[name]['buckets']],
+                     [b['doc_count'] for b in aggs[name]['buckets']])
+              for name in ('manufacturers', 'states', 'models')}
+    year_min = int(aggs['years']['min'] or 1950)
+    year_max = int(aggs['years']['max'] or datetime.utcnow().year)
+
+    rng = random.Random(seed)
+    mix = mix or DEFAULT_MIX
+
+    def pick(name: str) -> str:
+        keys, weights = values[name]
+        return rng.choices(keys, weights)[0] if keys else ''
+
+    def filters() -> Dict[str, Any]:
+        params: Dict[str, Any] = {}
+        if rng.random() < 0.15:
+            combos = {f"{pick('manufacturers')}:{pick('states')}" for _ in range(rng.randint(1, 3))}
+            params['manufacturer_state_combos'] = ','.join(sorted(combos))
+        else:
+            if rng.random() < 0.5:
+                params['manufacturer'] = pick('manufacturers')
+            if rng.random() < 0.4:
+                params['state'] = pick('states')
+        if rng.random() < 0.15:
+            params['model'] = pick('models')
+        if rng.random() < 0.3:
+            low = rng.randint(year_min, year_max)
+            params['year_min'] = low
+            params['year_max'] = rng.randint(low, year_max)
+        return params
+
+    kinds, weights = zip(*mix.items())
+    workload = []
+    for _ in range(count):
+        kind = rng.choices(kinds, weights)[0]
+        if kind == 'search':
+            params = {**filters(), 'page': rng.choices([1, 2, 3, 5, 10], [70, 15, 8, 5, 2])[0],
+                      'size': 20}
+        elif kind == 'search_statistics':
+            params = filters()
+        elif kind == 'statistics':
+            params = filters() if rng.random() < 0.3 else {}
+        elif kind == 'picker':
+            params = {'page': rng.choices([1, 2, 3], [80, 15, 5])[0], 'size': 20}
+            if rng.random() < 0.5:
+                params['search'] = pick('manufacturers')[:rng.randint(1, 4)]
+        else:
+            field = rng.choice(['manufacturer', 'model'])
+            source = pick('manufacturers' if field == 'manufacturer' else 'models')
+            params = {'field': field, 'prefix': source[:rng.randint(1, 4)]}
+        workload.append(WorkloadRequest(kind, params))
+    return workload
+
+
+def _parse_int(value: Any) -> Optional[int]:
+    """Leading integer of a value like JavaScript parseInt (None for NaN)"""
+    match = re.match(r'\s*([+-]?\d+)', str(value))
+    return int(match.group(1)) if match else None
+
+
+def normalize_filters(params: Dict[str, str]) -> Dict[str, str]:
+    """Filter parameters as the API normalizes them (queryBuilder.js normalizeFilters)"""
+    filters = {}
+    for name in FILTER_PARAMS:
+        value = params.get(name)
+        if value is None:
+            continue
+        text = str(value).strip()
+        if text:
+            filters[name] = text
+    if filters.get('manufacturer_state_combos'):
+        combos = [':'.join(part.strip() for part in combo.split(':'))
+                  for combo in filters['manufacturer_state_combos'].split(',')]
+        filters['manufacturer_state_combos'] = ','.join(sorted({c for c in combos if c and c != ':'}))
+    for name in ('year_min', 'year_max'):
+        if filters.get(name):
+            year = _parse_int(filters[name])
+            filters[name] = 'NaN' if year is None else str(year)
+    return filters
+
+
+def build_query(params: Dict[str, str], pair_keys: bool = True) -> Dict[str, Any]:
+    """
+    Filter query for API parameters (mirrors backend utils/queryBuilder.js buildQuery)
+
+    Args:
+        params: API query parameters
+        pair_keys: Combo filters as one terms query on manufacturer_state (the
+                   API's choice once the served index maps that field), else
+                   a bool of manufacturer/state terms
+    """
+    filters = normalize_filters(params)
+    must = []
+    if filters.get('query'):
+        must.append({'multi_match': {'query': filters['query'],
+                                     'fields': ['manufacturer', 'model', 'registration_id',
+                                                'plane_data.n_number']}})
+    if filters.get('manufacturer_state_combos'):
+        combos = [(combo.split(':') + [''])[:2]
+                  for combo in filters['manufacturer_state_combos'].split(',')]
+        if pair_keys:
+            must.append({'terms': {'manufacturer_state': [f"{m}|{st}" for m, st in combos]}})
+        else:
+            must.append({'bool': {'should': [
+                {'bool': {'must': [{'term': {'manufacturer.keyword': m}},
+                                   {'term': {'location.state_province': st}}]}}
+                for m, st in combos
+            ], 'minimum_should_match': 1}})
+    else:
+        if filters.get('manufacturer'):
+            must.append({'term': {'manufacturer.keyword': filters['manufacturer']}})
+        if filters.get('state'):
+            must.append({'term': {'location.state_province': filters['state']}})
+    if filters.get('model'):
+        must.append({'match': {'model': filters['model']}})
+    if filters.get('year_min') or filters.get('year_max'):
+        year = {}
+        if filters.get('year_min'):
+            year['gte'] = _parse_int(filters['year_min'])
+        if filters.get('year_max'):
+            year['lte'] = _parse_int(filters['year_max'])
+        must.append({'range': {'year': year}})
+    return {'bool': {'must': must}} if must else {'match_all': {}}
+
+
+def source_filter(params: Dict[str, str]) -> Optional[Dict[str, List[str]]]:
+    """_source filtering of a search request (queryBuilder.js sourceFilter; no validation)"""
+    if params.get('fields'):
+        names = [name.strip() for name in params['fields'].split(',') if name.strip()]
+        includes = [name for name in names if not name.startswith('-')]
+        excludes = [name[1:] for name in names if name.startswith('-')]
+        if includes and 'transport_id' not in includes:
+            includes.append('transport_id')
+        return {'includes': includes, 'excludes': excludes}
+    if params.get('view') == 'full':
+        return None
+    return {'includes': LIST_FIELDS}
+
+
+def es_request(request: WorkloadRequest, index: str,
+               pairs_index: str = 'transport-manufacturer-states',
+               reference_year: Optional[int] = None) -> Optional[Dict[str, Any]]:
+    """
+    Search the API would send for a request (search index, body)
+
+    Bodies match backend/src/utils/searchBodies.js exactly (checked by
+    test_workload_replay.py); the dashboard request is always the live
+    aggregation (no rollup fast path).
+
+    Args:
+        request: Workload request
+        index: Index/alias searched by the API
+        pairs_index: Picker pair index
+        reference_year: Year the statistics age bands count from (current UTC year)
+
+    Returns:
+        search() keyword arguments, or None when the API answers without
+        searching (empty or unknown-field suggest requests)
+    """
+    params = request.params
+    if request.kind == 'search':
+        size = _parse_int(params.get('size', 20))
+        start = (_parse_int(params.get('page', 1)) - 1) * size
+        body = {
+            'query': build_query(params), 'from': start, 'size': size,
+            'sort': [{'year': 'desc'}], 'track_total_hits': TRACK_TOTAL_HITS,
+        }
+        source = source_filter(params)
+        if source is not None:
+            body['_source'] = source
+        return {'index': index, 'body': body}
+    if request.kind == 'search_statistics':
+        return {'index': index, 'body': {
+            'query': build_query(params), 'size': 0, 'track_total_hits': True,
+            'aggs': {
+                'by_manufacturer': {'terms': {'field': 'manufacturer.keyword', 'size': 100,
+                                              'order': {'_count': 'desc'}},
+                                    'aggs': {'models': {'terms': {'field': 'model.keyword', 'size': 100}}}},
+                'by_state': {'terms': {'field': 'location.state_province', 'size': 50}},
+                'by_year': {'histogram': {'field': 'year', 'interval': 1, 'min_doc_count': 1,
+                                          'order': {'_key': 'desc'}}},
+                'by_category': {'terms': {'field': 'category', 'size': 20}},
+            },
+        }}
+    if request.kind == 'statistics':
+        year = reference_year or datetime.utcnow().year
+        ranges = []
+        for key, low, high in AGE_BANDS:
+            band = {'key': key, 'to': year - low + 1}
+            if high is not None:
+                band['from'] = year - high
+            ranges.append(band)
+        return {'index': index, 'body': {
+            'query': build_query(params), 'size': 0, 'track_total_hits': True,
+            'aggs': {
+                'top_manufacturers': {'terms': {'field': 'manufacturer.keyword', 'size': 10}},
+                'top_states': {'terms': {'field': 'location.state_province', 'size': 10}},
+                'year_distribution': {'histogram': {'field': 'year', 'interval': 1, 'min_doc_count': 1,
+                                                    'order': {'_key': 'desc'}}},
+                'aircraft_types': {'terms': {'field': 'category', 'size': 10}},
+                'engine_types': {'terms': {'field': 'specifications.engine_type', 'size': 10}},
+                'owner_types': {'terms': {'field': 'owner.type', 'size': 10}},
+                'age_bands': {'range': {'field': 'year', 'keyed': False, 'ranges': ranges}},
+                'unknown_year': {'missing': {'field': 'year'}},
+                'manufacturer_count': {'cardinality': {'field': 'manufacturer.keyword',
+                                                       'precision_threshold': 3000}},
+                'state_count': {'cardinality': {'field': 'location.state_province'}},
+            },
+        }}
+    if request.kind == 'picker':
+        size = _parse_int(params.get('size', 20))
+        start = (_parse_int(params.get('page', 1)) - 1) * size
+        search = params.get('search', '').strip()
+        must = []
+        if len(search) >= 2:
+            must.append({'match': {'manufacturer.ngram': {'query': search, 'operator': 'and'}}})
+        elif search:
+            must.append({'prefix': {'manufacturer': {'value': search, 'case_insensitive': True}}})
+        return {'index': pairs_index, 'body': {
+            'query': {'bool': {'filter': [{'term': {'transport_type': 'plane'}}], 'must': must}},
+            'from': start, 'size': size, 'track_total_hits': True,
+            'sort': [{'manufacturer_count': 'desc'}, {'manufacturer': 'asc'}, {'count': 'desc'}],
+            '_source': ['manufacturer', 'state', 'count'],
+        }}
+    target = SUGGEST_TARGETS.get(params.get('field', 'manufacturer'))
+    prefix = params.get('prefix', '').strip()[:64]
+    if target is None or not prefix:
+        return None
+    field, value = target
+    size = min(max(_parse_int(params.get('size', 10)) or 10, 1), MAX_SUGGESTIONS)
+    suggest = f"{field}.suggest"
+    return {'index': index, 'body': {
+        'query': {'multi_match': {'query': prefix, 'type': 'bool_prefix', 'operator': 'and',
+                                  'fields': [suggest, f"{suggest}._2gram", f"{suggest}._3gram"]}},
+        'collapse': {'field': value}, 'size': size,
+        'track_total_hits': False, '_source': False, 'fields': [value],
+    }}
+
+
+class BackendTarget:
+    """Send workload requests to the Express API"""
+
+    def __init__(self, base_url: str, timeout: float = 30.0):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.name = f"backend {self.base_url}"
+
+    def execute(self, request: WorkloadRequest):
+        response = self.session.get(f"{self.base_url}{API_PREFIX}{ENDPOINTS[request.kind]}",
+                                    params=request.params, timeout=self.timeout)
+        response.raise_for_status()
+
+
+class ElasticsearchTarget:
+    """Send the equivalent searches straight to Elasticsearch (no API caches)"""
+
+    def __init__(self, es: Elasticsearch, index: str,
+                 pairs_index: str = 'transport-manufacturer-states'):
+        self.es = es
+        self.index = index
+        self.pairs_index = pairs_index
+        self.name = f"elasticsearch {index}"
+
+    def execute(self, request: WorkloadRequest):
+        search = es_request(request, self.index, self.pairs_index)
+        if search is not None:
+            self.es.search(**search)
+
+
+def percentile(sorted_values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile of an ascending list"""
+    if not sorted_values:
+        return None
+    rank = max(1, int(-(-pct * len(sorted_values) // 100)))
+    return sorted_values[rank - 1]
+
+
+def _latency_stats(latencies: List[float], errors: int, elapsed: float) -> Dict[str, Any]:
+    values = sorted(latencies)
+    return {
+        'count': len(values) + errors,
+        'errors': errors,
+        'throughput_rps': round((len(values) + errors) / elapsed, 2) if elapsed else None,
+        'mean_ms': round(sum(values) / len(values), 2) if values else None,
+        'p50_ms': percentile(values, 50),
+        'p95_ms': percentile(values, 95),
+        'p99_ms': percentile(values, 99),
+        'max_ms': values[-1] if values else None,
+    }
+
+
+def replay(target: Any, workload: List[WorkloadRequest], concurrency: int = 8,
+           duration: Optional[float] = None, label: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Replay a workload with a fixed number of concurrent clients
+
+    Each client sends its next request as soon as the previous one returns
+    (closed loop). The workload repeats until ``duration`` seconds have
+    passed, or runs once when no duration is given.
+
+    Args:
+        target: BackendTarget or ElasticsearchTarget
+        workload: Requests to send
+        concurrency: Concurrent clients
+        duration: Seconds to keep replaying (None = each request once)
+        label: Free-form run label stored in the report
+
+    Returns:
+        JSON-ready report with per-kind and overall latency percentiles
+    """
+    lock = threading.Lock()
+    position = iter(range(sys.maxsize))
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    errors: Counter = Counter()
+    first_errors: Dict[str, str] = {}
+    started = time.monotonic()
+    deadline = started + duration if duration else None
+
+    def next_request() -> Optional[WorkloadRequest]:
+        with lock:
+            i = next(position)
+        if deadline is None:
+            return workload[i] if i < len(workload) else None
+        return workload[i % len(workload)] if time.monotonic() < deadline else None
+
+    def client():
+        while True:
+            request = next_request()
+            if request is None:
+                return
+            begin = time.perf_counter()
+            try:
+                target.execute(request)
+            except Exception as e:
+                logger.debug(f"{request.kind} failed: {e}")
+                with lock:
+                    errors[request.kind] += 1
+                    first_errors.setdefault(request.kind, str(e))
+                continue
+            elapsed_ms = round((time.perf_counter() - begin) * 1000, 2)
+            with lock:
+                latencies[request.kind].append(elapsed_ms)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for _ in range(concurrency):
+            pool.submit(client)
+    elapsed = time.monotonic() - started
+
+    kinds = sorted(set(latencies) | set(errors))
+    return {
+        'label': label,
+        'target': target.name,
+        'started_at': datetime.utcnow().isoformat(),
+        'concurrency': concurrency,
+        'duration_s': round(elapsed, 2),
+        'overall': _latency_stats([v for k in kinds for v in latencies[k]],
+                                  sum(errors.values()), elapsed),
+        'kinds': {k: _latency_stats(latencies[k], errors[k], elapsed) for k in kinds},
+        'first_errors': first_errors,
+    }
+
+
+def compare_reports(baseline: Dict[str, Any], current: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Per-kind change from a baseline report (negative latency change = faster)
+
+    Returns:
+        {kind: {metric: {'baseline', 'current', 'change_pct'}}}
+    """
+    result = {}
+    kinds = ['overall'] + sorted(set(baseline['kinds']) & set(current['kinds']))
+    for kind in kinds:
+        before = baseline['overall'] if kind == 'overall' else baseline['kinds'][kind]
+        after = current['overall'] if kind == 'overall' else current['kinds'][kind]
+        result[kind] = {}
+        for metric in ('p50_ms', 'p95_ms', 'p99_ms', 'throughput_rps'):
+            b, a = before.get(metric), after.get(metric)
+            change = round((a - b) / b * 100, 1) if a is not None and b else None
+            result[kind][metric] = {'baseline': b, 'current': a, 'change_pct': change}
+    return result
+
+
+def print_report(report: Dict[str, Any], comparison: Optional[Dict[str, Any]] = None):
+    print(f"\n{report['target']} - {report['concurrency']} clients, {report['duration_s']}s")
+    print(f"{'Kind':<18} {'Count':>7} {'Err':>5} {'RPS':>8} {'p50':>8} {'p95':>8} {'p99':>8}")
+    print("-" * 66)
+    for kind, stats in [*report['kinds'].items(), ('overall', report['overall'])]:
+        print(f"{kind:<18} {stats['count']:>7} {stats['errors']:>5} {stats['throughput_rps'] or 0:>8} "
+              f"{stats['p50_ms'] or 0:>8} {stats['p95_ms'] or 0:>8} {stats['p99_ms'] or 0:>8}")
+    if comparison:
+        print(f"\n{'vs baseline':<18} {'p50 %':>8} {'p95 %':>8} {'p99 %':>8} {'RPS %':>8}")
+        print("-" * 54)
+        for kind, metrics in comparison.items():
+            cells = [metrics[m]['change_pct'] for m in ('p50_ms', 'p95_ms', 'p99_ms', 'throughput_rps')]
+            print(f"{kind:<18} " + ' '.join(f"{'n/a' if c is None else f'{c:+.1f}':>8}" for c in cells))
+
+
+def main():
+    from es_client import get_es_client
+    from settings import ElasticsearchSettings
+
+    parser = argparse.ArgumentParser(description='Replay a search workload and report latency percentiles')
+    parser.add_argument('--target', choices=['backend', 'es'], default='backend')
+    parser.add_argument('--url', default='http://localhost:3000', help='API base URL (backend target)')
+    parser.add_argument('--index', default=None, help='Index or alias (es target / sampling)')
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--access-log', type=Path, help='Build the workload from an access log')
+    source.add_argument('--workload', type=Path, help='Recorded workload (JSON lines)')
+    source.add_argument('--sample', type=int, metavar='N', help='Sample N requests from the indexed data')
+    parser.add_argument('--seed', type=int, default=42, help='Seed for --sample')
+    parser.add_argument('--save-workload', type=Path, default=None, help='Write the workload as JSON lines')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=None,
+                        help='Seconds to keep replaying (default: each request once)')
+    parser.add_argument('--label', default=None, help='Run label stored in the report')
+    parser.add_argument('--output', type=Path, default=None, help='Write the report as JSON')
+    parser.add_argument('--compare', type=Path, default=None, help='Baseline report to compare with')
+    args = parser.parse_args()
+
+    settings = ElasticsearchSettings()
+    index = args.index or settings.index_name
+    es = get_es_client() if args.target == 'es' or args.sample else None
+
+    if args.access_log:
+        with open(args.access_log) as f:
+            workload = parse_access_log(f)
+    elif args.workload:
+        workload = load_workload(args.workload)
+    else:
+        workload = sample_workload(es, index, args.sample, seed=args.seed)
+    if not workload:
+        parser.error('Workload is empty')
+    logger.info(f"Workload: {len(workload)} requests "
+                f"({', '.join(f'{k}: {c}' for k, c in Counter(r.kind for r in workload).most_common())})")
+    if args.save_workload:
+        save_workload(args.save_workload, workload)
+
+    if args.target == 'es':
+        target = ElasticsearchTarget(es, index, settings.pairs_index)
+    else:
+        target = BackendTarget(args.url)
+
+    report = replay(target, workload, concurrency=args.concurrency,
+                    duration=args.duration, label=args.label)
+    comparison = None
+    if args.compare:
+        with open(args.compare) as f:
+            comparison = compare_reports(json.load(f), report)
+        report['comparison'] = comparison
+    print_report(report, comparison)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n📄 Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -15,6 +15,9 @@ export class StateManagementService implements OnDestroy {
   // ========== PRIVATE STATE ==========
   private stateSubject = new BehaviorSubject<SearchState>(this.getInitialState());
 
+  // Filter set the current statistics belong to (paging does not change it)
+  private statisticsKey: string | null = null;
+
   // ========== PUBLIC OBSERVABLES ==========
   public state$ = this.stateSubject.asObservable();
 
@@ -142,6 +145,7 @@ export class StateManagementService implements OnDestroy {
   }
 
   private resetResults(): void {
+    this.statisticsKey = null;
     this.updateState({
       results: [],
       statistics: null,
@@ -179,12 +183,12 @@ export class StateManagementService implements OnDestroy {
     }
 
     this.updateState({ loading: true, error: null });
+    this.loadStatistics(filters);
 
     this.api.searchAircraft(filters).subscribe({
       next: (response) => {
         this.updateState({
           results: response.items,
-          statistics: response.statistics,
           totalResults: response.total,
           loading: false,
           hasSearched: true,
@@ -192,6 +196,7 @@ export class StateManagementService implements OnDestroy {
         });
       },
       error: (error) => {
+        this.statisticsKey = null;
         this.updateState({
           loading: false,
           error: 'Failed to load search results. Please try again.',
@@ -204,6 +209,34 @@ export class StateManagementService implements OnDestroy {
     });
   }
 
+  /**
+   * Fetch histogram statistics when the filter set (ignoring paging) changed
+   */
+  private loadStatistics(filters: SearchFilters): void {
+    const { page, size, ...filterSet } = filters;
+    const key = JSON.stringify(filterSet);
+    if (key === this.statisticsKey) {
+      return;
+    }
+    this.statisticsKey = key;
+
+    this.api.getSearchStatistics(filters).subscribe({
+      next: (statistics) => {
+        if (key === this.statisticsKey) {
+          this.updateState({ statistics });
+        }
+      },
+      error: (error) => {
+        // A stale request failing must not clear a newer filter set's statistics
+        if (key === this.statisticsKey) {
+          this.statisticsKey = null;
+          this.updateState({ statistics: null });
+        }
+        console.error('Statistics error:', error);
+      }
+    });
+  }
+
   updatePage(page: number): void {
     const currentFilters = this.stateSubject.value.filters;
     const newFilters = { ...currentFilters, page };
@@ -224,6 +257,7 @@ export class StateManagementService implements OnDestroy {
       size: 20
     };
 
+    this.statisticsKey = null;
     this.updateState({
       filters: initialFilters,
       results: [],
@@ -1,6 +1,7 @@
 import { Component, OnInit, Output, EventEmitter, OnDestroy, Input, OnChanges, SimpleChanges } from '@angular/core';
 import { ApiService } from '../../../../services/api.service';
-import { Subscription } from 'rxjs';
+import { Subject, Subscription } from 'rxjs';
+import { debounceTime, distinctUntilChanged } from 'rxjs/operators';
 
 interface PickerRow {
   manufacturer: string;
@@ -24,8 +25,8 @@ export class ManufacturerStateTablePickerComponent implements OnInit, OnDestroy,
   @Input() initialSelections: ManufacturerStateSelection[] = []; // NEW: hydrate from parent
   @Output() selectionChange = new EventEmitter<ManufacturerStateSelection[]>();
 
-  rows: PickerRow[] = [];
-  allRows: PickerRow[] = [];
+  rows: PickerRow[] = []; // current page, paged and searched by the API
+  total: number = 0;
   selectedRows = new Set<string>();
   
   currentPage: number = 1;
@@ -35,13 +36,22 @@ export class ManufacturerStateTablePickerComponent implements OnInit, OnDestroy,
   loading: boolean = false;
   
   private subscription?: Subscription;
+  private searchSubscription?: Subscription;
+  private searchTerms = new Subject<string>();
   private lastClearTrigger: number = 0;
 
   constructor(private apiService: ApiService) { }
 
   ngOnInit(): void {
-    this.loadData();
     this.loadPageSizePreference();
+    this.searchSubscription = this.searchTerms.pipe(
+      debounceTime(300),
+      distinctUntilChanged()
+    ).subscribe(() => {
+      this.currentPage = 1;
+      this.loadData();
+    });
+    this.loadData();
   }
 
   ngOnChanges(changes: SimpleChanges): void {
@@ -73,31 +83,31 @@ export class ManufacturerStateTablePickerComponent implements OnInit, OnDestroy,
 
   ngOnDestroy(): void {
     this.subscription?.unsubscribe();
+    this.searchSubscription?.unsubscribe();
   }
 
+  /**
+   * Load the current page for the search term; a newer request replaces
+   * one still in flight
+   */
   loadData(): void {
     this.loading = true;
+    this.subscription?.unsubscribe();
     
-    this.subscription = this.apiService.getManufacturerStateCombinations(1, 10000, '').subscribe({
+    this.subscription = this.apiService.getManufacturerStateCombinations(
+      this.currentPage,
+      this.pageSize,
+      this.searchTerm.trim()
+    ).subscribe({
       next: (response) => {
-        this.allRows = response.items.map((item: any) => ({
+        this.rows = response.items.map((item: any) => ({
           manufacturer: item.manufacturer,
           state: item.state,
           count: item.count,
           key: `${item.manufacturer}|${item.state}`
         }));
-        
-        this.allRows.sort((a, b) => {
-          const mfrCompare = a.manufacturer.localeCompare(b.manufacturer);
-          if (mfrCompare !== 0) return mfrCompare;
-          return a.state.localeCompare(b.state);
-        });
-        
-        this.applyFilter();
+        this.total = response.total;
         this.loading = false;
-        
-        // After data loads, hydrate selections from initialSelections
-        this.hydrateSelections();
       },
       error: (error) => {
         console.error('Failed to load combinations:', error);
@@ -109,7 +119,8 @@ export class ManufacturerStateTablePickerComponent implements OnInit, OnDestroy,
   onManufacturerCheckboxClick(clickedRow: PickerRow): void {
     const manufacturer = clickedRow.manufacturer;
     const isCurrentlySelected = this.isRowSelected(clickedRow);
-    const relatedRows = this.allRows.filter(r => r.manufacturer === manufacturer);
+    // Only the loaded page is known; its rows for this manufacturer toggle together
+    const relatedRows = this.rows.filter(r => r.manufacturer === manufacturer);
     
     if (isCurrentlySelected) {
       relatedRows.forEach(row => this.selectedRows.delete(row.key));
@@ -130,36 +141,18 @@ export class ManufacturerStateTablePickerComponent implements OnInit, OnDestroy,
     return this.selectedRows.has(row.key);
   }
 
-  applyFilter(): void {
-    if (!this.searchTerm.trim()) {
-      this.rows = this.allRows;
-    } else {
-      const term = this.searchTerm.toLowerCase();
-      this.rows = this.allRows.filter(row => 
-        row.manufacturer.toLowerCase().includes(term) ||
-        row.state.toLowerCase().includes(term)
-      );
-    }
-    this.currentPage = 1;
-  }
-
   onSearchChange(): void {
-    this.applyFilter();
+    this.searchTerms.next(this.searchTerm.trim());
   }
 
   onPageSizeChange(): void {
     this.currentPage = 1;
     this.savePageSizePreference();
-  }
-
-  get visibleRows(): PickerRow[] {
-    const start = (this.currentPage - 1) * this.pageSize;
-    const end = start + this.pageSize;
-    return this.rows.slice(start, end);
+    this.loadData();
   }
 
   get totalPages(): number {
-    return Math.ceil(this.rows.length / this.pageSize);
+    return Math.ceil(this.total / this.pageSize);
   }
 
   get hasPreviousPage(): boolean {
@@ -173,18 +166,21 @@ export class ManufacturerStateTablePickerComponent implements OnInit, OnDestroy,
   previousPage(): void {
     if (this.hasPreviousPage) {
       this.currentPage--;
+      this.loadData();
     }
   }
 
   nextPage(): void {
     if (this.hasNextPage) {
       this.currentPage++;
+      this.loadData();
     }
   }
 
   goToPage(page: number): void {
-    if (page >= 1 && page <= this.totalPages) {
+    if (page >= 1 && page <= this.totalPages && page !== this.currentPage) {
       this.currentPage = page;
+      this.loadData();
     }
   }
 
@@ -1,13 +1,16 @@
-import { Component, Input, Output, EventEmitter, OnInit, OnChanges, SimpleChanges } from '@angular/core';
+import { Component, Input, Output, EventEmitter, OnInit, OnChanges, OnDestroy, SimpleChanges } from '@angular/core';
 import { FormBuilder, FormGroup, Validators, AbstractControl, ValidationErrors } from '@angular/forms';
-import { SearchFilters } from '../../../../models';
+import { Observable, Subject, of } from 'rxjs';
+import { debounceTime, distinctUntilChanged, switchMap, map, catchError, takeUntil } from 'rxjs/operators';
+import { SearchFilters, SuggestField } from '../../../../models';
+import { ApiService } from '../../../../services/api.service';
 
 @Component({
   selector: 'app-search-form',
   templateUrl: './search-form.component.html',
   styleUrls: ['./search-form.component.scss']
 })
-export class SearchFormComponent implements OnInit, OnChanges {
+export class SearchFormComponent implements OnInit, OnChanges, OnDestroy {
   @Input() initialFilters: SearchFilters = {};
   @Input() loading: boolean = false;
   
@@ -16,7 +19,13 @@ export class SearchFormComponent implements OnInit, OnChanges {
   
   searchForm: FormGroup;
 
-  constructor(private fb: FormBuilder) {
+  // Type-ahead options for the manufacturer and model datalists
+  manufacturerSuggestions: string[] = [];
+  modelSuggestions: string[] = [];
+
+  private destroy$ = new Subject<void>();
+
+  constructor(private fb: FormBuilder, private api: ApiService) {
     this.searchForm = this.fb.group({
       manufacturer: [''],
       model: [''],
@@ -28,6 +37,34 @@ export class SearchFormComponent implements OnInit, OnChanges {
 
   ngOnInit(): void {
     this.hydrateForm();
+
+    this.suggestionsFor('manufacturer', 'manufacturer')
+      .subscribe(values => this.manufacturerSuggestions = values);
+    this.suggestionsFor('model', 'model')
+      .subscribe(values => this.modelSuggestions = values);
+  }
+
+  ngOnDestroy(): void {
+    this.destroy$.next();
+    this.destroy$.complete();
+  }
+
+  /**
+   * Prefix suggestions as a form control is typed into
+   */
+  private suggestionsFor(controlName: string, field: SuggestField): Observable<string[]> {
+    return this.searchForm.get(controlName)!.valueChanges.pipe(
+      debounceTime(150),
+      map((value: string) => (value || '').trim()),
+      distinctUntilChanged(),
+      switchMap(prefix => prefix
+        ? this.api.getSuggestions(field, prefix).pipe(
+            map(response => response.suggestions),
+            catchError(() => of([]))
+          )
+        : of([])),
+      takeUntil(this.destroy$)
+    );
   }
 
   ngOnChanges(changes: SimpleChanges): void {
@@ -15,6 +15,11 @@ export interface SearchStatistics {
     } 
   };
   
+  // Counts per state, manufacture year and category
+  byState?: { [state: string]: number };
+  byYear?: { [year: string]: number };
+  byCategory?: { [category: string]: number };
+  
   // Total count matching current search filters
   totalCount: number;
 }
@@ -24,8 +29,20 @@ export interface SearchStatistics {
  */
 export interface SearchResponse {
   items: any[];           // Array of Aircraft objects
-  total: number;          // Total results matching search
+  total: number;          // Total results matching search (lower bound if totalRelation is 'gte')
+  totalRelation?: 'eq' | 'gte';
   page: number;           // Current page number
   size: number;           // Results per page
-  statistics: SearchStatistics;
+}
+
+/**
+ * Type-ahead suggestions from GET /suggest
+ */
+export type SuggestField = 'manufacturer' | 'model' | 'registration' | 'n_number' | 'owner';
+
+export interface SuggestResponse {
+  field: SuggestField;
+  prefix: string;
+  suggestions: string[];  // Distinct values starting with prefix
+  took?: number;          // Elasticsearch time in ms
 }
@@ -2,7 +2,7 @@ import { Injectable } from '@angular/core';
 import { HttpClient, HttpParams } from '@angular/common/http';
 import { Observable } from 'rxjs';
 import { environment } from '../../environments/environment';
-import { SearchFilters, SearchResponse, Aircraft } from '../models';
+import { SearchFilters, SearchResponse, SearchStatistics, Aircraft, SuggestField, SuggestResponse } from '../models';
 
 @Injectable({
   providedIn: 'root'
@@ -13,10 +13,9 @@ export class ApiService {
   constructor(private http: HttpClient) { }
 
   /**
-   * Search aircraft with filters
-   * Maps camelCase frontend properties to snake_case backend parameters
+   * Map filter properties (camelCase) to backend query parameters (snake_case)
    */
-  searchAircraft(filters: SearchFilters): Observable<SearchResponse> {
+  private filterParams(filters: SearchFilters): HttpParams {
     let params = new HttpParams();
     
     // Handle manufacturer-state combinations (takes precedence)
@@ -48,6 +47,16 @@ export class ApiService {
     if (filters.yearMax !== undefined && filters.yearMax !== null) {
       params = params.set('year_max', filters.yearMax.toString());
     }
+    
+    return params;
+  }
+
+  /**
+   * Search aircraft with filters (one page of hits)
+   */
+  searchAircraft(filters: SearchFilters): Observable<SearchResponse> {
+    let params = this.filterParams(filters);
+    
     if (filters.page) {
       params = params.set('page', filters.page.toString());
     }
@@ -58,6 +67,15 @@ export class ApiService {
     return this.http.get<SearchResponse>(`${this.apiUrl}/aircraft`, { params });
   }
 
+  /**
+   * Get histogram statistics for a filter set
+   * Independent of paging; the backend caches it per filter set
+   */
+  getSearchStatistics(filters: SearchFilters): Observable<SearchStatistics> {
+    const params = this.filterParams(filters);
+    return this.http.get<SearchStatistics>(`${this.apiUrl}/aircraft/statistics`, { params });
+  }
+
   /**
    * Get single aircraft by ID
    */
@@ -67,10 +85,23 @@ export class ApiService {
 
   /**
    * Get aggregate statistics (for dashboard page)
-   * Note: Search endpoint now includes filtered statistics
+   * Pass filters for a filtered dashboard; unfiltered requests are served
+   * from the precomputed rollup
+   */
+  getStatistics(filters?: SearchFilters): Observable<any> {
+    const params = filters ? this.filterParams(filters) : new HttpParams();
+    return this.http.get(`${this.apiUrl}/statistics`, { params });
+  }
+
+  /**
+   * Type-ahead suggestions: distinct values of a field starting with prefix
    */
-  getStatistics(): Observable<any> {
-    return this.http.get(`${this.apiUrl}/statistics`);
+  getSuggestions(field: SuggestField, prefix: string, size: number = 10): Observable<SuggestResponse> {
+    const params = new HttpParams()
+      .set('field', field)
+      .set('prefix', prefix)
+      .set('size', size.toString());
+    return this.http.get<SuggestResponse>(`${this.apiUrl}/suggest`, { params });
   }
 
   /**